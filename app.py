@@ -1,6 +1,4 @@
 import streamlit as st
-import news_fetcher
-import deduplicator
 import report_generator
 import company_data
 import market_data_fetcher
@@ -11,6 +9,8 @@ import pandas as pd
 import altair as alt
 from dateutil import parser
 import news_storage
+import refresh_worker
+import search_service
 from datetime import datetime
 
 st.set_page_config(page_title="캐피탈사 채용 대비", layout="wide")
@@ -30,6 +30,7 @@ import simple_summarizer
 import llm_summarizer
 
 CURRENT_YEAR = str(datetime.now().year)
+ARCHIVE_PAGE_SIZE = 20
 _now = datetime.now()
 _date_str = _now.strftime("%Y년 %m월 %d일")
 _day_kor = ["월", "화", "수", "목", "금", "토", "일"][_now.weekday()]
@@ -922,85 +923,39 @@ st.sidebar.markdown("---")
 st.sidebar.header("NotebookLM 바로가기")
 st.sidebar.markdown("[📘 NotebookLM 열기](https://notebooklm.google.com/)")
 
-def auto_update_news():
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
-    st.toast("⏳ 최신 뉴스를 병렬 수집 중입니다...")
-    days_lookback = 3
-    new_data = {}
-
-    def fetch_ibk():
-        raw = news_fetcher.fetch_news("IBK Capital", days=days_lookback, max_items=20)
-        rep = news_fetcher.fetch_business_reports("IBK캐피탈")
-        return 'IBK', deduplicator.deduplicate_news(raw + rep)
-
-    def fetch_ibk_parent():
-        raw = news_fetcher.fetch_news("IBK Parent", days=days_lookback, max_items=20)
-        rep = news_fetcher.fetch_business_reports("IBK기업은행")
-        return 'IBK_Parent', deduplicator.deduplicate_news(raw + rep)
-
-    def fetch_kdb():
-        raw = news_fetcher.fetch_news("KDB Capital", days=days_lookback, max_items=20)
-        rep = news_fetcher.fetch_business_reports("산은캐피탈")
-        return 'KDB', deduplicator.deduplicate_news(raw + rep)
-
-    def fetch_kdb_parent():
-        raw = news_fetcher.fetch_news("KDB Parent", days=days_lookback, max_items=20)
-        rep = news_fetcher.fetch_business_reports("KDB산업은행")
-        return 'KDB_Parent', deduplicator.deduplicate_news(raw + rep)
-
-    def fetch_industry():
-        items = news_fetcher.fetch_news("Capital Industry", days=days_lookback, max_items=10)
-        return 'Capital Industry', items
-
-    def fetch_macro():
-        items = news_fetcher.fetch_news("Macro Economy", days=days_lookback, max_items=10)
-        return 'Macro Economy', items
-
-    tasks = [fetch_ibk, fetch_ibk_parent, fetch_kdb, fetch_kdb_parent,
-             fetch_industry, fetch_macro]
-
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        futures = {executor.submit(task): task.__name__ for task in tasks}
-        for future in as_completed(futures):
-            try:
-                key, items = future.result()
-                new_data[key] = items
-            except Exception as e:
-                st.toast(f"⚠️ {futures[future]} 수집 실패: {e}")
-
-    # Merge with existing archive
-    for key, items in new_data.items():
-        if key in st.session_state['news_data']:
-            combined = items + st.session_state['news_data'][key]
-            st.session_state['news_data'][key] = deduplicator.deduplicate_news(combined)
-        else:
-            st.session_state['news_data'][key] = items
-
-    st.session_state['news_data']['_last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    news_storage.save_news_history(st.session_state['news_data'])
-    st.toast("✅ 통합 뉴스 업데이트 완료!")
-
-# Session State Init with Persistence
-if 'news_data' not in st.session_state:
-    loaded_data = news_storage.load_news_history()
-    if loaded_data:
-        st.session_state['news_data'] = loaded_data
-        
-        # Auto-Update Logic
-        last_updated_str = loaded_data.get('_last_updated', '2000-01-01 00:00:00')
-        try:
-            last_updated = datetime.strptime(last_updated_str, "%Y-%m-%d %H:%M:%S")
-            if last_updated.date() < datetime.now().date():
-                 with st.spinner("🔄 최신 뉴스 업데이트 중..."):
-                     try:
-                         auto_update_news()
-                     except Exception as e:
-                         st.error(f"뉴스 업데이트 실패: {e}")
-        except (ValueError, TypeError):
-            pass
-    else:
-        st.session_state['news_data'] = {}
+# Background ingestion: page loads only read from the store.
+# The refresh runs in refresh_worker (in-process scheduler thread here, or a
+# separate `python refresh_worker.py` process with NEWS_REFRESH_IN_APP=0).
+@st.cache_resource
+def _start_refresh_scheduler():
+    return refresh_worker.start_scheduler()
+
+if refresh_worker.REFRESH_IN_APP:
+    _start_refresh_scheduler()
+
+# Shared archive: one lazy LazyArchive per process for all sessions, rebuilt
+# only when the store version changes. Rows are read from SQLite in pages
+# when a tab needs them; sessions keep just their widget/filter state.
+@st.cache_resource
+def _shared_news_cache():
+    return news_storage.NewsCache()
+
+def get_news_data():
+    return _shared_news_cache().get()
+
+# Every rerun of an archive tab (typing, paging, any widget) repeats its
+# search; one process-wide service caches ranked hits per query until the
+# next write to the store
+@st.cache_resource
+def _search_service():
+    return search_service.SearchService()
+
+# Keyed by article id + updated_at, so the article text is only read from
+# the store on a cache miss (and a re-scraped article gets a new summary)
+@st.cache_data(max_entries=2000, show_spinner=False)
+def _article_summary(news_id, updated_at, fallback_text, focus_kw):
+    full_text = news_storage.get_article_content(news_id) or fallback_text
+    return llm_summarizer.summarize(full_text, num_sentences=4, focus_keyword=focus_kw)
 
 # 채용공고 자동 크롤링 (하루 1회)
 if 'recruitment_checked' not in st.session_state:
@@ -1014,10 +969,12 @@ if 'recruitment_checked' not in st.session_state:
         st.session_state['recruitment_checked'] = True
 
 # Sidebar: Data Info
-if '_last_updated' in st.session_state.get('news_data', {}):
-    st.sidebar.info(f"📅 데이터 기준:\n{st.session_state['news_data']['_last_updated']}")
+if '_last_updated' in get_news_data():
+    st.sidebar.info(f"📅 데이터 기준:\n{get_news_data()['_last_updated']}")
 else:
     st.sidebar.warning("데이터가 없습니다.\n관리자에게 문의하세요.")
+if refresh_worker.is_refreshing():
+    st.sidebar.caption("🔄 백그라운드에서 최신 뉴스를 수집 중입니다...")
 
 # Claude API Status
 if llm_summarizer.is_available():
@@ -1230,7 +1187,8 @@ with tab1:
 def display_archive(company_key, title, filter_mode="all"):
     st.markdown(f'<div class="section-title"><span class="icon">📰</span> {title}</div>', unsafe_allow_html=True)
     
-    if 'news_data' not in st.session_state:
+    news_data = get_news_data()
+    if not news_data:
         st.warning("데이터가 없습니다.")
         return
 
@@ -1238,11 +1196,12 @@ def display_archive(company_key, title, filter_mode="all"):
     if company_key == "GROUP":
         # Aggregate IBK and KDB news, then filter for NON-Capital
         # Now using Explicit Parent Keys
-        all_news = st.session_state['news_data'].get('IBK_Parent', []) + st.session_state['news_data'].get('KDB_Parent', [])
+        has_news = bool(news_data.get('IBK_Parent', [])) or bool(news_data.get('KDB_Parent', []))
     else:
-        all_news = st.session_state['news_data'].get(company_key, [])
+        # Lazy list: truthiness is a COUNT query, no rows are loaded
+        has_news = bool(news_data.get(company_key, []))
     
-    if not all_news:
+    if not has_news:
          st.info("뉴스 데이터가 없습니다.")
          return
 
@@ -1260,87 +1219,52 @@ def display_archive(company_key, title, filter_mode="all"):
     with col_filter2:
          selected_month = st.selectbox("전체 월", ["All"] + list(range(1, 13)), key=f"month_{company_key}")
 
-    # Use FTS5 search if query is provided
-    if search_query and search_query.strip():
+    year = None if selected_year == "All" else selected_year
+    month = None if selected_month == "All" else selected_month
+    archive_keys = ['IBK_Parent', 'KDB_Parent'] if company_key == "GROUP" else company_key
+
+    # Filtering, ordering and paging run in SQL on the indexed published_ts column.
+    # The page key includes the filters so a new selection starts again from page 1
+    page_key = f"page_{company_key}_{selected_year}_{selected_month}_{search_query.strip()}"
+    offset = (st.session_state.get(page_key, 1) - 1) * ARCHIVE_PAGE_SIZE
+
+    is_search = bool(search_query and search_query.strip())
+    search_company = company_key if company_key != "GROUP" else None
+    facets = {}
+    if is_search:
+        # Search hits come back ranked (bm25, title first) with highlighted
+        # snippets and per-company counts; article bodies stay in the store
+        business_reports, total_reports = [], 0
         try:
-            fts_results = news_storage.search_news(search_query.strip(), company_key=company_key if company_key != "GROUP" else None, limit=200)
-            # Apply year/month filter on FTS results
-            filtered_news = []
-            for item in fts_results:
-                try:
-                    pub_dt = parser.parse(item['published'])
-                    if selected_year != "All" and pub_dt.year != selected_year:
-                        continue
-                    if selected_month != "All" and pub_dt.month != selected_month:
-                        continue
-                    filtered_news.append(item)
-                except (ValueError, TypeError):
-                    continue
+            result = _search_service().search(search_query.strip(), company_key=search_company,
+                                              year=year, month=month, limit=ARCHIVE_PAGE_SIZE, offset=offset)
+            search_page, total_news, facets = result['items'], result['total'], result['facets']
+            search_fallback = None
         except Exception:
-            # Fallback to in-memory search if FTS fails
-            filtered_news = []
-            for item in all_news:
-                try:
-                    content_text = (item.get('title', '') + ' ' + item.get('full_content', '') + ' ' + item.get('summary', '')).lower()
-                    if search_query.strip().lower() not in content_text:
-                        continue
-                    pub_dt = parser.parse(item['published'])
-                    if selected_year != "All" and pub_dt.year != selected_year:
-                        continue
-                    if selected_month != "All" and pub_dt.month != selected_month:
-                        continue
-                    filtered_news.append(item)
-                except (ValueError, TypeError):
-                    continue
+            # Fallback to substring search if FTS fails
+            query_lower = search_query.strip().lower()
+            search_fallback = [
+                item for item in news_storage.get_news_by_company(archive_keys, year=year, month=month, limit=-1)
+                if query_lower in ((item.get('title') or '') + ' ' + (item.get('full_content') or '') + ' ' + (item.get('summary') or '')).lower()
+            ]
+            search_page = search_fallback[offset:offset + ARCHIVE_PAGE_SIZE]
+            total_news = len(search_fallback)
     else:
-        filtered_news = []
-        for item in all_news:
-            try:
-                pub_dt = parser.parse(item['published'])
-                if selected_year != "All" and pub_dt.year != selected_year:
-                    continue
-                if selected_month != "All" and pub_dt.month != selected_month:
-                    continue
-
-                content_check = (item['title'] + item.get('summary', '')).replace(" ", "")
-
-                if filter_mode == "capital_only":
-                    if "캐피탈" not in content_check and "Capital" not in item.get('title', ''):
-                        continue
-                elif filter_mode == "group_only":
-                    if "IBK캐피탈" in content_check or "산은캐피탈" in content_check:
-                        continue
-                elif filter_mode == "parent_only":
-                    if "캐피탈" in content_check or "Capital" in item.get('title', ''):
-                        continue
-
-                filtered_news.append(item)
-            except (ValueError, TypeError):
-                continue
+        business_reports = news_storage.query_archive(archive_keys, year, month, filter_mode, reports=True, limit=ARCHIVE_PAGE_SIZE)
+        total_reports = news_storage.count_archive(archive_keys, year, month, filter_mode, reports=True)
+        total_news = news_storage.count_archive(archive_keys, year, month, filter_mode, reports=False)
+
+    st.info(f"📚 선택된 기간의 아카이브: {total_reports + total_news}건")
+    if len(facets) > 1:
+        st.caption(" · ".join(f"{key} {count}건" for key, count in facets.items()))
 
-            
-    # Sort by Date (Newest First)
-    filtered_news.sort(key=lambda x: parser.parse(x.get('published', '2000-01-01')), reverse=True)
-            
-    st.info(f"📚 선택된 기간의 아카이브: {len(filtered_news)}건")
-    
-    # Separate Business Reports from General News
-    business_reports = []
-    general_news = []
-    
-    report_keywords = ["[공시", "[보고서", "사업보고서", "경영공시", "감사보고서", "실적발표"]
-    
-    for item in filtered_news:
-        title_item = item.get('title', '')
-        if any(k in title_item for k in report_keywords):
-            business_reports.append(item)
-        else:
-            general_news.append(item)
-            
     # Display Business Reports Section (if any)
     if business_reports:
         st.markdown(f"### 📑 {title.split(' ')[0]} 주요 사업보고서 및 공시")
-        for i, news in enumerate(business_reports):
+        shown_reports = business_reports[:ARCHIVE_PAGE_SIZE]
+        if total_reports > len(shown_reports):
+            st.caption(f"최근 {len(shown_reports)}건 표시 (전체 {total_reports}건)")
+        for i, news in enumerate(shown_reports):
             # Report Style Display (Simpler, more formal)
             with st.expander(f"📄 {news['title']}", expanded=True):
                  st.caption(f"📅 공시일: {news.get('published', '')[:10]}")
@@ -1349,18 +1273,25 @@ def display_archive(company_key, title, filter_mode="all"):
                  st.write(news.get('summary', ''))
         st.markdown("---")
         st.markdown("### 📰 뉴스 아카이브")
-        # Update filtered_news to only show general news below
-        filtered_news = general_news
 
     if st.button(f"📊 {selected_year}년 {selected_month}월 AI 핵심 리포트 생성", key=f"analyze_{company_key}"):
-         if filtered_news or business_reports:
+         # The report covers the whole selection, so only now load every row
+         if is_search:
+             report_reports = []
+             report_news = search_fallback if search_fallback is not None else _search_service().search(
+                 search_query.strip(), company_key=search_company, year=year, month=month, limit=-1)['items']
+         else:
+             report_news = news_storage.query_archive(archive_keys, year, month, filter_mode, reports=False, limit=-1)
+             report_reports = news_storage.query_archive(archive_keys, year, month, filter_mode, reports=True, limit=-1)
+         news_storage.load_contents(report_news + report_reports)
+         if report_news or report_reports:
              if llm_summarizer.is_available():
                  spinner_msg = "🤖 Claude AI가 심층 분석 보고서를 작성 중입니다... (약 15초 소요)"
              else:
                  spinner_msg = "📊 분석 보고서를 생성 중입니다... (약 3초 소요)"
              with st.spinner(spinner_msg):
                  target_comp = "IBK캐피탈" if company_key == "IBK" else "산은캐피탈" if company_key == "KDB" else "캐피탈 업계"
-                 report = llm_summarizer.generate_synthesis_report(filtered_news + business_reports, title=f"{title} - {selected_year}년 {selected_month}월 종합 분석", company_name=target_comp)
+                 report = llm_summarizer.generate_synthesis_report(report_news + report_reports, title=f"{title} - {selected_year}년 {selected_month}월 종합 분석", company_name=target_comp)
                  
                  with st.expander("📄 생성된 AI 리포트 보기", expanded=True):
                     st.markdown(report)
@@ -1369,7 +1300,7 @@ def display_archive(company_key, title, filter_mode="all"):
                  with st.expander("📋 NotebookLM 업로드용 소스 텍스트 복사 (Copy Source)"):
                      st.info("아래 텍스트를 복사하여 Google NotebookLM에 '소스 추가' 하시면 더 정교한 질의응답이 가능합니다.")
                      source_text = ""
-                     for item in business_reports + filtered_news:
+                     for item in report_reports + report_news:
                          source_text += f"[{item.get('published','')[:10]}] {item.get('title')}\n{item.get('full_content')}\n\n"
                      st.text_area("Whole Text Source", source_text, height=200)
 
@@ -1377,8 +1308,21 @@ def display_archive(company_key, title, filter_mode="all"):
              st.warning("분석할 뉴스가 없습니다.")
 
     st.markdown("---")
-    
-    for i, news in enumerate(filtered_news):
+
+    # Render one page at a time
+    page_count = max(1, -(-total_news // ARCHIVE_PAGE_SIZE))
+    if page_count > 1:
+        st.number_input(
+            f"페이지 (총 {page_count}페이지)", min_value=1, max_value=page_count, value=1, step=1,
+            key=page_key
+        )
+    if is_search:
+        page_news = search_page
+    else:
+        page_news = news_storage.query_archive(archive_keys, year, month, filter_mode, reports=False,
+                                               limit=ARCHIVE_PAGE_SIZE, offset=offset)
+
+    for i, news in enumerate(page_news, start=offset):
         # 1. Robust Date Parsing
         try:
             dt_obj = parser.parse(news.get('published', str(datetime.now())))
@@ -1389,29 +1333,23 @@ def display_archive(company_key, title, filter_mode="all"):
             date_label = "날짜 미상"
             full_date_str = news.get("published", "")
 
-        # 2. Expander Title: [YYYY-MM-DD] Title (highlight search match)
-        display_title = news['title']
-        if search_query and search_query.strip():
-            display_title = display_title.replace(search_query.strip(), f"**{search_query.strip()}**")
+        # 2. Expander Title: [YYYY-MM-DD] Title (search matches highlighted),
+        # one card per story
+        display_title = news.get('title_highlight') or news['title']
+        alternate_count = news.get('alternate_count') or 0
+        if alternate_count:
+            display_title += f" (외 {alternate_count}건)"
         with st.expander(f"[{date_label}] {display_title}"):
              st.caption(f"📅 게시일: {full_date_str}")
+             if news.get('snippet'):
+                 st.markdown(f"🔎 {news['snippet']}")
              
-             # Real Summarization
-             full_text = news.get('full_content', '')
-             if not full_text:
-                 full_text = news.get('summary', '내용 없음')
-
              # Map company_key to Korean name for focus
              focus_map = {"IBK": "IBK캐피탈", "KDB": "산은캐피탈", "IBK_Parent": "IBK기업은행", "KDB_Parent": "KDB산업은행", "Capital Industry": None, "Macro Economy": None}
              focus_kw = focus_map.get(company_key)
 
-             # Cache summaries in session_state to avoid re-calling API
-             cache_key = f"summary_{hash(full_text[:200])}_{focus_kw}"
-             if cache_key in st.session_state:
-                 summary_text = st.session_state[cache_key]
-             else:
-                 summary_text = llm_summarizer.summarize(full_text, num_sentences=4, focus_keyword=focus_kw)
-                 st.session_state[cache_key] = summary_text
+             # Summaries are cached process-wide (shared by all sessions) to avoid re-calling API
+             summary_text = _article_summary(news['id'], news.get('updated_at'), news.get('summary') or '내용 없음', focus_kw)
 
              if llm_summarizer.is_available():
                  st.info(f"🤖 **Claude AI 요약**: {summary_text}")
@@ -1420,8 +1358,20 @@ def display_archive(company_key, title, filter_mode="all"):
              
              if news.get('link'):
                 st.markdown(f"👉 [📰 기사 원문 링크 바로가기]({news['link']})")
+
+             # Other outlets' articles of the story are only read when asked for
+             if alternate_count and st.checkbox(f"🗂️ 같은 소식의 다른 기사 {alternate_count}건 보기",
+                                                key=f"show_alts_{company_key}_{i}"):
+                 for alternate in news_storage.get_story_alternates(news['id']):
+                     if alternate.get('link'):
+                         st.markdown(f"- [{alternate['title']}]({alternate['link']})")
+                     else:
+                         st.markdown(f"- {alternate['title']}")
             
-             st.text_area("📜 뉴스 원문 전체 (Original Text)", full_text, height=400, key=f"orig_{company_key}_{i}")
+             # The full text is only read from the store once the reader asks for it
+             if st.checkbox("📜 뉴스 원문 전체 보기", key=f"show_orig_{company_key}_{i}"):
+                 full_text = news.get('full_content') or news.get('summary', '내용 없음')
+                 st.text_area("📜 뉴스 원문 전체 (Original Text)", full_text, height=400, key=f"orig_{company_key}_{i}")
 
 with tab2:
     display_archive('IBK', 'IBK캐피탈 뉴스 아카이브', filter_mode="capital_only")
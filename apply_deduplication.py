@@ -1,5 +1,5 @@
 import json
-import deduplicator  # Uses the new logic we just wrote
+import batch_dedup
 
 # Load valid data
 with open("news_history.json", "r", encoding="utf-8") as f:
@@ -12,7 +12,7 @@ for key, items in data.items():
     original_count = len(items)
     
     # Apply new deduplication (Sorts by length -> Aggressive Cluster)
-    dedrupled_items = deduplicator.deduplicate_news(items)
+    dedrupled_items = batch_dedup.deduplicate_batch(items)
     
     cleaned_data[key] = dedrupled_items
     removed = original_count - len(dedrupled_items)
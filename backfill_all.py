@@ -1,6 +1,6 @@
 import news_fetcher
 import news_storage
-import deduplicator
+import batch_dedup
 from datetime import datetime
 import time
 
@@ -40,7 +40,7 @@ for company_key, display_name in categories:
     print(f"  Total {display_name}: {len(all_items)} items")
     
     # Deduplicate
-    deduped = deduplicator.deduplicate_news(all_items)
+    deduped = batch_dedup.deduplicate_batch(all_items)
     print(f"  After dedup: {len(deduped)} items")
     
     # Save to data
@@ -1,6 +1,6 @@
 import news_fetcher
 import news_storage
-import deduplicator
+import batch_dedup
 from datetime import datetime
 import time
 
@@ -30,7 +30,7 @@ for year in years:
 print(f"Total Fetched: {len(all_macro)}")
 
 # Deduplicate
-deduped_macro = deduplicator.deduplicate_news(all_macro)
+deduped_macro = batch_dedup.deduplicate_batch(all_macro)
 print(f"After deduplication: {len(deduped_macro)} items.")
 
 # Overwrite Macro Economy with fresh data
@@ -0,0 +1,123 @@
+"""
+Batch deduplication for bulk jobs (apply_deduplication.py, the backfill
+scripts): the same keep/drop decisions as deduplicator.deduplicate_news(),
+with the candidate search done as sparse matrix products.
+
+Each title is a binary vector over its (char, occurrence) tokens, so the
+product of two title vectors is the number of characters they share, and
+2 * shared / (len_a + len_b) bounds SequenceMatcher.ratio() (see
+deduplicator._CharIndex). The bound for a block of titles against a block
+of kept titles is one product; SequenceMatcher only runs on the pairs
+that pass it. Blocks are block_size x block_size, so memory stays bounded
+whatever the number of titles.
+
+Needs numpy and scipy; without them deduplicate_batch() falls back to
+deduplicator.deduplicate_news().
+"""
+from difflib import SequenceMatcher
+
+import deduplicator
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+BLOCK_SIZE = 1024     # titles per block; a block product is at most BLOCK_SIZE^2 floats
+
+
+def is_available():
+    """True if numpy and scipy are installed."""
+    return sparse is not None
+
+
+def _title_matrix(titles):
+    """CSR matrix (titles x tokens) of the titles' (char, occurrence) tokens."""
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    for title in titles:
+        for token in deduplicator._title_tokens(title):
+            indices.append(vocabulary.setdefault(token, len(vocabulary)))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+                             shape=(len(titles), max(1, len(vocabulary))))
+
+
+def _candidates(rows, columns, matrix, lengths, personnel, threshold, personnel_threshold):
+    """
+    Boolean (len(rows) x len(columns)) array: pairs whose shared-character
+    bound passes their threshold.
+    """
+    shared = (matrix[rows] @ matrix[columns].T).toarray()
+    limit = np.where(personnel[rows][:, None] & personnel[columns][None, :],
+                     min(threshold, personnel_threshold), threshold)
+    return 2.0 * shared > limit * (lengths[rows][:, None] + lengths[columns][None, :])
+
+
+def deduplicate_batch(news_list, threshold=deduplicator.DUPLICATE_THRESHOLD,
+                      personnel_threshold=deduplicator.PERSONNEL_THRESHOLD, block_size=BLOCK_SIZE):
+    """
+    deduplicate_news() for large lists: keeps the longest article of every
+    group of similar titles (ratio() > threshold, or > personnel_threshold
+    when both are personnel news) and returns the same items in the same
+    order.
+    """
+    if not is_available():
+        print("[batch_dedup] numpy/scipy가 없어 기본 중복 제거를 사용합니다: pip install numpy scipy")
+        return deduplicator.deduplicate_news(news_list)
+    if not news_list:
+        return []
+
+    def get_len(x):
+        if isinstance(x, dict):
+            return len(x.get('full_content', '')) if x.get('full_content') else 0
+        return 0
+
+    items = [news for news in sorted(news_list, key=get_len, reverse=True) if isinstance(news, dict)]
+    titles = [news.get('title', '') for news in items]
+    personnel = np.array([deduplicator.is_personnel_news(title) for title in titles], dtype=bool)
+    matrix = _title_matrix(titles)
+    lengths = np.diff(matrix.indptr).astype(np.float32)
+
+    kept = np.zeros(len(items), dtype=bool)
+    kept_blocks = []          # positions of the kept titles, one array per block
+    kept_empty_title = False
+
+    for start in range(0, len(items), block_size):
+        block = np.arange(start, min(len(items), start + block_size))
+        # Candidates among the titles kept by earlier blocks...
+        earlier = [[] for _ in block]
+        for positions in kept_blocks:
+            rows, cols = np.nonzero(_candidates(block, positions, matrix, lengths, personnel,
+                                                threshold, personnel_threshold))
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                earlier[row].append(positions[col])
+        # ...and within the block, resolved in order as titles are kept
+        within = _candidates(block, block, matrix, lengths, personnel, threshold, personnel_threshold)
+
+        for row, position in enumerate(block.tolist()):
+            title = titles[position]
+            if not title:
+                # ratio() of two empty strings is 1.0, of '' and any title 0.0
+                is_duplicate = kept_empty_title
+                kept_empty_title = True
+            else:
+                candidates = earlier[row] + [int(start + col) for col in np.nonzero(within[row, :row])[0]
+                                             if kept[start + col]]
+                is_duplicate = False
+                for other in candidates:
+                    similarity = SequenceMatcher(None, title, titles[other]).ratio()
+                    both_personnel = personnel[position] and personnel[other]
+                    if similarity > threshold or (both_personnel and similarity > personnel_threshold):
+                        is_duplicate = True
+                        break
+            kept[position] = not is_duplicate
+
+        positions = block[kept[block]]
+        if len(positions):
+            kept_blocks.append(positions)
+
+    return [news for news, keep in zip(items, kept) if keep]
@@ -0,0 +1,75 @@
+"""
+Benchmark for batch_dedup.deduplicate_batch() against
+deduplicator.deduplicate_news(), on the shipped news_history.json and on
+synthetic titles (bench_dedup.synthetic_titles). Checks that both keep
+exactly the same items.
+
+deduplicate_news() is slow on large sets, so it only runs on sets of up
+to --compare-max titles; larger ones time the batch engine alone.
+
+Run: python bench_batch_dedup.py [--synthetic 50000] [--compare-max 10000]
+                                 [--block-size 1024] [--seed 1]
+"""
+import argparse
+import json
+import os
+import time
+
+import batch_dedup
+import deduplicator
+from bench_dedup import synthetic_titles
+
+JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.json")
+
+
+def timed(func, items):
+    start = time.perf_counter()
+    result = func(items)
+    return result, time.perf_counter() - start
+
+
+def compare(name, items, block_size, run_deduplicate_news=True):
+    new, new_s = timed(lambda x: batch_dedup.deduplicate_batch(x, block_size=block_size), items)
+    line = f"  {name:26} {len(items):7} items -> {len(new):7} kept | batch {new_s:8.2f}s"
+    if run_deduplicate_news:
+        old, old_s = timed(deduplicator.deduplicate_news, items)
+        same = [id(x) for x in old] == [id(x) for x in new]
+        line += f" | deduplicate_news {old_s:8.2f}s ({old_s / max(new_s, 1e-9):.1f}x) | identical: {same}"
+    print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--synthetic", type=int, default=50000)
+    ap.add_argument("--compare-max", type=int, default=10000)
+    ap.add_argument("--block-size", type=int, default=batch_dedup.BLOCK_SIZE)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    if not batch_dedup.is_available():
+        print("numpy/scipy가 설치되어 있지 않습니다: pip install numpy scipy")
+        return
+
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    companies = {key: items for key, items in history.items() if not key.startswith('_')}
+    everything = [item for items in companies.values() for item in items]
+
+    print("news_history.json")
+    for key, items in companies.items():
+        compare(key, items, args.block_size)
+    compare("all companies together", everything, args.block_size)
+
+    print("synthetic titles")
+    synthetic = synthetic_titles(args.synthetic, args.seed, [item['title'] for item in everything])
+    sizes = []
+    size = 1000
+    while size < args.synthetic:
+        sizes.append(size)
+        size *= 2
+    for size in sizes + [args.synthetic]:
+        compare(f"first {size}", synthetic[:size], args.block_size, run_deduplicate_news=size <= args.compare_max)
+
+
+if __name__ == "__main__":
+    main()
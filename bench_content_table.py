@@ -0,0 +1,160 @@
+"""
+List-query latency and database size before and after moving article text
+out of the news table (news_content, compressed).
+
+"before" is a database with the previous schema (summary and full_content
+inline in news) queried with the previous SQL; "after" is a copy of it
+opened through news_storage, which migrates it. Uses news_history.json,
+copied --copies times.
+
+Run: python bench_content_table.py [--copies 10] [--repeat 50]
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import news_storage
+
+JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.json")
+PAGE_SIZE = 20
+
+_OLD_SCHEMA = """
+    CREATE TABLE news (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, company_key TEXT NOT NULL, title TEXT NOT NULL,
+        link TEXT, published TEXT, summary TEXT, full_content TEXT, source TEXT, image_url TEXT,
+        sentiment TEXT, created_at TEXT DEFAULT (datetime('now')), published_ts INTEGER,
+        content_quality INTEGER, extractor_version INTEGER, updated_at TEXT,
+        UNIQUE(company_key, title)
+    );
+    CREATE INDEX idx_news_company_key ON news(company_key);
+    CREATE INDEX idx_news_company_published_ts ON news(company_key, published_ts);
+"""
+
+# The list queries as they were with text inline
+_OLD_TEXT = "replace(title || coalesce(summary, ''), ' ', '')"
+_OLD_CAPITAL = f"(instr({_OLD_TEXT}, '캐피탈') > 0 OR instr(title, 'Capital') > 0)"
+_OLD_COLUMNS = ("id, company_key, title, link, published, published_ts, summary, source, image_url, "
+                "sentiment, updated_at")
+
+
+def build_old_database(path, copies):
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    conn = sqlite3.connect(path)
+    conn.executescript(_OLD_SCHEMA)
+    rows = []
+    for copy in range(copies):
+        for key, items in history.items():
+            if key.startswith('_'):
+                continue
+            for item in items:
+                content = item.get('full_content', '') or ''
+                rows.append((key, f"{item['title']} ({copy})", item.get('link', ''), item.get('published', ''),
+                             item.get('summary', ''), content, news_storage.parse_published(item.get('published', '')),
+                             news_storage.content_quality(content)))
+    conn.executemany(
+        "INSERT OR IGNORE INTO news (company_key, title, link, published, summary, full_content, "
+        "published_ts, content_quality) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def timed(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def old_queries(path):
+    conn = sqlite3.connect(path)
+    return {
+        'page (all)': lambda: conn.execute(
+            f"SELECT {_OLD_COLUMNS} FROM news WHERE company_key = ? "
+            "ORDER BY published_ts DESC, id DESC LIMIT ?", ('IBK', PAGE_SIZE)).fetchall(),
+        'page (capital_only)': lambda: conn.execute(
+            f"SELECT {_OLD_COLUMNS} FROM news WHERE company_key = ? AND {_OLD_CAPITAL} "
+            "ORDER BY published_ts DESC, id DESC LIMIT ?", ('IBK', PAGE_SIZE)).fetchall(),
+        'count (capital_only)': lambda: conn.execute(
+            f"SELECT COUNT(*) FROM news WHERE company_key = ? AND {_OLD_CAPITAL}", ('IBK',)).fetchone(),
+        'full list (no body)': lambda: conn.execute(
+            f"SELECT {_OLD_COLUMNS} FROM news ORDER BY published_ts DESC").fetchall(),
+    }
+
+
+def new_queries():
+    """The same queries as query_archive()/count_archive() now run them."""
+    conn = news_storage._get_connection()
+    capital = news_storage.ARCHIVE_FILTERS['capital_only']
+    columns, join = news_storage._LIST_COLUMNS, news_storage._CONTENT_JOIN
+
+    def page(condition):
+        return conn.execute(
+            f"WITH page AS (SELECT news.id FROM news WHERE news.company_key = ? {condition} "
+            "ORDER BY news.published_ts DESC, news.id DESC LIMIT ?) "
+            f"SELECT {columns} FROM page JOIN news ON news.id = page.id {join} "
+            "ORDER BY news.published_ts DESC, news.id DESC", ('IBK', PAGE_SIZE)).fetchall()
+
+    return {
+        'page (all)': lambda: page(""),
+        'page (capital_only)': lambda: page(f"AND {capital}"),
+        'count (capital_only)': lambda: conn.execute(
+            f"SELECT COUNT(*) FROM news WHERE news.company_key = ? AND {capital}", ('IBK',)).fetchone(),
+        'full list (no body)': lambda: conn.execute(
+            f"SELECT {columns} FROM news {join} ORDER BY news.published_ts DESC").fetchall(),
+    }
+
+
+def table_sizes(path):
+    """Bytes per table (with its indexes), from the dbstat virtual table."""
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        "SELECT coalesce(m.tbl_name, d.name), SUM(d.pgsize) FROM dbstat d "
+        "LEFT JOIN sqlite_master m ON m.name = d.name GROUP BY 1"
+    ).fetchall()
+    conn.close()
+    return dict(rows)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--copies", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    old_path = os.path.join(workdir, "before.db")
+    new_path = os.path.join(workdir, "after.db")
+    build_old_database(old_path, args.copies)
+    shutil.copy(old_path, new_path)
+
+    news_storage.DB_PATH = new_path
+    news_storage._initialized = False
+    start = time.perf_counter()
+    count = news_storage.get_news_count()
+    migrate_s = time.perf_counter() - start
+    news_storage.close_connections()
+
+    old_sizes, new_sizes = table_sizes(old_path), table_sizes(new_path)
+    search_bytes = sum(size for name, size in new_sizes.items() if name.startswith('news_search'))
+    print(f"{count} articles; migration took {migrate_s:.1f}s")
+    print(f"  news table: {old_sizes['news'] / 1e6:.2f} MB -> {new_sizes['news'] / 1e6:.2f} MB "
+          f"(+ news_content {new_sizes['news_content'] / 1e6:.2f} MB)")
+    print(f"  database without the search index: {sum(old_sizes.values()) / 1e6:.2f} MB -> "
+          f"{(sum(new_sizes.values()) - search_bytes) / 1e6:.2f} MB")
+
+    before, after = old_queries(old_path), new_queries()
+    print(f"  {'query':22} {'before ms':>10} {'after ms':>10}")
+    for name in before:
+        print(f"  {name:22} {timed(before[name], args.repeat):10.2f} {timed(after[name], args.repeat):10.2f}")
+
+
+if __name__ == "__main__":
+    main()
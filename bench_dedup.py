@@ -0,0 +1,179 @@
+"""
+Benchmark for deduplicator.deduplicate_news() against the previous
+all-pairs loop (every title compared with every kept title), on the
+shipped news_history.json and on synthetic titles. Checks that both keep
+exactly the same items.
+
+The synthetic set is deduplicated in growing prefixes (1000, 2000, ...
+titles, then all of it). The all-pairs loop is slow, so it only runs on
+prefixes of up to --pairwise-max titles. Each line also gives the number
+of exact SequenceMatcher comparisons deduplicate_news() made, and for the
+prefixes the growth exponent of its time from the previous prefix (2.0 =
+quadratic): the shared-character bound skips most comparisons, but the
+index is still probed against every kept title, so the time stays
+roughly quadratic in the number of titles.
+
+"refresh" times how a refresh deduplicates 100 fetched titles against an
+archive of --refresh-sizes titles: previously fetched + archive together
+through deduplicate_news(), now deduplicate_new_news(). (The previous
+path also loaded every archived article from SQLite; not included.) The
+previous path could keep a fetched item that duplicates an archived one
+when its body was longer, so the new-item counts may differ slightly.
+
+Run: python bench_dedup.py [--synthetic 100000] [--pairwise-max 2000] [--seed 1]
+                          [--refresh-sizes 1000 4000 16000]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from difflib import SequenceMatcher
+
+import deduplicator
+
+JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.json")
+OUTLETS = ["연합뉴스", "머니투데이", "뉴스1", "이데일리", "한국경제", "서울경제", "뉴시스", "아시아경제"]
+
+
+def deduplicate_pairwise(news_list):
+    """The previous deduplicate_news(): each title against every kept title."""
+    if not news_list:
+        return []
+
+    def get_len(x):
+        if isinstance(x, dict):
+            return len(x.get('full_content', '')) if x.get('full_content') else 0
+        return 0
+
+    unique_news = []
+    for news in sorted(news_list, key=get_len, reverse=True):
+        if not isinstance(news, dict): continue
+        title = news.get('title', '')
+        is_duplicate = False
+        for kept_item in unique_news:
+            kept_title = kept_item['title']
+            similarity = SequenceMatcher(None, title, kept_title).ratio()
+            if deduplicator.is_personnel_news(title) and deduplicator.is_personnel_news(kept_title):
+                if similarity > 0.4:
+                    is_duplicate = True
+                    break
+            if similarity > 0.6:
+                is_duplicate = True
+                break
+        if not is_duplicate:
+            unique_news.append(news)
+    return unique_news
+
+
+def synthetic_titles(count, seed, real_titles):
+    """
+    Headlines assembled from words of the real titles; about a third are
+    rewrites of an earlier one (words dropped, swapped or added, another
+    outlet suffix), some of them personnel news.
+    """
+    rng = random.Random(seed)
+    words = sorted({word for title in real_titles for word in title.split() if len(word) > 1})
+    titles = []
+    for i in range(count):
+        if titles and rng.random() < 0.35:
+            base = rng.choice(titles).rsplit(" - ", 1)[0].split()
+            edit = rng.random()
+            if edit < 0.3 and len(base) > 3:
+                base.pop(rng.randrange(len(base)))
+            elif edit < 0.6:
+                base.insert(rng.randrange(len(base) + 1), rng.choice(words))
+            elif len(base) > 1:
+                a, b = rng.sample(range(len(base)), 2)
+                base[a], base[b] = base[b], base[a]
+            words_of_title = base
+        else:
+            words_of_title = rng.sample(words, rng.randint(4, 9))
+            if rng.random() < 0.05:
+                words_of_title.insert(0, "[인사]")
+        titles.append(" ".join(words_of_title) + f" - {rng.choice(OUTLETS)}")
+    return [{'title': title, 'full_content': "본문" * rng.randint(0, 50)} for title in titles]
+
+
+def timed(func, items):
+    start = time.perf_counter()
+    result = func(items)
+    return result, time.perf_counter() - start
+
+
+def compare(name, items, run_pairwise=True, growth_from=None):
+    comparisons = [0]
+    is_duplicate = deduplicator._is_duplicate
+
+    def counted(*args):
+        comparisons[0] += 1
+        return is_duplicate(*args)
+
+    deduplicator._is_duplicate = counted
+    try:
+        new, new_s = timed(deduplicator.deduplicate_news, items)
+    finally:
+        deduplicator._is_duplicate = is_duplicate
+    line = (f"  {name:34} {len(items):7} items -> {len(new):7} kept | indexed {new_s:8.2f}s"
+            f" ({comparisons[0]} comparisons)")
+    if growth_from:
+        size, seconds = growth_from
+        line += f" | growth n^{math.log(new_s / seconds) / math.log(len(items) / size):.2f}"
+    if run_pairwise:
+        old, old_s = timed(deduplicate_pairwise, items)
+        same = [id(x) for x in old] == [id(x) for x in new]
+        line += f" | all-pairs {old_s:8.2f}s ({old_s / max(new_s, 1e-9):.0f}x) | identical: {same}"
+    print(line, flush=True)
+    return new_s
+
+
+def compare_refresh(archive, fetched):
+    start = time.perf_counter()
+    archived_titles = {item['title'] for item in archive}
+    old = [item for item in deduplicator.deduplicate_news(fetched + archive) if item['title'] not in archived_titles]
+    old_s = time.perf_counter() - start
+    new, new_s = timed(lambda items: deduplicator.deduplicate_new_news(items, [x['title'] for x in archive]), fetched)
+    print(f"  archive {len(archive):7} + {len(fetched)} fetched | whole set {old_s:8.2f}s -> {len(old)} new"
+          f" | against archive {new_s:8.2f}s -> {len(new)} new ({old_s / max(new_s, 1e-9):.0f}x)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--synthetic", type=int, default=100000)
+    ap.add_argument("--pairwise-max", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--refresh-sizes", type=int, nargs="*", default=[1000, 4000, 16000])
+    args = ap.parse_args()
+
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    companies = {key: items for key, items in history.items() if not key.startswith('_')}
+    everything = [item for items in companies.values() for item in items]
+
+    print("news_history.json")
+    for key, items in companies.items():
+        compare(key, items)
+    compare("all companies together", everything)
+
+    print("synthetic titles")
+    synthetic = synthetic_titles(args.synthetic, args.seed, [item['title'] for item in everything])
+    sizes = []
+    size = 1000
+    while size < args.synthetic:
+        sizes.append(size)
+        size *= 2
+    previous = None
+    for size in sizes + [args.synthetic]:
+        seconds = compare(f"first {size}", synthetic[:size], run_pairwise=size <= args.pairwise_max,
+                          growth_from=previous)
+        previous = (size, seconds)
+
+    print("refresh")
+    for size in args.refresh_sizes:
+        titles = synthetic_titles(size + 100, args.seed + size, [item['title'] for item in everything])
+        compare_refresh(deduplicator.deduplicate_news(titles[:size]), titles[size:])
+
+
+if __name__ == "__main__":
+    main()
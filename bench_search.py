@@ -0,0 +1,94 @@
+"""
+Recall and latency of search_news() against the in-memory substring scan
+that display_archive falls back to (the scan is taken as ground truth).
+The old whole-word unicode61 index is measured alongside for comparison.
+Uses news_history.json, loaded into a temporary database.
+
+Run: python bench_search.py [--repeat 20] [query ...]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import news_storage
+
+JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.json")
+DEFAULT_QUERIES = ["캐피탈", "IBK캐피탈", "산은캐피탈", "금리", "실적", "벤처투자", "PF", "연체율", "기업은행", "인수합병"]
+
+
+def load_archive():
+    news_storage.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+    news_storage._initialized = False
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        news_storage.save_news_history(json.load(f))
+
+    # The previous index, for comparison
+    conn = news_storage._get_connection()
+    conn.executescript("""
+        CREATE VIRTUAL TABLE old_fts USING fts5(title, full_content, summary);
+        INSERT INTO old_fts(rowid, title, full_content, summary)
+        SELECT news.id, news.title, unzip_text(news_content.full_content), unzip_text(news_content.summary)
+        FROM news JOIN news_content ON news_content.news_id = news.id;
+    """)
+    return news_storage.get_news_by_company(
+        [key for key in news_storage.LazyArchive() if not key.startswith('_')], limit=-1
+    )
+
+
+def scan(rows, query):
+    query = query.lower()
+    return {row['id'] for row in rows
+            if query in ((row.get('title') or '') + ' ' + (row.get('full_content') or '') + ' '
+                         + (row.get('summary') or '')).lower()}
+
+
+def old_index(query):
+    conn = news_storage._get_connection()
+    try:
+        return {row[0] for row in conn.execute("SELECT rowid FROM old_fts WHERE old_fts MATCH ?", (query,))}
+    except Exception:
+        return set()
+
+
+def new_index(query):
+    return {item['id'] for item in news_storage.search_news(query, limit=-1)}
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+    args = ap.parse_args()
+
+    rows = load_archive()
+    print(f"{len(rows)} articles, latency averaged over {args.repeat} runs")
+    print(f"  {'query':10} {'scan':>6} {'ms':>7} | {'unicode61':>9} {'recall':>7} {'ms':>6} | {'bigram':>6} {'recall':>7} {'ms':>6}")
+
+    totals = {'scan': 0, 'old': 0, 'new': 0}
+    for query in args.queries:
+        truth, scan_ms = timed(lambda: scan(rows, query), args.repeat)
+        old, old_ms = timed(lambda: old_index(query), args.repeat)
+        new, new_ms = timed(lambda: new_index(query), args.repeat)
+        totals['scan'] += len(truth)
+        totals['old'] += len(old & truth)
+        totals['new'] += len(new & truth)
+        old_recall = len(old & truth) / len(truth) if truth else 1.0
+        new_recall = len(new & truth) / len(truth) if truth else 1.0
+        print(f"  {query:10} {len(truth):6} {scan_ms:7.2f} | {len(old):9} {old_recall:7.0%} {old_ms:6.2f} "
+              f"| {len(new):6} {new_recall:7.0%} {new_ms:6.2f}")
+
+    if totals['scan']:
+        print(f"  overall recall: unicode61 {totals['old'] / totals['scan']:.0%}, bigram {totals['new'] / totals['scan']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Per-keystroke latency of the archive search box: typing each query one
+character at a time, then paging through the results, as Streamlit reruns
+do. Compares news_storage.search_archive() (one query per rerun) with
+search_service.SearchService (cached hits, prefix refinement).
+Uses news_history.json, copied --copies times into a temporary database
+to simulate a larger archive.
+
+Run: python bench_search_service.py [--copies 10] [--pages 3] [query ...]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import news_storage
+import search_service
+
+JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.json")
+DEFAULT_QUERIES = ["IBK캐피탈", "산은캐피탈 실적", "벤처투자", "연체율", "기업은행 인수합병"]
+PAGE_SIZE = 20
+
+
+def load_archive(copies):
+    news_storage.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+    news_storage.JSON_PATH = os.path.join(os.path.dirname(news_storage.DB_PATH), "none.json")  # no seed import
+    news_storage._initialized = False
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    for copy in range(copies):
+        for key, items in history.items():
+            if key.startswith('_'):
+                continue
+            news_storage.ingest_news(key, [
+                dict(item, title=f"{item['title']} ({copy})", link=f"{item.get('link', '')}#{copy}")
+                for item in items
+            ])
+    return news_storage.get_news_count()
+
+
+def keystrokes(query):
+    return [query[:i] for i in range(1, len(query) + 1) if query[:i].strip()]
+
+
+def run(search, queries, pages):
+    """Latencies (ms) of every rerun: each keystroke, then each page."""
+    latencies = []
+    for query in queries:
+        for typed in keystrokes(query):
+            start = time.perf_counter()
+            search(typed, 0)
+            latencies.append((time.perf_counter() - start) * 1000)
+        for page in range(1, pages):
+            start = time.perf_counter()
+            search(query, page * PAGE_SIZE)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"  {name:26} mean {sum(ordered) / len(ordered):7.2f} ms   p95 {p95:7.2f} ms   max {ordered[-1]:7.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--copies", type=int, default=10)
+    ap.add_argument("--pages", type=int, default=3)
+    ap.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+    args = ap.parse_args()
+
+    count = load_archive(args.copies)
+    print(f"{count} articles, {len(args.queries)} queries typed character by character + {args.pages - 1} page changes")
+
+    direct = run(lambda q, offset: news_storage.search_archive(q, limit=PAGE_SIZE, offset=offset),
+                 args.queries, args.pages)
+    report("search_archive", direct)
+
+    service = search_service.SearchService()
+    cold = run(lambda q, offset: service.search(q, limit=PAGE_SIZE, offset=offset), args.queries, args.pages)
+    report("SearchService (cold)", cold)
+    warm = run(lambda q, offset: service.search(q, limit=PAGE_SIZE, offset=offset), args.queries, args.pages)
+    report("SearchService (retyped)", warm)
+    print(f"  cache: {service.stats}")
+
+    # Results must not change
+    for query in args.queries:
+        expected = news_storage.search_archive(query, limit=-1)
+        got = service.search(query, limit=-1)
+        same = ([item['id'] for item in got['items']] == [item['id'] for item in expected['items']]
+                and got['total'] == expected['total'] and got['facets'] == expected['facets'])
+        print(f"  {query}: {got['total']} hits, identical to search_archive: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark for news_storage per-call latency.
+Compares opening a fresh SQLite connection for every call (the old
+behaviour, emulated with close_connections() after each call) against the
+per-thread reused connection with its tuned pragmas and statement cache.
+
+Run: python bench_storage.py [--rows 2000] [--calls 500]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import news_storage
+
+
+def seed(rows):
+    news_storage.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+    news_storage.JSON_PATH = os.path.join(os.path.dirname(news_storage.DB_PATH), "none.json")  # no seed import
+    news_storage._initialized = False
+    news_storage.save_news_history({
+        'IBK': [{
+            'title': f"IBK캐피탈 벤처투자 확대 기사 {i}",
+            'link': f"https://news.example.com/{i}",
+            'published': f"Mon, {i % 28 + 1:02d} Aug 2022 07:00:00 GMT",
+            'summary': "IBK캐피탈이 벤처투자와 기업금융을 확대한다.",
+            'full_content': "IBK캐피탈은 올해 벤처투자와 기업금융 중심의 포트폴리오 재편을 추진한다. " * 20,
+        } for i in range(rows)],
+        '_last_updated': "2022-08-01 07:00:00",
+    })
+
+
+def measure(label, func, calls, reuse):
+    news_storage.close_connections()
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        func(i)
+        timings.append(time.perf_counter() - start)
+        if not reuse:
+            news_storage.close_connections()
+    timings.sort()
+    return {
+        'label': label,
+        'median_us': statistics.median(timings) * 1e6,
+        'p95_us': timings[int(len(timings) * 0.95) - 1] * 1e6,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--calls", type=int, default=500)
+    args = ap.parse_args()
+
+    seed(args.rows)
+    calls = {
+        'get_metadata': lambda i: news_storage.get_metadata('_last_updated'),
+        'set_metadata': lambda i: news_storage.set_metadata('bench', str(i)),
+        'get_news_by_company (20 rows)': lambda i: news_storage.get_news_by_company('IBK', limit=20, offset=i % 50),
+        'count_archive': lambda i: news_storage.count_archive('IBK', year=2022, month=8),
+        'search_news': lambda i: news_storage.search_news('벤처투자', limit=20),
+    }
+
+    print(f"rows={args.rows} calls={args.calls} (latency in microseconds)")
+    print(f"  {'call':32} {'connect/call':>16} {'reused':>16} {'speedup':>8}")
+    for label, func in calls.items():
+        before = measure(label, func, args.calls, reuse=False)
+        after = measure(label, func, args.calls, reuse=True)
+        print(f"  {label:32} {before['median_us']:7.0f} (p95 {before['p95_us']:5.0f}) "
+              f"{after['median_us']:7.0f} (p95 {after['p95_us']:5.0f}) "
+              f"{before['median_us'] / after['median_us']:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
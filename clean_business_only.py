@@ -3,6 +3,8 @@ import os
 import shutil
 from datetime import datetime
 
+import deduplicator
+
 # Backup (Already done in previous run, but checking)
 if not os.path.exists("news_history_clean_backup_RETRY.json"):
      if os.path.exists("news_history.json"):
@@ -13,7 +15,6 @@ with open("news_history.json", "r", encoding="utf-8") as f:
 
 # Define Junk Keywords
 junk_keywords = ["기부", "성금", "봉사", "승진", "인사", "위촉", "선임", "취임", "방문", "참석", "전달", "나눔", "후원"]
-mismatch_marker = "김병훈" 
 
 def clean_items(items, company_code):
     cleaned = []
@@ -37,8 +38,8 @@ def clean_items(items, company_code):
         content = item.get('full_content', '')
         summary = item.get('summary', '')
         
-        # 1. Detect Mismatch Corruption
-        if mismatch_marker in content and "푸르메" in title:
+        # 1. Detect Mismatch Corruption (body of another article)
+        if not deduplicator.title_matches_content(title, content):
              corruption_fixed += 1
              print(f"[{company_code}] Found Mismatched Item: {title}")
              continue 
@@ -1,5 +1,29 @@
+import hashlib
+import math
+import re
+from collections import Counter, defaultdict
 from difflib import SequenceMatcher
 
+from simple_summarizer import clean_text
+
+# Title similarity (SequenceMatcher.ratio()) above which two articles are
+# the same story; personnel news is merged much more aggressively
+DUPLICATE_THRESHOLD = 0.6
+PERSONNEL_THRESHOLD = 0.4
+
+# Body fingerprints (64-bit SimHash over character shingles of the cleaned
+# text). Copies of one article lie within SIMHASH_MAX_DISTANCE bits; in
+# the archive rewrites of a story by another outlet are 9+ bits apart and
+# unrelated articles 13+. Shorter bodies are stubs and get no fingerprint.
+SIMHASH_SHINGLE = 4
+SIMHASH_MAX_DISTANCE = 3
+SIMHASH_MIN_CHARS = 200
+# A body that shares (almost) none of its title's character bigrams belongs
+# to another article; bigrams, since Korean words carry particles
+# ("성장률은", "성장률①]") and a whole-word match misses them
+TITLE_MIN_SHARED_BIGRAMS = 3
+_WORD_RUN = re.compile(r"[^\W_]+")
+
 def is_similar(a, b, threshold=0.75):
     """
     Checks if two strings are similar.
@@ -11,12 +35,183 @@ def is_personnel_news(title):
     keys = ['[인사]', '인사', '프로필', '선임', '승진']
     return any(k in title for k in keys)
 
-def deduplicate_news(news_list):
+def _title_tokens(title):
     """
-    Advanced Deduplication:
-    1. Sorts by content length (descending) to prioritize detailed articles.
-    2. Uses SequenceMatcher for title similarity.
-    3. Checks for high overlap in title words.
+    The title's characters as (char, occurrence) tokens, so that counting
+    shared tokens counts shared characters as multisets.
+    """
+    seen = Counter()
+    tokens = []
+    for ch in title:
+        tokens.append((ch, seen[ch]))
+        seen[ch] += 1
+    return tokens
+
+class _CharIndex:
+    """
+    Inverted index from title tokens to positions of kept titles.
+    shared() counts, for every kept title at once, how many characters it
+    has in common with a title (Counter.update runs in C). SequenceMatcher
+    can match at most that many, so ratio() <= 2 * shared / (len_a +
+    len_b): the same bound as quick_ratio(). Only titles whose bound
+    passes the threshold need the real comparison.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(list)
+
+    def add(self, position, tokens):
+        for token in tokens:
+            self.postings[token].append(position)
+
+    def shared(self, tokens):
+        counts = Counter()
+        for token in tokens:
+            positions = self.postings.get(token)
+            if positions:
+                counts.update(positions)
+        return counts
+
+def _min_shared(length, threshold):
+    """
+    Fewest shared characters with which a title of this length can reach
+    ratio() > threshold against any title: the partner needs at least
+    length * t / (2 - t) characters, and so does the overlap. Rounded
+    down (towards more candidates) to stay safe from float error.
+    """
+    return math.floor(threshold * length / (2 - threshold) - 1e-9) + 1
+
+def _is_duplicate(title, title_is_personnel, kept_title, kept_is_personnel):
+    # A. Sequence Matcher (Fuzzy String Match)
+    # Threshold 0.6 is good for "Same event, slightly different headline"
+    similarity = SequenceMatcher(None, title, kept_title).ratio()
+
+    # B. Specific check for "Appointment/Personnel" to be very aggressive
+    if title_is_personnel and kept_is_personnel and similarity > PERSONNEL_THRESHOLD:
+        return True
+    return similarity > DUPLICATE_THRESHOLD
+
+def _find_duplicate(index, kept, title, is_personnel, tokens):
+    """
+    Position of the first of kept (the titles in index) that the non-empty
+    title duplicates, or None.
+    """
+    counts = index.shared(tokens)
+    need = _min_shared(len(title), PERSONNEL_THRESHOLD if is_personnel else DUPLICATE_THRESHOLD)
+    for position in sorted(position for position, shared in counts.items() if shared >= need):
+        shared = counts[position]
+        kept_title, kept_is_personnel = kept[position]
+        threshold = PERSONNEL_THRESHOLD if is_personnel and kept_is_personnel else DUPLICATE_THRESHOLD
+        if 2.0 * shared / (len(title) + len(kept_title)) <= threshold:
+            continue
+        if _is_duplicate(title, is_personnel, kept_title, kept_is_personnel):
+            return position
+    return None
+
+def _index_titles(titles):
+    """(_CharIndex, [(title, is_personnel)], has an empty title) of titles."""
+    index = _CharIndex()
+    indexed = []
+    has_empty_title = False
+    for title in titles:
+        if not title:
+            has_empty_title = True
+            continue
+        index.add(len(indexed), _title_tokens(title))
+        indexed.append((title, is_personnel_news(title)))
+    return index, indexed, has_empty_title
+
+def content_simhash(text):
+    """
+    64-bit SimHash of an article body (after simple_summarizer.clean_text),
+    or None when it is shorter than SIMHASH_MIN_CHARS. Every character
+    shingle votes on each bit through its blake2b hash.
+    """
+    text = " ".join(clean_text(text or "").split())
+    if len(text) < SIMHASH_MIN_CHARS:
+        return None
+    digests = b"".join(
+        hashlib.blake2b(text[i:i + SIMHASH_SHINGLE].encode('utf-8'), digest_size=8).digest()
+        for i in range(len(text) - SIMHASH_SHINGLE + 1)
+    )
+    total = len(digests) // 8
+    fingerprint = 0
+    for byte in range(8):
+        # Byte values of all digests at once (Counter counts in C)
+        counts = Counter(digests[byte::8])
+        for bit in range(8):
+            if 2 * sum(count for value, count in counts.items() if value >> bit & 1) > total:
+                fingerprint |= 1 << (8 * byte + bit)
+    return fingerprint
+
+def simhash_distance(a, b):
+    """Number of differing bits of two fingerprints."""
+    return bin(a ^ b).count('1')
+
+def _bigrams(text):
+    """Character bigrams of the runs of letters and digits of text, lower-cased."""
+    return {run[i:i + 2] for run in _WORD_RUN.findall(text.lower()) for i in range(len(run) - 1)}
+
+def title_matches_content(title, text):
+    """
+    False when an article body (SIMHASH_MIN_CHARS or longer) shares fewer
+    than TITLE_MIN_SHARED_BIGRAMS of its title's character bigrams (half
+    of them for a shorter title): the scraper stored another page's text
+    (a boilerplate column, a related-article link). The outlet suffix
+    (" - 연합뉴스") is not part of the title here.
+    """
+    if not text or len(text) < SIMHASH_MIN_CHARS:
+        return True
+    if ' - ' in title:
+        title = title.rsplit(' - ', 1)[0]
+    title_bigrams = _bigrams(title)
+    if not title_bigrams:
+        return True
+    need = min(TITLE_MIN_SHARED_BIGRAMS, (len(title_bigrams) + 1) // 2)
+    return len(title_bigrams & _bigrams(text)) >= need
+
+class _SimHashIndex:
+    """
+    Lookup table of body fingerprints. Split into SIMHASH_MAX_DISTANCE + 1
+    bands of 16 bits, two fingerprints at most SIMHASH_MAX_DISTANCE bits
+    apart agree on at least one band, so only fingerprints sharing a band
+    are compared.
+    """
+
+    def __init__(self):
+        self.bands = [defaultdict(list) for _ in range(SIMHASH_MAX_DISTANCE + 1)]
+        self.entries = []         # (fingerprint, title)
+
+    def _keys(self, fingerprint):
+        return [(fingerprint >> (16 * band)) & 0xFFFF for band in range(len(self.bands))]
+
+    def add(self, fingerprint, title):
+        for band, key in zip(self.bands, self._keys(fingerprint)):
+            band[key].append(len(self.entries))
+        self.entries.append((fingerprint, title))
+
+    def find(self, fingerprint):
+        """Title of the first indexed body within SIMHASH_MAX_DISTANCE, or None."""
+        for band, key in zip(self.bands, self._keys(fingerprint)):
+            for position in band.get(key, ()):
+                other, title = self.entries[position]
+                if simhash_distance(fingerprint, other) <= SIMHASH_MAX_DISTANCE:
+                    return title
+        return None
+
+def _body_fingerprint(news, title):
+    """content_simhash() of a fetched item's body, unless it belongs to another title."""
+    text = news.get('full_content') or ''
+    if not title or not title_matches_content(title, text):
+        return None
+    return content_simhash(text)
+
+def cluster_news(news_list):
+    """
+    Groups news_list into stories: [(representative, [alternates])]. The
+    representatives are exactly what deduplicate_news() keeps, in the same
+    order; every other item is an alternate of the first representative
+    whose title it duplicates.
     """
     if not news_list:
         return []
@@ -29,40 +224,129 @@ def deduplicate_news(news_list):
         return 0
 
     sorted_news = sorted(news_list, key=get_len, reverse=True)
-    
-    unique_news = []
-    
+
+    index = _CharIndex()
+    stories = []
+    kept = []                 # (title, is_personnel) of the representatives in index
+    kept_positions = []       # their positions in stories
+    empty_title_story = None
+
     for news in sorted_news:
         if not isinstance(news, dict): continue
         title = news.get('title', '')
-        is_duplicate = False
-        
-        for kept_item in unique_news:
-            kept_title = kept_item['title']
-            
-            # A. Sequence Matcher (Fuzzy String Match)
-            # Threshold 0.6 is good for "Same event, slightly different headline"
-            similarity = SequenceMatcher(None, title, kept_title).ratio()
-            
-            # B. Specific check for "Appointment/Personnel" to be very aggressive
-            # If both are personnel news, and similarity > 0.5, treat as dupe
-            is_personnel_a = is_personnel_news(title)
-            is_personnel_b = is_personnel_news(kept_title)
-            
-            if is_personnel_a and is_personnel_b:
-                if similarity > 0.4: # Very aggressive for personnel news
-                     is_duplicate = True
-                     break
-            
-            if similarity > 0.6:
-                is_duplicate = True
-                break
-                
-        if not is_duplicate:
-            unique_news.append(news)
-            
+        is_personnel = is_personnel_news(title)
+
+        if not title:
+            # ratio() of two empty strings is 1.0, of '' and any title 0.0
+            story = empty_title_story
+            if story is None:
+                empty_title_story = len(stories)
+        else:
+            tokens = _title_tokens(title)
+            position = _find_duplicate(index, kept, title, is_personnel, tokens)
+            story = kept_positions[position] if position is not None else None
+            if story is None:
+                index.add(len(kept), tokens)
+                kept.append((title, is_personnel))
+                kept_positions.append(len(stories))
+
+        if story is None:
+            stories.append((news, []))
+        else:
+            stories[story][1].append(news)
+    return stories
+
+def deduplicate_news(news_list):
+    """
+    Advanced Deduplication:
+    1. Sorts by content length (descending) to prioritize detailed articles.
+    2. Uses SequenceMatcher for title similarity.
+    3. Checks for high overlap in title words.
+    Only kept titles that share enough characters with a title to pass
+    the threshold (see _CharIndex) are compared with SequenceMatcher; the
+    keep/drop decisions are the same as comparing against all of them.
+    That cuts the SequenceMatcher calls to a few per title, but counting
+    the shared characters still visits every kept title that has one in
+    common, so the time grows about quadratically (100k titles: ~43 min,
+    see bench_dedup.py). Refreshes use deduplicate_new_news(), bulk jobs
+    batch_dedup.deduplicate_batch().
+    """
+    unique_news = [representative for representative, _ in cluster_news(news_list)]
+
     # Restore Chronological Order (Newest First) for display
     # Assuming 'published' is sortable or we can just rely on the original fetch order if we tracked indices.
     # But usually news_fetcher returns newest first. Let's try to parse date.
     # For now, just return valid items, app.py sorts them anyway.
     return unique_news
+
+def deduplicate_new_news(news_list, archived_titles, archived_fingerprints=()):
+    """
+    The items of news_list that are new to the archive: deduplicated among
+    themselves like deduplicate_news(), minus every item whose title
+    duplicates one of archived_titles. The archive is never compared with
+    itself, so a refresh costs (new items) x (archive size) comparisons
+    of the same kind deduplicate_news() makes, not (new + archive)^2.
+    Items are also dropped when their body is a copy of an archived body,
+    archived_fingerprints being (title, content_simhash()) pairs, or of an
+    earlier kept item's body (the same text under another headline).
+    """
+    index, archived, archived_empty_title = _index_titles(archived_titles)
+    bodies = _SimHashIndex()
+    for title, fingerprint in archived_fingerprints:
+        bodies.add(fingerprint, title)
+
+    new_news = []
+    for news in deduplicate_news(news_list):
+        title = news.get('title', '')
+        if not title:
+            is_duplicate = archived_empty_title
+        else:
+            is_duplicate = _find_duplicate(index, archived, title, is_personnel_news(title),
+                                           _title_tokens(title)) is not None
+        if not is_duplicate:
+            fingerprint = _body_fingerprint(news, title)
+            if fingerprint is not None:
+                is_duplicate = bodies.find(fingerprint) is not None
+                if not is_duplicate:
+                    bodies.add(fingerprint, title)
+        if not is_duplicate:
+            new_news.append(news)
+    return new_news
+
+def cluster_new_news(news_list, story_titles, story_fingerprints=()):
+    """
+    Story clustering counterpart of deduplicate_new_news(): nothing is
+    dropped. Returns copies of the items of news_list; each one that
+    belongs to an existing story has 'story_title' set to its
+    representative's title, either one of story_titles (the archive's
+    representatives) or another fetched item, as cluster_news() picks.
+    A story whose title matches none of them joins the story whose body
+    its body copies (story_fingerprints: (title, content_simhash()) of
+    the representatives). Fetched items with an empty title are never
+    clustered.
+    """
+    index, archived, _ = _index_titles(story_titles)
+    bodies = _SimHashIndex()
+    for title, fingerprint in story_fingerprints:
+        bodies.add(fingerprint, title)
+
+    clustered = []
+    for representative, alternates in cluster_news(news_list):
+        title = representative.get('title', '')
+        story_title = None
+        if title:
+            position = _find_duplicate(index, archived, title, is_personnel_news(title), _title_tokens(title))
+            if position is not None:
+                story_title = archived[position][0]
+            else:
+                fingerprint = _body_fingerprint(representative, title)
+                if fingerprint is not None:
+                    story_title = bodies.find(fingerprint)
+                    if story_title is None:
+                        bodies.add(fingerprint, title)
+        clustered.append(dict(representative, story_title=story_title) if story_title else dict(representative))
+        # Only empty titles cluster with an empty title
+        story_title = story_title or title
+        for news in alternates:
+            clustered.append(dict(news, story_title=story_title) if story_title else dict(news))
+    return clustered
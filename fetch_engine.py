@@ -0,0 +1,243 @@
+"""
+Shared fetch engine for all RSS and scrape traffic.
+
+One asyncio event loop (running in a background thread) schedules every
+request: per-domain concurrency caps, per-domain request spacing, timeouts
+and retries live here instead of being repeated in each fetcher.
+
+Async API:  await aget(url), await aget_many(urls)
+Sync API:   get(url), get_many(urls), parse_feed(url), throttle(url)
+
+The sync wrappers can be called from any thread (Streamlit script thread,
+ThreadPoolExecutor workers, seed scripts); they block until the engine loop
+has completed the request. The loop only schedules: the transport is the
+pooled, blocking requests session from http_client, each request running
+in a bounded thread pool (run_in_executor), so the number of requests in
+flight is capped by that pool's size, not by the loop.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+
+import feedparser
+import requests
+
+import http_client
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_RETRIES = 1
+RETRY_BACKOFF = 0.5          # seconds, doubled on every retry
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+MAX_CONNECTIONS = 32         # total in-flight requests
+PER_DOMAIN_LIMIT = 4         # in-flight requests per host (<= http_client.POOL_MAXSIZE)
+DOMAIN_LIMITS = {
+    'news.google.com': 8,
+}
+
+HOST_MIN_INTERVAL = 0.5      # seconds between two requests to the same host
+HOST_INTERVAL_OVERRIDES = {
+    'news.google.com': 0.1,
+}
+
+
+def _host(url):
+    return urlparse(url).netloc
+
+
+class FetchEngine:
+    def __init__(self, max_connections=MAX_CONNECTIONS, per_domain_limit=PER_DOMAIN_LIMIT,
+                 domain_limits=None, min_interval=HOST_MIN_INTERVAL, interval_overrides=None,
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, session=None):
+        self.per_domain_limit = per_domain_limit
+        self.domain_limits = dict(DOMAIN_LIMITS if domain_limits is None else domain_limits)
+        self.min_interval = min_interval
+        self.interval_overrides = dict(HOST_INTERVAL_OVERRIDES if interval_overrides is None else interval_overrides)
+        self.timeout = timeout
+        self.retries = retries
+
+        self._session = session if session is not None else http_client.get_session()
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="fetch")
+
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        # Only touched from the engine loop thread
+        self._semaphores = {}
+        self._next_slot = {}
+
+    # --- event loop plumbing -------------------------------------------------
+
+    def _ensure_loop(self):
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="fetch-engine", daemon=True)
+                thread.start()
+                self._thread = thread
+                self._loop = loop
+        return self._loop
+
+    async def _submit(self, coro):
+        """Runs coro on the engine loop, awaitable from any event loop."""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _run_sync(self, coro):
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Sync fetch API called from the engine loop; use the async API instead.")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    # --- scheduling ----------------------------------------------------------
+
+    def _semaphore(self, host):
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.domain_limits.get(host, self.per_domain_limit))
+            self._semaphores[host] = sem
+        return sem
+
+    async def _wait_for_slot(self, host):
+        interval = self.interval_overrides.get(host, self.min_interval)
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _fetch(self, url, headers=None, timeout=None, retries=None):
+        """
+        One request with the domain's concurrency cap, spacing and retries.
+        The GET itself is a blocking requests.Session.get() call handed to
+        the thread pool; only the waiting around it happens on the loop.
+        """
+        host = _host(url)
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        loop = asyncio.get_running_loop()
+        request = partial(self._session.get, url, headers=headers, timeout=timeout)
+
+        async with self._semaphore(host):
+            for attempt in range(retries + 1):
+                await self._wait_for_slot(host)
+                try:
+                    response = await loop.run_in_executor(self._executor, request)
+                except requests.RequestException:
+                    response = None
+                if response is not None and response.status_code not in RETRY_STATUS:
+                    return response
+                if attempt < retries:
+                    await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+            return response
+
+    async def _fetch_many(self, urls, **kwargs):
+        return await asyncio.gather(*(self._fetch(url, **kwargs) for url in urls))
+
+    # --- public API ----------------------------------------------------------
+
+    async def aget(self, url, **kwargs):
+        """Fetches url. Returns a requests.Response, or None if every attempt failed."""
+        return await self._submit(self._fetch(url, **kwargs))
+
+    async def aget_many(self, urls, **kwargs):
+        """Fetches all urls concurrently; results keep the input order."""
+        return await self._submit(self._fetch_many(list(urls), **kwargs))
+
+    def get(self, url, **kwargs):
+        return self._run_sync(self._fetch(url, **kwargs))
+
+    def get_many(self, urls, **kwargs):
+        return self._run_sync(self._fetch_many(list(urls), **kwargs))
+
+    def throttle(self, url):
+        """Blocks until url's host may be hit again (for libraries doing their own I/O)."""
+        self._run_sync(self._wait_for_slot(_host(url)))
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._executor.shutdown(wait=False)
+
+
+_engine = FetchEngine()
+
+
+def get_engine():
+    return _engine
+
+
+async def aget(url, **kwargs):
+    return await _engine.aget(url, **kwargs)
+
+
+async def aget_many(urls, **kwargs):
+    return await _engine.aget_many(urls, **kwargs)
+
+
+def get(url, **kwargs):
+    return _engine.get(url, **kwargs)
+
+
+def get_many(urls, **kwargs):
+    return _engine.get_many(urls, **kwargs)
+
+
+def throttle(url):
+    _engine.throttle(url)
+
+
+def get_html(url, **kwargs):
+    """Returns the raw body (bytes) of a successful response, or None."""
+    response = _engine.get(url, **kwargs)
+    if response is None or response.status_code != 200:
+        return None
+    return response.content
+
+
+def parse_feed(url, etag=None, modified=None, **kwargs):
+    """
+    Fetches an RSS/Atom feed through the engine and parses it with feedparser.
+    With etag/modified the request is conditional; an unchanged feed comes
+    back with status 304 and no entries. The result carries 'status',
+    'etag' and 'modified' like feedparser.parse(url) does.
+    """
+    headers = dict(kwargs.pop('headers', None) or {})
+    if etag:
+        headers['If-None-Match'] = etag
+    if modified:
+        headers['If-Modified-Since'] = modified
+
+    response = _engine.get(url, headers=headers or None, **kwargs)
+    if response is None or response.status_code not in (200, 304):
+        feed = feedparser.parse(b"")
+        feed['status'] = response.status_code if response is not None else None
+        return feed
+
+    if response.status_code == 304:
+        feed = feedparser.parse(b"")
+        feed['status'] = 304
+        feed['etag'] = etag
+        feed['modified'] = modified
+        return feed
+
+    feed = feedparser.parse(response.content, response_headers={
+        'content-type': response.headers.get('Content-Type', ''),
+    })
+    feed['status'] = 200
+    feed['etag'] = response.headers.get('ETag')
+    feed['modified'] = response.headers.get('Last-Modified')
+    return feed
@@ -44,8 +44,8 @@ def force_seed_2026():
              print(f"    -> Added {count} new items for {key}.")
              
              # Save immediately
-             data['_last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-             news_storage.save_news_history(data)
+             news_storage.ingest_news(key, new_items)
+             news_storage.set_metadata('_last_updated', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
              
          except Exception as e:
              print(f"    [ERROR] {e}")
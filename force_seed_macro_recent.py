@@ -54,8 +54,8 @@ def force_seed_macro_recent():
                  print(f"    -> Added {count} items for {year}.")
                  
                  # Save
-                 data['_last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                 news_storage.save_news_history(data)
+                 news_storage.ingest_news(key, new_items)
+                 news_storage.set_metadata('_last_updated', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                  
              except Exception as e:
                  print(f"    [ERROR] {e}")
@@ -0,0 +1,134 @@
+"""
+Shared, pooled HTTP client for all scrapers.
+
+A single requests.Session with keep-alive connection pools sized per host,
+compression enabled and consistent browser headers. Every connection the
+pools open is counted, so a refresh can report how many requests reused an
+already-open TCP/TLS connection:
+
+    http_client.reset_stats()
+    ... refresh ...
+    print(http_client.format_stats())
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# Number of distinct hosts whose pools are kept open at the same time.
+POOL_HOSTS = 64
+# Idle keep-alive connections kept per host. Must be >= the engine's
+# per-domain concurrency cap, otherwise connections get discarded.
+POOL_MAXSIZE = 8
+
+_stats_lock = threading.Lock()
+_stats = {'requests': 0, 'new_connections': 0, 'hosts': {}}
+
+
+def _host_stats(host):
+    return _stats['hosts'].setdefault(host, {'requests': 0, 'new_connections': 0})
+
+
+def _record_new_connection(host):
+    with _stats_lock:
+        _stats['new_connections'] += 1
+        _host_stats(host)['new_connections'] += 1
+
+
+def _record_response(response, *args, **kwargs):
+    host = requests.utils.urlparse(response.url).hostname or ''
+    with _stats_lock:
+        # Session.send() runs the hook once per response, redirect hops
+        # included, so each call is one request to that hop's host
+        _stats['requests'] += 1
+        _host_stats(host)['requests'] += 1
+    return response
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _record_new_connection(self.host)
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _record_new_connection(self.host)
+        return super()._new_conn()
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every new connection."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+
+def create_session(pool_hosts=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = PooledAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.hooks['response'].append(_record_response)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Returns the process-wide pooled session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats['requests'] = 0
+        _stats['new_connections'] = 0
+        _stats['hosts'] = {}
+
+
+def get_stats():
+    """
+    Connection counters since the last reset_stats().
+    reuse_rate is the share of requests served on an existing connection.
+    """
+    with _stats_lock:
+        requests_made = _stats['requests']
+        new_connections = _stats['new_connections']
+        hosts = {host: dict(v) for host, v in _stats['hosts'].items()}
+
+    reused = max(requests_made - new_connections, 0)
+    return {
+        'requests': requests_made,
+        'new_connections': new_connections,
+        'reused': reused,
+        'reuse_rate': reused / requests_made if requests_made else 0.0,
+        'hosts': hosts,
+    }
+
+
+def format_stats():
+    stats = get_stats()
+    return (f"HTTP: {stats['requests']} requests, {stats['new_connections']} new connections, "
+            f"reuse {stats['reuse_rate']:.0%} across {len(stats['hosts'])} hosts")
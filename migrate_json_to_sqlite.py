@@ -2,8 +2,10 @@
 One-time migration from news_history.json to news_history.db (SQLite).
 Run: python migrate_json_to_sqlite.py
 
-The migration is also done automatically on first app load,
-but this script allows manual verification.
+The migration is also done automatically whenever the news table is
+empty (news_storage._init_db(), on the first page load or refresh of a
+fresh deployment), but this script allows manual verification and
+merges the JSON into a database that already has news.
 """
 import json
 import os
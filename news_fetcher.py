@@ -1,28 +1,243 @@
-import feedparser
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from urllib.parse import quote
-from dateutil import parser
-import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict
+import threading
 from time import mktime
 import googlenewsdecoder
 import trafilatura
 import re
+import fetch_engine
+import http_client
+import news_storage
 
+# Number of RSS entries decoded/scraped in parallel per fetch call.
+MAX_WORKERS = 8
 
-def _scrape_article(url):
+# Bump when the extraction logic changes so cached articles are re-extracted.
+EXTRACTOR_VERSION = 1
+
+# Google News article id (the path segment after /articles/ or /read/)
+_GOOGLE_ARTICLE_ID = re.compile(r'/(?:rss/)?(?:articles|read)/([^/?#]+)')
+
+_decode_stats = {'hits': 0, 'misses': 0, 'failures': 0}
+_decode_stats_lock = threading.Lock()
+
+# Per-refresh HTML cache: url -> Future resolving to the response (or None).
+HTML_CACHE_MAX_ENTRIES = 300
+_html_cache = OrderedDict()
+_html_cache_lock = threading.Lock()
+
+
+def _run_pipeline(func, entries, max_workers=MAX_WORKERS):
+    """Applies func to every entry with bounded concurrency, preserving order."""
+    if not entries:
+        return []
+    if max_workers is None or max_workers <= 1:
+        return [func(entry) for entry in entries]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(entries))) as executor:
+        return list(executor.map(func, entries))
+
+
+def _google_article_id(link):
+    """Extracts the article id from a Google News RSS link, or None."""
+    match = _GOOGLE_ARTICLE_ID.search(link or "")
+    return match.group(1) if match else None
+
+
+def _decode_google_link(link):
+    """Resolves a Google News redirect link to the original article URL (network)."""
+    if 'news.google.com' not in link:
+        return link
+    try:
+        # The decoder does its own HTTP; only borrow the engine's host spacing
+        fetch_engine.throttle(link)
+        return googlenewsdecoder.new_decoderv1(link)['decoded_url']
+    except Exception:
+        return link
+
+
+def _count_decode(hits=0, misses=0, failures=0):
+    with _decode_stats_lock:
+        _decode_stats['hits'] += hits
+        _decode_stats['misses'] += misses
+        _decode_stats['failures'] += failures
+
+
+def reset_decode_stats():
+    with _decode_stats_lock:
+        for key in _decode_stats:
+            _decode_stats[key] = 0
+
+
+def get_decode_stats():
+    """Decode cache counters since the last reset_decode_stats()."""
+    with _decode_stats_lock:
+        stats = dict(_decode_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def decode_links(links, max_workers=MAX_WORKERS):
     """
-    Scrapes article content using trafilatura (better Korean support).
-    Returns: (content, summary)
+    Batch-resolves Google News links, preserving order.
+    Known article ids are answered from the persistent decode cache in one
+    query; only the remaining ones hit the network (in parallel) and are
+    then stored in one transaction. Failed decodes fall back to the
+    original link and are not cached.
+    """
+    ids = [_google_article_id(link) if 'news.google.com' in (link or "") else None for link in links]
+    wanted = sorted({article_id for article_id in ids if article_id})
+
+    try:
+        known = news_storage.get_decoded_urls(wanted)
+    except Exception:
+        known = {}
+
+    missing = {}
+    for link, article_id in zip(links, ids):
+        if article_id and article_id not in known and article_id not in missing:
+            missing[article_id] = link
+
+    _count_decode(hits=len(wanted) - len(missing), misses=len(missing))
+
+    resolved = {}
+    if missing:
+        missing_ids = list(missing)
+        results = _run_pipeline(lambda article_id: _decode_google_link(missing[article_id]), missing_ids, max_workers)
+        for article_id, decoded in zip(missing_ids, results):
+            if decoded and decoded != missing[article_id]:
+                resolved[article_id] = decoded
+        _count_decode(failures=len(missing) - len(resolved))
+        try:
+            news_storage.save_decoded_urls(resolved)
+        except Exception:
+            pass
+
+    decoded_links = []
+    for link, article_id in zip(links, ids):
+        if article_id:
+            decoded_links.append(known.get(article_id) or resolved.get(article_id) or link)
+        else:
+            decoded_links.append(link)
+    return decoded_links
+
+
+def reset_refresh_cache():
+    """Forgets the HTML downloaded so far. Call at the start of every refresh."""
+    with _html_cache_lock:
+        _html_cache.clear()
+
+
+def _cache_page(url, future):
+    """Stores future under url, dropping the oldest entries past HTML_CACHE_MAX_ENTRIES (hold _html_cache_lock)."""
+    _html_cache[url] = future
+    _html_cache.move_to_end(url)
+    while len(_html_cache) > HTML_CACHE_MAX_ENTRIES:
+        _html_cache.popitem(last=False)
+
+
+def _fetch_page(url, headers=None, timeout=10):
+    """
+    Downloads url at most once per refresh and returns the response (or None).
+    Concurrent callers asking for the same URL wait for the first download
+    instead of starting their own.
     """
+    with _html_cache_lock:
+        future = _html_cache.get(url)
+        owner = future is None
+        if owner:
+            future = Future()
+            _cache_page(url, future)
+
+    if not owner:
+        return future.result()
+
+    response = None
     try:
-        downloaded = trafilatura.fetch_url(url)
-        if not downloaded:
-            return "", ""
+        response = fetch_engine.get(url, headers=headers, timeout=timeout)
+    finally:
+        future.set_result(response)
+    return response
 
+
+def _download(url, headers=None, timeout=10):
+    """Returns the raw HTML (bytes) of url, downloaded at most once per refresh."""
+    response = _fetch_page(url, headers=headers, timeout=timeout)
+    if response is None or response.status_code != 200:
+        return None
+    return response.content
+
+
+def _remember_page(url, response):
+    """Puts an already downloaded response into the per-refresh HTML cache."""
+    future = Future()
+    future.set_result(response)
+    with _html_cache_lock:
+        _cache_page(url, future)
+
+
+def _cached_scrape(url, headers):
+    """
+    Returns (content, summary) from the on-disk article cache, or None.
+    Stale entries are revalidated with a conditional GET; a 200 answer is
+    kept in the per-refresh HTML cache so the caller does not download again.
+    URLs the cache has never seen fall back to the archive: a full text
+    stored for that link before the cache existed is used as it is.
+    """
+    try:
+        cached = news_storage.get_cached_article(url)
+        if cached is None:
+            return news_storage.get_archived_article(url)
+    except Exception:
+        return None
+    if not cached or cached['extractor_version'] != EXTRACTOR_VERSION:
+        return None
+    if cached['is_fresh']:
+        return cached['content'], cached['summary']
+    if not cached['etag'] and not cached['last_modified']:
+        return None
+
+    conditional = dict(headers or {})
+    if cached['etag']:
+        conditional['If-None-Match'] = cached['etag']
+    if cached['last_modified']:
+        conditional['If-Modified-Since'] = cached['last_modified']
+
+    response = fetch_engine.get(url, headers=conditional, timeout=10)
+    if response is not None and response.status_code == 304:
+        news_storage.touch_cached_article(url)
+        return cached['content'], cached['summary']
+    if response is not None:
+        _remember_page(url, response)
+    return None
+
+
+def _store_scrape(url, response, content, summary):
+    """Saves a successful extraction of url to the on-disk article cache."""
+    etag = last_modified = None
+    if response is not None:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+    try:
+        news_storage.put_cached_article(url, content, summary, etag, last_modified, EXTRACTOR_VERSION)
+    except Exception:
+        pass
+
+
+def _extract_article(html):
+    """
+    Extracts article content from downloaded HTML using trafilatura
+    (better Korean support).
+    Returns: (content, summary)
+    """
+    if not html:
+        return "", ""
+    try:
         content = trafilatura.extract(
-            downloaded,
+            html,
             include_comments=False,
             include_tables=False,
             favor_precision=True,
@@ -38,11 +253,12 @@ def _scrape_article(url):
     return "", ""
 
 
-def _scrape_with_meta_fallback(url, headers):
-    """Try meta description as final fallback."""
+def _extract_meta_description(html):
+    """Reads the meta/og/twitter description from downloaded HTML."""
+    if not html:
+        return "", ""
     try:
-        response = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(html, 'html.parser')
 
         meta_desc = soup.find('meta', attrs={'name': 'description'}) or \
                     soup.find('meta', attrs={'property': 'og:description'}) or \
@@ -57,16 +273,42 @@ def _scrape_with_meta_fallback(url, headers):
     return "", ""
 
 
+def _scrape_article(url):
+    """
+    Scrapes article content using trafilatura (better Korean support).
+    Returns: (content, summary)
+    """
+    return _extract_article(_download(url))
+
+
+def _scrape_with_meta_fallback(url, headers):
+    """Try meta description as final fallback."""
+    return _extract_meta_description(_download(url, headers=headers))
+
+
 def scrape_with_naver_fallback(title, original_link, headers):
     """
     Scrapes article content with multiple fallbacks:
+    0. On-disk article cache (keyed by decoded URL), or the archived full
+       text of that link
     1. trafilatura (direct)
     2. Naver News search + trafilatura
     3. Meta description
+    The original article is downloaded once; steps 1 and 3 both run
+    over that same HTML. Full extractions (1, 2) are written to the cache.
     """
+    # 0. Previously scraped article (on-disk cache)
+    cached = _cached_scrape(original_link, headers)
+    if cached:
+        return cached
+
+    response = _fetch_page(original_link, headers=headers)
+    html = response.content if response is not None and response.status_code == 200 else None
+
     # 1. Try direct scraping with trafilatura
-    content, summary = _scrape_article(original_link)
+    content, summary = _extract_article(html)
     if content and len(content) > 100:
+        _store_scrape(original_link, response, content, summary)
         return content, summary
 
     # 2. Fallback: Search Naver News with article title
@@ -76,8 +318,8 @@ def scrape_with_naver_fallback(title, original_link, headers):
 
         naver_search_url = f"https://search.naver.com/search.naver?where=news&query={quote(search_title)}"
 
-        response = requests.get(naver_search_url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        search_html = _download(naver_search_url, headers=headers, timeout=5)
+        soup = BeautifulSoup(search_html or b"", 'html.parser')
 
         news_links = soup.select('a.news_tit')
         if news_links:
@@ -85,12 +327,48 @@ def scrape_with_naver_fallback(title, original_link, headers):
             if naver_link and 'naver.com' in naver_link:
                 content, summary = _scrape_article(naver_link)
                 if content and len(content) > 100:
+                    _store_scrape(original_link, response, content, summary)
                     return content, summary
     except Exception:
         pass
 
-    # 3. Final fallback: meta description
-    return _scrape_with_meta_fallback(original_link, headers)
+    # 3. Final fallback: meta description (not cached, so it is retried next time)
+    return _extract_meta_description(html)
+
+
+def _fetch_feed(rss_url, conditional=False):
+    """
+    Fetches a Google News RSS query. With conditional=True the ETag and
+    Last-Modified stored for this URL are sent, so an unchanged feed comes
+    back with status 304 and no entries.
+    """
+    if not conditional:
+        return fetch_engine.parse_feed(rss_url)
+    try:
+        state = news_storage.get_feed_state(rss_url)
+    except Exception:
+        state = {}
+    return fetch_engine.parse_feed(rss_url, etag=state.get('etag'), modified=state.get('last_modified'))
+
+
+def _add_feed_check(feed_checks, rss_url, feed):
+    """Appends a conditional fetch's (url, status, etag, last_modified) to feed_checks."""
+    if feed_checks is not None:
+        feed_checks.append((rss_url, feed.get('status'), feed.get('etag'), feed.get('modified')))
+
+
+def record_feed_checks(feed_checks):
+    """
+    Stores the validators and unchanged counters collected by conditional
+    fetch_news() / fetch_business_reports() calls. Call it only once their
+    items are saved: a recorded feed answers 304 next time, so items lost
+    before that would never be fetched again.
+    """
+    for url, status, etag, last_modified in feed_checks:
+        try:
+            news_storage.record_feed_check(url, status, etag, last_modified)
+        except Exception:
+            pass
 
 
 def fetch_1year_key_issues(company_name, max_items=5):
@@ -100,7 +378,7 @@ def fetch_1year_key_issues(company_name, max_items=5):
     encoded_query = quote(f'{company_name} ({query}) when:1y')
     rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=ko&gl=KR&ceid=KR:ko"
 
-    feed = feedparser.parse(rss_url)
+    feed = fetch_engine.parse_feed(rss_url)
     issues = []
 
     for entry in feed.entries:
@@ -128,7 +406,7 @@ def fetch_recruitment_news(company_name):
     encoded_query = quote(f'{company_name} ({query}) when:30d')
     rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=ko&gl=KR&ceid=KR:ko"
 
-    feed = feedparser.parse(rss_url)
+    feed = fetch_engine.parse_feed(rss_url)
     items = []
 
     for entry in feed.entries:
@@ -143,14 +421,20 @@ def fetch_recruitment_news(company_name):
     return items
 
 
-def fetch_business_reports(company_name):
-    """Fetches specific business reports/disclosures."""
+def fetch_business_reports(company_name, conditional=False, feed_checks=None):
+    """
+    Fetches specific business reports/disclosures.
+    With conditional=True an unchanged feed (HTTP 304) returns []; the
+    feed's validators are appended to feed_checks (see fetch_news()).
+    """
     keywords = ['사업보고서', '경영공시', '실적발표', '영업실적', '감사보고서', '주주총회', '신년사']
     query = ' OR '.join(keywords)
     encoded_query = quote(f'{company_name} ({query}) when:1y')
     rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=ko&gl=KR&ceid=KR:ko"
 
-    feed = feedparser.parse(rss_url)
+    feed = _fetch_feed(rss_url, conditional)
+    if conditional:
+        _add_feed_check(feed_checks, rss_url, feed)
     items = []
 
     for entry in feed.entries:
@@ -187,7 +471,53 @@ def _get_query(company_name):
         return f"{company_name} {exclusions}"
 
 
-def fetch_news_period(company_name, start_date, end_date, max_items=50):
+def _scrape_period_entry(entry, decoded_link, headers):
+    """Scrapes a single (already decoded) RSS entry for fetch_news_period."""
+    title = entry.title
+
+    # Scrape full content with fallbacks
+    content, summary = scrape_with_naver_fallback(title, decoded_link, headers)
+
+    # Daum search fallback
+    if not content or len(content) < 50:
+        try:
+            search_title = re.sub(r'\s*-\s*[가-힣A-Za-z0-9.]+$', '', title)[:40]
+            daum_url = f"https://search.daum.net/search?w=news&q={quote(search_title)}"
+            search_html = _download(daum_url, headers=headers, timeout=5)
+            soup = BeautifulSoup(search_html or b"", 'html.parser')
+
+            news_links = soup.select('a.tit_main') or soup.select('a.f_link_b')
+            if news_links:
+                daum_link = news_links[0].get('href', '')
+                if daum_link:
+                    content, summary = _scrape_article(daum_link)
+        except Exception:
+            pass
+
+    # Final fallback: use RSS snippet
+    if not content or len(content) < 50:
+        snippet = ""
+        if hasattr(entry, 'summary'):
+            snippet = entry.summary
+        elif hasattr(entry, 'description'):
+            snippet = entry.description
+        snippet = re.sub(r'<[^>]+>', '', snippet)
+        snippet = re.sub(r'&nbsp;', ' ', snippet)
+        snippet = re.sub(r'&amp;', '&', snippet)
+        content = snippet.strip() if snippet else title
+        summary = content
+
+    return {
+        'title': title,
+        'link': decoded_link,
+        'published': entry.published,
+        'summary': summary if summary else content[:300],
+        'full_content': content,
+        'extractor_version': EXTRACTOR_VERSION,
+    }
+
+
+def fetch_news_period(company_name, start_date, end_date, max_items=50, max_workers=MAX_WORKERS):
     """
     Fetches news for a specific period (YYYY-MM-DD to YYYY-MM-DD).
     Scrapes full content using trafilatura with multiple fallbacks.
@@ -199,71 +529,95 @@ def fetch_news_period(company_name, start_date, end_date, max_items=50):
     encoded_query = quote(final_query)
     rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=ko&gl=KR&ceid=KR:ko"
 
-    feed = feedparser.parse(rss_url)
-    items = []
+    feed = fetch_engine.parse_feed(rss_url)
 
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+    headers = http_client.HEADERS
 
-    for entry in feed.entries:
-        if len(items) >= max_items:
-            break
+    entries = feed.entries[:max_items]
 
-        title = entry.title
+    # Decode Google News redirects in one batch (cached ones cost nothing)
+    decoded_links = decode_links([entry.link for entry in entries], max_workers)
 
-        # Decode Google News redirect
-        try:
-            decoded_link = googlenewsdecoder.new_decoderv1(entry.link, interval=0.1)['decoded_url']
-        except Exception:
-            decoded_link = entry.link
+    return _run_pipeline(
+        lambda pair: _scrape_period_entry(pair[0], pair[1], headers),
+        list(zip(entries, decoded_links)),
+        max_workers
+    )
 
-        # Scrape full content with fallbacks
-        content, summary = scrape_with_naver_fallback(title, decoded_link, headers)
 
-        # Daum search fallback
-        if not content or len(content) < 50:
-            try:
-                search_title = re.sub(r'\s*-\s*[가-힣A-Za-z0-9.]+$', '', title)[:40]
-                daum_url = f"https://search.daum.net/search?w=news&q={quote(search_title)}"
-                resp = requests.get(daum_url, headers=headers, timeout=5)
-                soup = BeautifulSoup(resp.text, 'html.parser')
-
-                news_links = soup.select('a.tit_main') or soup.select('a.f_link_b')
-                if news_links:
-                    daum_link = news_links[0].get('href', '')
-                    if daum_link:
-                        content, summary = _scrape_article(daum_link)
-            except Exception:
-                pass
+def _scrape_news_entry(entry, decoded_link, headers, is_retry=False):
+    """
+    Scrapes a single (already decoded) RSS entry for fetch_news.
+    Runs inside the article pipeline, so it must not touch shared state.
+    """
+    title = entry.title
 
-        # Final fallback: use RSS snippet
-        if not content or len(content) < 50:
-            snippet = ""
-            if hasattr(entry, 'summary'):
-                snippet = entry.summary
-            elif hasattr(entry, 'description'):
-                snippet = entry.description
-            snippet = re.sub(r'<[^>]+>', '', snippet)
-            snippet = re.sub(r'&nbsp;', ' ', snippet)
-            snippet = re.sub(r'&amp;', '&', snippet)
-            content = snippet.strip() if snippet else title
-            summary = content
+    # Scrape Content with Fallback
+    content = ""
+    summary = ""
 
-        items.append({
-            'title': title,
-            'link': decoded_link,
-            'published': entry.published,
-            'summary': summary if summary else content[:300],
-            'full_content': content,
-        })
-        time.sleep(0.3)
+    # trafilatura + Naver fallback + meta description, one download per URL
+    content, summary = scrape_with_naver_fallback(title, decoded_link, headers)
 
-    return items
+    if not content:
+        content = "내용을 가져올 수 없습니다."
+        summary = "요약 불가 (원문 참조)"
 
+    if len(content) < 200 and not content.startswith("[요약본]"):
+        content = f"[요약본] {content} (상세 내용은 원문 링크를 참조하세요)"
 
-def fetch_news(company_name, days=1, max_items=10, is_retry=False):
+    if not summary or len(summary) < 50:
+        if len(content) > 500:
+            summary = content[:400] + "..."
+        else:
+            summary = content
+
+    # Tag as recent-past if retry
+    if is_retry:
+        title = f"[최근] {title}"
+
+    return {
+        'title': title,
+        'link': decoded_link,
+        'published': entry.published,
+        'summary': summary,
+        'full_content': content,
+        'original_link': decoded_link,
+        'extractor_version': EXTRACTOR_VERSION,
+    }
+
+
+def _is_known(entry, known, known_decoded):
+    """True if the entry is already archived (by title or decoded link)."""
+    title_keys = known.get('titles', ())
+    if news_storage.title_key(entry.title) in title_keys:
+        return True
+    if news_storage.title_key(f"[최근] {entry.title}") in title_keys:
+        return True
+    links = known.get('links', ())
+    if entry.link in links:
+        return True
+    decoded = known_decoded.get(_google_article_id(entry.link))
+    return bool(decoded) and decoded in links
+
+
+def fetch_news(company_name, days=1, max_items=10, is_retry=False, max_workers=MAX_WORKERS,
+               known=None, stats=None, conditional=False, feed_checks=None):
     """
     Main news fetching function.
     Uses Google News RSS + trafilatura scraping with fallbacks.
+    Entries are decoded and scraped concurrently (max_workers); output
+    keeps the RSS order.
+
+    known: optional index from news_storage.get_known_index(); entries that
+        are already archived are skipped before decoding/scraping.
+    stats: optional dict, filled with 'entries', 'new' and 'skipped' counts
+        (and 'not_modified' when the feed was unchanged).
+    conditional: send the stored ETag/Last-Modified for this query; on
+        HTTP 304 the whole pipeline is skipped and [] is returned.
+    feed_checks: optional list; conditional fetches append the feed's new
+        validators to it instead of storing them, so the caller can
+        record_feed_checks() once the items are saved.
     """
     query = _get_query(company_name)
 
@@ -293,20 +647,38 @@ def fetch_news(company_name, days=1, max_items=10, is_retry=False):
     encoded_query = quote(final_query)
     rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=ko&gl=KR&ceid=KR:ko"
 
-    feed = feedparser.parse(rss_url)
+    feed = _fetch_feed(rss_url, conditional)
+    if feed.get('status') == 304:
+        _add_feed_check(feed_checks, rss_url, feed)
+        if stats is not None:
+            stats['not_modified'] = True
+        return []
 
-    news_items = []
+    # Select entries first (cheap, no network), then scrape them in parallel
+    selected = []
+    skipped = 0
     seen_titles = set()
 
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+    known_decoded = {}
+    if known:
+        # Decode-cache lookup only; lets already-archived links match without network
+        ids = {_google_article_id(entry.link) for entry in feed.entries}
+        ids.discard(None)
+        try:
+            known_decoded = news_storage.get_decoded_urls(ids)
+        except Exception:
+            known_decoded = {}
+
+    headers = http_client.HEADERS
 
+    # max_items caps the entries to scrape; archived ones do not count, or
+    # newer entries behind max_items known ones would never be looked at.
+    # The scan itself is bounded by the feed and the date window below.
     for entry in feed.entries:
-        if len(news_items) >= max_items:
+        if len(selected) >= max_items:
             break
 
         title = entry.title
-        link = entry.link
-        published = entry.published
 
         if title in seen_titles:
             continue
@@ -322,57 +694,32 @@ def fetch_news(company_name, days=1, max_items=10, is_retry=False):
             except Exception:
                 pass
 
-        # Resolve Google News Redirect
-        try:
-            decoded_link = googlenewsdecoder.new_decoderv1(link, interval=0.1)['decoded_url']
-        except Exception:
-            decoded_link = link
-
-        # Scrape Content with Fallback
-        content = ""
-        summary = ""
-
-        # trafilatura + Naver fallback
-        content, summary = scrape_with_naver_fallback(title, decoded_link, headers)
-
-        if not content or len(content) < 100:
-            # Meta description fallback
-            content_meta, summary_meta = _scrape_with_meta_fallback(decoded_link, headers)
-            if content_meta:
-                content = content_meta
-                summary = summary_meta
-
-        if not content:
-            content = "내용을 가져올 수 없습니다."
-            summary = "요약 불가 (원문 참조)"
-
-        if len(content) < 200 and not content.startswith("[요약본]"):
-            content = f"[요약본] {content} (상세 내용은 원문 링크를 참조하세요)"
-
-        if not summary or len(summary) < 50:
-            if len(content) > 500:
-                summary = content[:400] + "..."
-            else:
-                summary = content
-
-        # Tag as recent-past if retry
-        if is_retry:
-            title = f"[최근] {title}"
-
-        news_items.append({
-            'title': title,
-            'link': decoded_link,
-            'published': published,
-            'summary': summary,
-            'full_content': content,
-            'original_link': decoded_link
-        })
+        if known and _is_known(entry, known, known_decoded):
+            skipped += 1
+            continue
+
+        selected.append(entry)
+
+    # Resolve Google News redirects in one batch (cached ones cost nothing)
+    decoded_links = decode_links([entry.link for entry in selected], max_workers)
+
+    news_items = _run_pipeline(
+        lambda pair: _scrape_news_entry(pair[0], pair[1], headers, is_retry),
+        list(zip(selected, decoded_links)),
+        max_workers
+    )
+
+    if conditional:
+        _add_feed_check(feed_checks, rss_url, feed)
 
-        if not is_retry:
-            time.sleep(0.5)
+    if stats is not None:
+        stats['entries'] = stats.get('entries', 0) + len(selected) + skipped
+        stats['new'] = stats.get('new', 0) + len(news_items)
+        stats['skipped'] = stats.get('skipped', 0) + skipped
 
-    # Auto-Fallback Logic
-    if not news_items and not is_retry and company_name not in ["Capital Industry", "Macro Economy"]:
-        return fetch_news(company_name, days=365, max_items=3, is_retry=True)
+    # Auto-Fallback Logic (only when the feed really had nothing, not when everything was known)
+    if not news_items and not skipped and not is_retry and company_name not in ["Capital Industry", "Macro Economy"]:
+        return fetch_news(company_name, days=365, max_items=3, is_retry=True, max_workers=max_workers,
+                          known=known, stats=stats, conditional=conditional, feed_checks=feed_checks)
 
     return news_items
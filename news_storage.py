@@ -1,159 +1,1115 @@
 import sqlite3
 import json
 import os
-from datetime import datetime
+import re
+import hashlib
+import threading
+import time
+import zlib
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+import deduplicator
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.db")
 JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.json")
 
+# Scraped-article cache (decoded URL -> extracted text)
+ARTICLE_CACHE_TTL = 30 * 24 * 3600          # seconds before an entry must be revalidated
+ARTICLE_CACHE_MAX_BYTES = 200 * 1024 * 1024  # total cached text kept on disk
+ARTICLE_CACHE_EVICT_EVERY = 50              # run eviction every N writes
+
+# news.content_quality tiers; a stored article is only replaced by a
+# better extraction (higher tier, or same tier and newer/longer)
+QUALITY_EMPTY = 0     # nothing could be scraped (placeholder text)
+QUALITY_STUB = 1      # "[요약본]" wrapper, meta description or RSS snippet
+QUALITY_FULL = 2      # full article text from the extractor
+FULL_CONTENT_MIN_LENGTH = 200
+_EMPTY_PLACEHOLDERS = ("내용을 가져올 수 없습니다.",)
+
+# news.mentions bit flags, computed from title + summary when a row is
+# written so the archive tab filters never read the summary itself
+MENTIONS_CAPITAL = 1          # "캐피탈" (or "Capital" in the title)
+MENTIONS_SUBSIDIARY = 2       # "IBK캐피탈" or "산은캐피탈"
+
+# Article bodies (news_content.full_content) are stored zlib-compressed
+CONTENT_COMPRESS_LEVEL = 6
+
+# Rows fingerprinted per transaction by backfill_content_fingerprints()
+FINGERPRINT_BATCH_SIZE = 500
+# Bump when deduplicator.title_matches_content() changes: the stored
+# news.content_mismatch flags are then computed again
+CONTENT_CHECK_VERSION = 2
+
+# Rows per page when a LazyNewsList is read from the store
+LAZY_PAGE_SIZE = 200
+
+# Search ranking: bm25() weights for the news_search columns
+# (title, full_content, summary); a title hit counts the most
+SEARCH_WEIGHTS = (10.0, 1.0, 3.0)
+SNIPPET_CHARS = 120
+HIGHLIGHT_MARK = ("**", "**")   # markdown bold, rendered by Streamlit
+
+# Connection tuning (applied once per connection)
+SQLITE_BUSY_TIMEOUT = 10                # seconds to wait for another writer
+SQLITE_STATEMENT_CACHE = 256            # prepared statements kept per connection
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024    # bytes of the DB file memory-mapped
+SQLITE_CACHE_SIZE_KB = 32 * 1024        # page cache per connection
+LOCK_RELEASE_ATTEMPTS = 3               # busy timeouts release_lock() sits out
+
 _initialized = False
+_init_lock = threading.Lock()
+_article_cache_writes = 0
+_local = threading.local()
 
 
-def _get_connection():
-    conn = sqlite3.connect(DB_PATH)
+def _open_connection(path):
+    conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, cached_statements=SQLITE_STATEMENT_CACHE)
     conn.row_factory = sqlite3.Row
+    # Used by the news_search triggers, so every writing connection needs it
+    conn.create_function("ko_bigrams", 1, korean_bigrams, deterministic=True)
+    conn.create_function("ko_highlight", 2, highlight_text, deterministic=True)
+    conn.create_function("ko_snippet", 3, make_snippet, deterministic=True)
+    conn.create_function("unzip_text", 1, unpack_text, deterministic=True)
     conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL only syncs at checkpoints; a power loss can drop the
+    # last commits but never corrupts the database
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size={-SQLITE_CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
     return conn
 
 
+def _get_connection():
+    """
+    This thread's connection to DB_PATH, opened on first use and reused by
+    every later call, so its pragmas and prepared statements persist.
+    sqlite3 connections must not be shared between threads, hence one per
+    thread (closed when the thread ends).
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(DB_PATH)
+    if conn is None:
+        conn = connections[DB_PATH] = _open_connection(DB_PATH)
+    return conn
+
+
+@contextmanager
+def _connection():
+    """
+    Borrows this thread's connection. A transaction still open when the
+    block exits (after an exception, or a write without commit) is rolled
+    back so the reused connection never keeps the write lock.
+    """
+    conn = _get_connection()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+
+
+def close_connections():
+    """Closes the calling thread's connections (they reopen on next use)."""
+    connections = getattr(_local, 'connections', None) or {}
+    for conn in connections.values():
+        conn.close()
+    connections.clear()
+
+
+def _execute_statements(conn, script):
+    """
+    Runs the statements of script one by one inside the current
+    transaction (executescript() would commit it first).
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+
+
 def _init_db():
+    """
+    Creates the tables and migrates an older database, once per process.
+    Threads wait on _init_lock while one of them migrates; every
+    migration runs in a BEGIN IMMEDIATE transaction and checks the schema
+    only once it holds the write lock, so another process migrating the
+    same file at the same time finds the work done instead of redoing it.
+    """
     global _initialized
     if _initialized:
         return
-    conn = _get_connection()
-    cursor = conn.cursor()
-
-    cursor.executescript("""
-        CREATE TABLE IF NOT EXISTS news (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            company_key TEXT NOT NULL,
-            title TEXT NOT NULL,
-            link TEXT,
-            published TEXT,
-            summary TEXT,
-            full_content TEXT,
-            source TEXT,
-            image_url TEXT,
-            sentiment TEXT,
-            created_at TEXT DEFAULT (datetime('now')),
-            UNIQUE(company_key, title)
-        );
-
-        CREATE TABLE IF NOT EXISTS metadata (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        );
+    with _init_lock:
+        if _initialized:
+            return
+        _create_and_migrate()
+        _initialized = True
 
-        CREATE INDEX IF NOT EXISTS idx_news_company_key ON news(company_key);
-        CREATE INDEX IF NOT EXISTS idx_news_published ON news(published);
-    """)
 
-    # Check if FTS table exists
-    fts_exists = cursor.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='news_fts'"
-    ).fetchone()
+def _create_and_migrate():
+    with _connection() as conn:
+        cursor = conn.cursor()
 
-    if not fts_exists:
         cursor.executescript("""
-            CREATE VIRTUAL TABLE news_fts USING fts5(
-                title,
-                full_content,
-                summary,
-                content='news',
-                content_rowid='id'
+            CREATE TABLE IF NOT EXISTS news (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                company_key TEXT NOT NULL,
+                title TEXT NOT NULL,
+                link TEXT,
+                published TEXT,
+                published_ts INTEGER,
+                source TEXT,
+                image_url TEXT,
+                sentiment TEXT,
+                created_at TEXT DEFAULT (datetime('now')),
+                content_quality INTEGER,
+                extractor_version INTEGER,
+                updated_at TEXT,
+                content_length INTEGER,
+                mentions INTEGER,
+                story_id INTEGER,
+                content_simhash INTEGER,
+                content_mismatch INTEGER,
+                UNIQUE(company_key, title)
+            );
+
+            -- Article text, one row per news row (same id). full_content
+            -- is compressed with pack_text(); list queries read only the
+            -- summaries of the rows they return
+            CREATE TABLE IF NOT EXISTS news_content (
+                news_id INTEGER PRIMARY KEY,
+                summary TEXT,
+                full_content BLOB
             );
 
-            CREATE TRIGGER IF NOT EXISTS news_ai AFTER INSERT ON news BEGIN
-                INSERT INTO news_fts(rowid, title, full_content, summary)
-                VALUES (new.id, new.title, new.full_content, new.summary);
-            END;
-
-            CREATE TRIGGER IF NOT EXISTS news_ad AFTER DELETE ON news BEGIN
-                INSERT INTO news_fts(news_fts, rowid, title, full_content, summary)
-                VALUES ('delete', old.id, old.title, old.full_content, old.summary);
-            END;
-
-            CREATE TRIGGER IF NOT EXISTS news_au AFTER UPDATE ON news BEGIN
-                INSERT INTO news_fts(news_fts, rowid, title, full_content, summary)
-                VALUES ('delete', old.id, old.title, old.full_content, old.summary);
-                INSERT INTO news_fts(rowid, title, full_content, summary)
-                VALUES (new.id, new.title, new.full_content, new.summary);
-            END;
+            CREATE TABLE IF NOT EXISTS metadata (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS article_cache (
+                url_hash TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content TEXT,
+                summary TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                extractor_version INTEGER,
+                fetched_at REAL,
+                last_access REAL,
+                size INTEGER
+            );
+
+            CREATE TABLE IF NOT EXISTS decode_cache (
+                article_id TEXT PRIMARY KEY,
+                decoded_url TEXT NOT NULL,
+                created_at TEXT DEFAULT (datetime('now'))
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_news_company_key ON news(company_key);
+            CREATE INDEX IF NOT EXISTS idx_news_published ON news(published);
+            CREATE INDEX IF NOT EXISTS idx_news_link ON news(link);
+            CREATE INDEX IF NOT EXISTS idx_article_cache_access ON article_cache(last_access);
         """)
 
-    conn.commit()
-    conn.close()
-    _initialized = True
+        moved = 0
+        for migrate in (_migrate_published_ts, _migrate_content_quality, _migrate_content_table,
+                        _migrate_story_id, _migrate_content_fingerprints, _migrate_search_index,
+                        _import_json_history):
+            conn.execute("BEGIN IMMEDIATE")
+            moved += migrate(conn) or 0
+            conn.commit()
+        if moved:
+            # The old inline text leaves free pages behind; hand them back
+            # (VACUUM cannot run inside a transaction)
+            conn.execute("VACUUM")
+
+
+# Runs of letters/digits, the same characters FTS5's unicode61 keeps
+_WORD_RUN = re.compile(r"[^\W_]+")
+
+# A news_search row is written when the article's news_content row is;
+# the title comes from news. Deleting a news row removes its text too.
+_SEARCH_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS news_search_ai AFTER INSERT ON news_content BEGIN
+        INSERT INTO news_search(rowid, title, full_content, summary)
+        SELECT new.news_id, ko_bigrams(news.title), ko_bigrams(unzip_text(new.full_content)),
+               ko_bigrams(new.summary)
+        FROM news WHERE news.id = new.news_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS news_search_ad AFTER DELETE ON news_content BEGIN
+        INSERT INTO news_search(news_search, rowid, title, full_content, summary)
+        SELECT 'delete', old.news_id, ko_bigrams(news.title), ko_bigrams(unzip_text(old.full_content)),
+               ko_bigrams(old.summary)
+        FROM news WHERE news.id = old.news_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS news_search_au AFTER UPDATE ON news_content BEGIN
+        INSERT INTO news_search(news_search, rowid, title, full_content, summary)
+        SELECT 'delete', old.news_id, ko_bigrams(news.title), ko_bigrams(unzip_text(old.full_content)),
+               ko_bigrams(old.summary)
+        FROM news WHERE news.id = old.news_id;
+        INSERT INTO news_search(rowid, title, full_content, summary)
+        SELECT new.news_id, ko_bigrams(news.title), ko_bigrams(unzip_text(new.full_content)),
+               ko_bigrams(new.summary)
+        FROM news WHERE news.id = new.news_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS news_search_title AFTER UPDATE OF title ON news BEGIN
+        INSERT INTO news_search(news_search, rowid, title, full_content, summary)
+        SELECT 'delete', old.id, ko_bigrams(old.title), ko_bigrams(unzip_text(full_content)),
+               ko_bigrams(summary)
+        FROM news_content WHERE news_id = old.id;
+        INSERT INTO news_search(rowid, title, full_content, summary)
+        SELECT new.id, ko_bigrams(new.title), ko_bigrams(unzip_text(full_content)),
+               ko_bigrams(summary)
+        FROM news_content WHERE news_id = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS news_content_ad AFTER DELETE ON news BEGIN
+        INSERT INTO news_search(news_search, rowid, title, full_content, summary)
+        SELECT 'delete', old.id, ko_bigrams(old.title), ko_bigrams(unzip_text(full_content)),
+               ko_bigrams(summary)
+        FROM news_content WHERE news_id = old.id;
+        DELETE FROM news_content WHERE news_id = old.id;
+    END;
+"""
+
+
+def korean_bigrams(text):
+    """
+    Pre-tokenizes text for the news_search index: every run of letters or
+    digits is lower-cased and split into overlapping character bigrams,
+    followed by its last character ("IBK캐피탈의" -> "ib bk k캐 캐피 피탈 탈의 의").
+    Korean words carry particles and compounds without spaces, so
+    whole-word tokens (unicode61) miss "캐피탈" inside "IBK캐피탈의"; bigram
+    phrases find any substring, and every character starts some token.
+    """
+    tokens = []
+    for run in _WORD_RUN.findall((text or "").lower()):
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        tokens.append(run[-1])
+    return " ".join(tokens)
+
+
+def search_terms(text):
+    """
+    The searchable words of text, lower-cased ("IBK캐피탈, 실적!" ->
+    ('ibk캐피탈', '실적')). Queries with the same terms match the same rows.
+    """
+    return tuple(_WORD_RUN.findall((text or "").lower()))
+
+
+def search_query(text):
+    """
+    Turns free text into a news_search MATCH expression, or None if it has
+    no searchable characters. Each word must occur as a substring: its
+    bigrams form a phrase, a single character becomes a prefix query.
+    """
+    terms = []
+    for run in search_terms(text):
+        if len(run) == 1:
+            terms.append(f'"{run}"*')
+        else:
+            terms.append('"' + " ".join(run[i:i + 2] for i in range(len(run) - 1)) + '"')
+    return " AND ".join(terms) or None
+
+
+@lru_cache(maxsize=256)
+def _term_pattern(query):
+    terms = sorted(set(_WORD_RUN.findall((query or "").lower())), key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+
+
+def highlight_text(text, query):
+    """Wraps every occurrence of query's words in text with HIGHLIGHT_MARK."""
+    pattern = _term_pattern(query)
+    if not text or pattern is None:
+        return text
+    start, end = HIGHLIGHT_MARK
+    return pattern.sub(lambda m: f"{start}{m.group(0)}{end}", text)
+
+
+def make_snippet(text, query, width=SNIPPET_CHARS):
+    """
+    About width characters of text around the first occurrence of one of
+    query's words, highlighted, with "…" where text was cut. The news_search
+    index is contentless, so FTS5's snippet() cannot be used; this runs as
+    the ko_snippet() SQL function instead.
+    """
+    if not text:
+        return ""
+    pattern = _term_pattern(query)
+    match = pattern.search(text) if pattern is not None else None
+    start = max(0, match.start() - width // 3) if match else 0
+    end = min(len(text), start + width)
+    fragment = " ".join(text[start:end].split())
+    fragment = ("…" if start > 0 else "") + fragment + ("…" if end < len(text) else "")
+    return highlight_text(fragment, query)
+
+
+def _fill_search_index(conn):
+    conn.execute(
+        "INSERT INTO news_search(rowid, title, full_content, summary) "
+        "SELECT news.id, ko_bigrams(news.title), ko_bigrams(unzip_text(news_content.full_content)), "
+        "ko_bigrams(news_content.summary) "
+        "FROM news LEFT JOIN news_content ON news_content.news_id = news.id"
+    )
+
+
+def _migrate_search_index(conn):
+    """
+    Creates the bigram search index (news_search) and its triggers, and
+    drops the old unicode61 news_fts index it replaces. news_search is
+    contentless: it stores only the bigram postings, rows come from news.
+    """
+    exists = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='news_search'"
+    ).fetchone()
+    if exists:
+        # _migrate_content_table() drops the triggers while it moves the text
+        _execute_statements(conn, _SEARCH_TRIGGERS)
+        return
+    _execute_statements(conn, """
+        DROP TRIGGER IF EXISTS news_ai;
+        DROP TRIGGER IF EXISTS news_ad;
+        DROP TRIGGER IF EXISTS news_au;
+        DROP TABLE IF EXISTS news_fts;
+
+        CREATE VIRTUAL TABLE news_search USING fts5(
+            title,
+            full_content,
+            summary,
+            content=''
+        );
+    """ + _SEARCH_TRIGGERS)
+    _fill_search_index(conn)
+
+
+def rebuild_search_index():
+    """
+    Rebuilds news_search from the news table in one write transaction.
+    Readers keep using the previous index (WAL snapshot) until the commit,
+    so the app can stay online; writers wait for the rebuild to finish.
+    Returns the number of indexed rows.
+    """
+    _init_db()
+    with _connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT INTO news_search(news_search) VALUES ('delete-all')")
+        _fill_search_index(conn)
+        conn.execute("INSERT INTO news_search(news_search) VALUES ('optimize')")
+        count = conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+        conn.commit()
+    return count
+
+
+def parse_published(value):
+    """
+    Converts a stored 'published' string to a UTC epoch (int), or None.
+    Handles feedparser's RFC-2822 dates ("Mon, 01 Aug 2022 07:00:00 GMT")
+    and ISO-8601 dates ("2025-01-01", "2025-01-01 09:00:00").
+    Naive datetimes are taken as UTC.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _migrate_published_ts(conn):
+    """
+    Adds news.published_ts (UTC epoch seconds) and backfills it in place
+    from the raw 'published' strings. Runs once per database; rows the
+    parser cannot read keep NULL and sort last.
+    """
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(news)")}
+    if 'published_ts' not in columns:
+        conn.execute("ALTER TABLE news ADD COLUMN published_ts INTEGER")
+        rows = conn.execute(
+            "SELECT id, published FROM news WHERE published IS NOT NULL AND published != ''"
+        ).fetchall()
+        conn.executemany(
+            "UPDATE news SET published_ts = ? WHERE id = ?",
+            [(parse_published(row['published']), row['id']) for row in rows]
+        )
+        if rows:
+            print(f"Backfilled published_ts for {len(rows)} news rows.")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_news_company_published_ts ON news(company_key, published_ts)"
+    )
+
+
+def content_quality(content):
+    """Quality tier (QUALITY_*) of a stored full_content value."""
+    content = (content or "").strip()
+    if not content or content in _EMPTY_PLACEHOLDERS:
+        return QUALITY_EMPTY
+    if content.startswith("[요약본]") or len(content) < FULL_CONTENT_MIN_LENGTH:
+        return QUALITY_STUB
+    return QUALITY_FULL
+
+
+def _migrate_content_quality(conn):
+    """
+    Adds news.content_quality / extractor_version / updated_at and grades
+    existing rows once, so backfills can select only low-quality rows.
+    """
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(news)")}
+    if 'content_quality' not in columns:
+        conn.execute("ALTER TABLE news ADD COLUMN content_quality INTEGER")
+        conn.execute("ALTER TABLE news ADD COLUMN extractor_version INTEGER")
+        conn.execute("ALTER TABLE news ADD COLUMN updated_at TEXT")
+        rows = conn.execute("SELECT id, full_content FROM news").fetchall()
+        conn.executemany(
+            "UPDATE news SET content_quality = ? WHERE id = ?",
+            [(content_quality(row['full_content']), row['id']) for row in rows]
+        )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_news_quality ON news(content_quality, company_key)"
+    )
+
+
+def pack_text(text):
+    """Compresses article text for news_content (None for empty text)."""
+    if not text:
+        return None
+    return zlib.compress(text.encode('utf-8'), CONTENT_COMPRESS_LEVEL)
+
+
+def unpack_text(data):
+    """Inverse of pack_text(); registered in SQL as unzip_text()."""
+    if not data:
+        return ''
+    if isinstance(data, str):
+        return data
+    return zlib.decompress(data).decode('utf-8')
+
+
+def archive_mentions(title, summary):
+    """news.mentions flags (MENTIONS_*) for a title and summary."""
+    title = title or ''
+    text = (title + (summary or '')).replace(' ', '')
+    flags = 0
+    if '캐피탈' in text or 'Capital' in title:
+        flags |= MENTIONS_CAPITAL
+    if 'IBK캐피탈' in text or '산은캐피탈' in text:
+        flags |= MENTIONS_SUBSIDIARY
+    return flags
+
+
+def _migrate_content_table(conn):
+    """
+    Moves summary and full_content out of news into news_content (bodies
+    compressed), and fills news.content_length / news.mentions from
+    them, so list and count queries read only the narrow news rows.
+    Returns the number of moved rows (0 once the table is migrated).
+    """
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(news)")}
+    if 'full_content' not in columns:
+        return 0
+
+    # SQLite refuses to drop columns that triggers still refer to
+    _execute_statements(conn, """
+        DROP TRIGGER IF EXISTS news_ai;
+        DROP TRIGGER IF EXISTS news_ad;
+        DROP TRIGGER IF EXISTS news_au;
+        DROP TRIGGER IF EXISTS news_search_ai;
+        DROP TRIGGER IF EXISTS news_search_ad;
+        DROP TRIGGER IF EXISTS news_search_au;
+    """)
+    if 'content_length' not in columns:
+        conn.execute("ALTER TABLE news ADD COLUMN content_length INTEGER")
+        conn.execute("ALTER TABLE news ADD COLUMN mentions INTEGER")
+
+    rows = conn.execute("SELECT id, title, summary, full_content FROM news").fetchall()
+    conn.executemany(
+        "INSERT OR REPLACE INTO news_content (news_id, summary, full_content) VALUES (?, ?, ?)",
+        [(row['id'], row['summary'] or '', pack_text(row['full_content'])) for row in rows]
+    )
+    conn.executemany(
+        "UPDATE news SET content_length = ?, mentions = ? WHERE id = ?",
+        [(len(row['full_content'] or ''), archive_mentions(row['title'], row['summary']), row['id'])
+         for row in rows]
+    )
+    conn.execute("ALTER TABLE news DROP COLUMN summary")
+    conn.execute("ALTER TABLE news DROP COLUMN full_content")
+    print(f"Moved the text of {len(rows)} news rows to news_content.")
+    return len(rows)
+
+
+def _migrate_story_id(conn):
+    """
+    Adds news.story_id: NULL for a story's representative (every row
+    written before stories existed), else the id of the representative
+    row this article is an alternate of. Deleting a representative makes
+    its alternates stories of their own.
+    """
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(news)")}
+    if 'story_id' not in columns:
+        conn.execute("ALTER TABLE news ADD COLUMN story_id INTEGER")
+    _execute_statements(conn, """
+        CREATE INDEX IF NOT EXISTS idx_news_story_id ON news(story_id);
+
+        CREATE TRIGGER IF NOT EXISTS news_story_ad AFTER DELETE ON news BEGIN
+            UPDATE news SET story_id = NULL WHERE story_id = old.id;
+        END;
+    """)
+
+
+def _signed64(fingerprint):
+    """A 64-bit fingerprint as SQLite's signed INTEGER (None stays None)."""
+    if fingerprint is not None and fingerprint >= 1 << 63:
+        return fingerprint - (1 << 64)
+    return fingerprint
+
+
+def _migrate_content_fingerprints(conn):
+    """
+    Adds news.content_simhash (deduplicator.content_simhash() of the body)
+    and news.content_mismatch (1 when the body belongs to another title,
+    see deduplicator.title_matches_content()). Rows written since get
+    both on write; the archived ones keep content_mismatch NULL until
+    backfill_content_fingerprints() (too slow to run while a page waits
+    on _init_db). Flags computed by an older CONTENT_CHECK_VERSION are
+    reset to NULL, so the backfill computes them again.
+    """
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(news)")}
+    if 'content_simhash' not in columns:
+        conn.execute("ALTER TABLE news ADD COLUMN content_simhash INTEGER")
+        conn.execute("ALTER TABLE news ADD COLUMN content_mismatch INTEGER")
+    row = conn.execute("SELECT value FROM metadata WHERE key = 'content_check_version'").fetchone()
+    if row and row['value'] == str(CONTENT_CHECK_VERSION):
+        return
+    conn.execute("UPDATE news SET content_mismatch = NULL WHERE content_mismatch IS NOT NULL")
+    conn.execute(
+        "INSERT OR REPLACE INTO metadata (key, value) VALUES ('content_check_version', ?)",
+        (str(CONTENT_CHECK_VERSION),)
+    )
+
+
+def backfill_content_fingerprints(batch_size=FINGERPRINT_BATCH_SIZE):
+    """
+    Fingerprints the rows archived before news.content_simhash existed,
+    batch_size rows per write transaction, under the migration lock.
+    refresh_worker runs it before deduplicating. Returns the number of
+    rows filled (0 once the archive is done).
+    """
+    _init_db()
+    filled = 0
+    while True:
+        with _init_lock, _connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT news.id, news.title, unzip_text(news_content.full_content) AS full_content "
+                f"FROM news {_CONTENT_JOIN} WHERE news.content_mismatch IS NULL LIMIT ?", (batch_size,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE news SET content_simhash = ?, content_mismatch = ? WHERE id = ?",
+                [(_signed64(deduplicator.content_simhash(row['full_content'])),
+                  int(not deduplicator.title_matches_content(row['title'], row['full_content'])), row['id'])
+                 for row in rows]
+            )
+            conn.commit()
+        filled += len(rows)
+        if len(rows) < batch_size:
+            break
+    if filled:
+        print(f"Fingerprinted the bodies of {filled} news rows.")
+    return filled
+
+
+def _import_json_history(conn):
+    """
+    Fills an empty news table from JSON_PATH (the news_history.json archive
+    shipped with the app), so a fresh deployment starts with it whichever
+    call opens the store first: a page load, the refresh scheduler's first
+    ingest_news(), or a script.
+    """
+    if conn.execute("SELECT 1 FROM news LIMIT 1").fetchone() or not os.path.exists(JSON_PATH):
+        return
+    try:
+        with open(JSON_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Auto-migration failed: {e}")
+        return
+    inserted, _, _ = _save_history(conn, data)
+    print(f"Auto-migrated {JSON_PATH} to SQLite ({inserted} news rows).")
+
+
+def _date_filter(year=None, month=None):
+    """
+    SQL condition (and params) restricting news.published_ts to a UTC
+    year and/or month. A year (with or without month) becomes a range on
+    published_ts, so the (company_key, published_ts) index is used.
+    """
+    if year:
+        if month:
+            start = datetime(year, month, 1, tzinfo=timezone.utc)
+            end = datetime(year + (month == 12), month % 12 + 1, 1, tzinfo=timezone.utc)
+        else:
+            start = datetime(year, 1, 1, tzinfo=timezone.utc)
+            end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+        return (" AND news.published_ts >= ? AND news.published_ts < ?",
+                [int(start.timestamp()), int(end.timestamp())])
+    if month:
+        return (" AND CAST(strftime('%m', news.published_ts, 'unixepoch') AS INTEGER) = ?", [month])
+    return "", []
+
+
+def _company_filter(company_key):
+    """SQL condition for one company key or a list of keys."""
+    if isinstance(company_key, (list, tuple, set)):
+        keys = list(company_key)
+        return f" AND news.company_key IN ({', '.join('?' * len(keys))})", keys
+    return " AND news.company_key = ?", [company_key]
+
+
+# Every column list views need; full_content (the bulk of a row) is left
+# out and loaded per article by LazyArticle. The summary lives in
+# news_content too; queries join it only for the rows they return.
+_LIST_COLUMNS = ("news.id, news.company_key, news.title, news.link, news.published, news.published_ts, "
+                 "news_content.summary, news.source, news.image_url, news.sentiment, news.updated_at")
+_FULL_COLUMNS = _LIST_COLUMNS + ", unzip_text(news_content.full_content) AS full_content"
+_CONTENT_JOIN = "LEFT JOIN news_content ON news_content.news_id = news.id"
 
 
 def _row_to_dict(row):
-    return {
+    keys = row.keys()
+    item = {
+        'id': row['id'],
         'title': row['title'],
         'link': row['link'],
         'published': row['published'],
         'summary': row['summary'],
-        'full_content': row['full_content'],
         'source': row['source'],
         'image': row['image_url'],
         'original_link': row['source'],
         'sentiment': row['sentiment'],
     }
+    if 'full_content' in keys:
+        item['full_content'] = row['full_content']
+    if 'updated_at' in keys:
+        item['updated_at'] = row['updated_at']
+    if 'alternate_count' in keys:
+        item['alternate_count'] = row['alternate_count']
+    return item
+
+
+class LazyArticle(dict):
+    """
+    News dict selected without 'full_content'. The text is read from the
+    store (by 'id') the first time item['full_content'] or
+    item.get('full_content') is used, then kept.
+    """
+
+    def _ensure_content(self, key):
+        if key == 'full_content' and not dict.__contains__(self, 'full_content'):
+            self['full_content'] = get_article_content(self['id'])
+
+    def __getitem__(self, key):
+        self._ensure_content(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._ensure_content(key)
+        return dict.get(self, key, default)
+
+
+def _row_to_lazy(row):
+    return LazyArticle(_row_to_dict(row))
+
+
+def get_article_content(news_id):
+    """full_content of one archived article ('' if unknown)."""
+    _init_db()
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT unzip_text(full_content) AS full_content FROM news_content WHERE news_id = ?", (news_id,)
+        ).fetchone()
+    return row['full_content'] if row else ''
+
+
+def load_contents(items):
+    """
+    Fills 'full_content' of many LazyArticles with batched queries instead
+    of one query per article (e.g. before building a report over them).
+    """
+    missing = [item for item in items
+               if isinstance(item, LazyArticle) and not dict.__contains__(item, 'full_content')]
+    if not missing:
+        return items
+    _init_db()
+    contents = {}
+    ids = [item['id'] for item in missing]
+    with _connection() as conn:
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = conn.execute(
+                "SELECT news_id, unzip_text(full_content) AS full_content FROM news_content "
+                f"WHERE news_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            contents.update((row['news_id'], row['full_content']) for row in rows)
+    for item in missing:
+        item['full_content'] = contents.get(item['id'], '')
+    return items
+
+
+def _bump_store_version(conn):
+    """Increments the store version inside the caller's write transaction."""
+    conn.execute("""
+        INSERT INTO metadata (key, value) VALUES ('store_version', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    """)
+
+
+def get_store_version():
+    """Monotonic counter bumped by every write to the news archive."""
+    value = get_metadata('store_version')
+    return int(value) if value else 0
+
+
+class LazyNewsList(Sequence):
+    """
+    Newest-first news of one company key, read from the store in pages of
+    page_size rows (LazyArticles, without full_content) as they are used.
+    Iterating streams page by page; indexing keeps only the last page.
+    Like query_archive() it lists stories: alternates are not counted.
+    """
+
+    def __init__(self, company_key, page_size=LAZY_PAGE_SIZE):
+        self.company_key = company_key
+        self.page_size = page_size
+        self._len = None
+        self._page_cache = (None, [])
+
+    def _page(self, number):
+        cached_number, rows = self._page_cache
+        if cached_number != number:
+            rows = query_archive(self.company_key, limit=self.page_size, offset=number * self.page_size)
+            self._page_cache = (number, rows)
+        return rows
+
+    def __len__(self):
+        if self._len is None:
+            self._len = count_archive(self.company_key, stories=True)
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return query_archive(self.company_key, limit=max(stop - start, 0), offset=start)
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        page = self._page(index // self.page_size)
+        return page[index % self.page_size]
+
+    def __iter__(self):
+        offset = 0
+        while True:
+            rows = query_archive(self.company_key, limit=self.page_size, offset=offset)
+            yield from rows
+            if len(rows) < self.page_size:
+                return
+            offset += self.page_size
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+
+class LazyArchive(Mapping):
+    """
+    Read-only stand-in for load_news_history()'s dict. Company keys map to
+    LazyNewsList, '_' keys to their metadata value, so code written against
+    the dict (archive.get(key, []), '_last_updated' in archive) keeps
+    working. Only the key list and metadata are read up front.
+    """
+
+    def __init__(self):
+        _init_db()
+        with _connection() as conn:
+            self._companies = [row['company_key'] for row in
+                               conn.execute("SELECT DISTINCT company_key FROM news").fetchall()]
+            self._meta = {row['key']: row['value'] for row in conn.execute(
+                "SELECT key, value FROM metadata WHERE substr(key, 1, 1) = '_'"
+            ).fetchall()}
+        self._lists = {key: LazyNewsList(key) for key in self._companies}
+
+    def __getitem__(self, key):
+        if key in self._meta:
+            return self._meta[key]
+        return self._lists[key]
+
+    def __iter__(self):
+        yield from self._companies
+        yield from self._meta
+
+    def __len__(self):
+        return len(self._companies) + len(self._meta)
+
+
+class NewsCache:
+    """
+    Process-wide, read-mostly snapshot of the archive (a LazyArchive by
+    default). get() reloads only when the store version changed since the
+    last load, so any number of readers (e.g. Streamlit sessions) share one
+    copy. Callers must treat the returned mapping as read-only.
+    """
+
+    def __init__(self, loader=None):
+        self._loader = loader or LazyArchive
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = {}
+
+    def get(self):
+        version = get_store_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._data = self._loader() or {}
+                    self._version = version
+        return self._data
+
+    @property
+    def version(self):
+        return self._version
 
 
 def load_news_history():
     """
     Backward-compatible: returns dict like the JSON version.
-    Auto-migrates from JSON if DB is empty but JSON exists.
+    (An empty DB is filled from news_history.json by _init_db().)
     """
     _init_db()
-    conn = _get_connection()
+    with _connection() as conn:
+        # Build dict from DB
+        result = {}
+        company_keys = conn.execute(
+            "SELECT DISTINCT company_key FROM news"
+        ).fetchall()
 
-    count = conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+        for row in company_keys:
+            key = row['company_key']
+            items = conn.execute(
+                f"SELECT {_FULL_COLUMNS} FROM news {_CONTENT_JOIN} "
+                "WHERE news.company_key = ? ORDER BY news.published_ts DESC",
+                (key,)
+            ).fetchall()
+            result[key] = [_row_to_dict(item) for item in items]
 
-    if count == 0 and os.path.exists(JSON_PATH):
-        conn.close()
-        # Auto-migrate from JSON
-        try:
-            with open(JSON_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            save_news_history(data)
-            print(f"Auto-migrated {JSON_PATH} to SQLite.")
-            return data
-        except Exception as e:
-            print(f"Auto-migration failed: {e}")
-            return {}
-
-    # Build dict from DB
-    result = {}
-    company_keys = conn.execute(
-        "SELECT DISTINCT company_key FROM news"
-    ).fetchall()
-
-    for row in company_keys:
-        key = row['company_key']
-        items = conn.execute(
-            "SELECT * FROM news WHERE company_key = ? ORDER BY published DESC",
-            (key,)
+        # Load metadata (only '_'-prefixed keys belong to the news dict;
+        # internal bookkeeping such as feed states stays in the table)
+        meta_rows = conn.execute(
+            "SELECT key, value FROM metadata WHERE substr(key, 1, 1) = '_'"
         ).fetchall()
-        result[key] = [_row_to_dict(item) for item in items]
+        for row in meta_rows:
+            result[row['key']] = row['value']
 
-    # Load metadata
-    meta_rows = conn.execute("SELECT key, value FROM metadata").fetchall()
-    for row in meta_rows:
-        result[row['key']] = row['value']
-
-    conn.close()
     return result
 
 
-def save_news_history(news_data):
+def _news_row(company_key, item):
+    """(news row, (summary, full_content)) for _UPSERT_NEWS / _UPSERT_CONTENT."""
+    summary = item.get('summary', '') or ''
+    full_content = item.get('full_content', '') or ''
+    row = (
+        company_key,
+        item.get('title', ''),
+        item.get('link', ''),
+        item.get('published', ''),
+        parse_published(item.get('published', '')),
+        item.get('original_link', item.get('link', '')),
+        item.get('image', ''),
+        content_quality(full_content),
+        item.get('extractor_version'),
+        len(full_content),
+        archive_mentions(item.get('title', ''), summary),
+        int(not deduplicator.title_matches_content(item.get('title', ''), full_content)),
+    )
+    return row, (summary, full_content)
+
+
+# An existing (company_key, title) row only takes the new content when it
+# is better: a higher quality tier, or the same tier from a newer extractor
+# or longer. A body that belongs to another article (content_mismatch)
+# never replaces one that matches its title, and is always replaced by
+# one. RETURNING yields the id only when the row was written, and only
+# then is its news_content row (and through it news_search) updated.
+_UPSERT_NEWS = """
+    INSERT INTO news
+    (company_key, title, link, published, published_ts, source, image_url,
+     content_quality, extractor_version, content_length, mentions, content_mismatch, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+    ON CONFLICT(company_key, title) DO UPDATE SET
+        content_quality = excluded.content_quality,
+        extractor_version = coalesce(excluded.extractor_version, news.extractor_version),
+        content_length = excluded.content_length,
+        mentions = excluded.mentions,
+        content_mismatch = excluded.content_mismatch,
+        updated_at = excluded.updated_at
+    WHERE excluded.content_mismatch < coalesce(news.content_mismatch, 0)
+       OR (excluded.content_mismatch <= coalesce(news.content_mismatch, 0)
+           AND (excluded.content_quality > coalesce(news.content_quality, 0)
+                OR (excluded.content_quality = coalesce(news.content_quality, 0)
+                    AND (coalesce(excluded.extractor_version, 0) > coalesce(news.extractor_version, 0)
+                         OR excluded.content_length > coalesce(news.content_length, 0)))))
+    RETURNING id
+"""
+
+_UPSERT_CONTENT = """
+    INSERT INTO news_content (news_id, summary, full_content) VALUES (?, ?, ?)
+    ON CONFLICT(news_id) DO UPDATE SET
+        summary = excluded.summary,
+        full_content = excluded.full_content
+"""
+
+# Makes (company_key, title) an alternate of the story whose representative
+# (or one of whose alternates) is titled story_title. A row that already
+# has alternates stays a representative, so stories never nest.
+_LINK_STORY = """
+    UPDATE news SET story_id = (
+        SELECT coalesce(story.story_id, story.id) FROM news AS story
+        WHERE story.company_key = news.company_key AND story.title = ?
+    )
+    WHERE company_key = ? AND title = ? AND title != ?
+      AND EXISTS (SELECT 1 FROM news AS story WHERE story.company_key = news.company_key AND story.title = ?)
+      AND NOT EXISTS (SELECT 1 FROM news AS alternate WHERE alternate.story_id = news.id)
+"""
+
+
+def _existing_titles(conn, company_key, titles):
+    found = set()
+    titles = list(titles)
+    for start in range(0, len(titles), 500):
+        chunk = titles[start:start + 500]
+        rows = conn.execute(
+            f"SELECT title FROM news WHERE company_key = ? AND title IN ({','.join('?' * len(chunk))})",
+            [company_key] + chunk
+        ).fetchall()
+        found.update(row['title'] for row in rows)
+    return found
+
+
+def _upsert_news(conn, company_key, items):
     """
-    Backward-compatible: accepts the same dict structure as JSON version.
-    Upserts news items (dedup by company_key + title).
+    Upserts items into the caller's transaction. An item with a
+    'story_title' (see deduplicator.cluster_new_news()) is stored as an
+    alternate of that story.
+    Returns (inserted, updated, ignored): new rows, archived rows whose
+    content was improved, and items that were not better than the archive.
+    """
+    rows = [_news_row(company_key, item) for item in items if isinstance(item, dict)]
+    if not rows:
+        return 0, 0, 0
+    # Titles stored so far, so each statement's write is counted as an
+    # insert or an update (a batch may carry the same new title twice)
+    stored = _existing_titles(conn, company_key, {row[1] for row, _ in rows})
+    inserted = updated = 0
+    contents = []
+    fingerprints = []
+    for row, (summary, full_content) in rows:
+        written = conn.execute(_UPSERT_NEWS, row).fetchone()
+        if written is not None:
+            if row[1] in stored:
+                updated += 1
+            else:
+                inserted += 1
+                stored.add(row[1])
+            contents.append((written[0], summary, pack_text(full_content)))
+            # Fingerprinted only once written; most re-sent items are not
+            fingerprints.append((_signed64(deduplicator.content_simhash(full_content)), written[0]))
+    conn.executemany(_UPSERT_CONTENT, contents)
+    conn.executemany("UPDATE news SET content_simhash = ? WHERE id = ?", fingerprints)
+    # Alternates are linked once every representative of the batch exists
+    conn.executemany(_LINK_STORY, [
+        (item['story_title'], company_key, item['title'], item['story_title'], item['story_title'])
+        for item in items if isinstance(item, dict) and item.get('story_title') and item.get('title')
+    ])
+    return inserted, updated, len(rows) - inserted - updated
+
+
+def ingest_news(company_key, items):
+    """
+    Bulk-upserts items for one company in a single transaction.
+    Callers pass only the delta (new items, or re-scraped ones), so the
+    write cost follows the number of those items, not the archive size.
+    Returns {'inserted': n, 'updated': n, 'ignored': n}.
     """
     _init_db()
-    conn = _get_connection()
+    with _connection() as conn:
+        inserted, updated, ignored = _upsert_news(conn, company_key, items)
+        if inserted or updated:
+            _bump_store_version(conn)
+        conn.commit()
+    return {'inserted': inserted, 'updated': updated, 'ignored': ignored}
+
+
+def get_low_quality_news(max_quality=QUALITY_STUB, company_key=None, limit=-1):
+    """
+    Archived rows whose content_quality is at most max_quality, or whose
+    body belongs to another article (content_mismatch), newest first, for
+    targeted re-scraping. Returns dicts with 'company_key',
+    'content_quality' and 'extractor_version' added.
+    """
+    _init_db()
+    query = (f"SELECT {_FULL_COLUMNS}, news.content_quality, news.extractor_version "
+             f"FROM news {_CONTENT_JOIN} WHERE (news.content_quality <= ? OR news.content_mismatch = 1)")
+    params = [max_quality]
+    if company_key:
+        clause, clause_params = _company_filter(company_key)
+        query += clause
+        params.extend(clause_params)
+    query += " ORDER BY news.published_ts DESC LIMIT ?"
+    params.append(limit)
 
+    with _connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    result = []
+    for row in rows:
+        item = _row_to_dict(row)
+        item['company_key'] = row['company_key']
+        item['content_quality'] = row['content_quality']
+        item['extractor_version'] = row['extractor_version']
+        result.append(item)
+    return result
+
+
+def _save_history(conn, news_data):
+    """
+    Writes a news_history.json-style dict into the caller's transaction.
+    Returns (inserted, updated, ignored) like _upsert_news().
+    """
+    inserted = updated = ignored = 0
     for key, items in news_data.items():
         if key.startswith('_'):
             # Metadata
@@ -167,130 +1123,714 @@ def save_news_history(news_data):
         if not isinstance(items, list):
             continue
 
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-            try:
-                conn.execute("""
-                    INSERT OR IGNORE INTO news
-                    (company_key, title, link, published, summary, full_content, source, image_url)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    key,
-                    item.get('title', ''),
-                    item.get('link', ''),
-                    item.get('published', ''),
-                    item.get('summary', ''),
-                    item.get('full_content', ''),
-                    item.get('original_link', item.get('link', '')),
-                    item.get('image', '')
-                ))
-            except Exception as e:
-                print(f"Error inserting news item: {e}")
-
-    conn.commit()
-    conn.close()
+        added, improved, skipped = _upsert_news(conn, key, items)
+        inserted += added
+        updated += improved
+        ignored += skipped
+
+    if inserted or updated:
+        _bump_store_version(conn)
+    return inserted, updated, ignored
+
+
+def save_news_history(news_data):
+    """
+    Backward-compatible: accepts the same dict structure as JSON version.
+    Upserts news items (dedup by company_key + title) in one transaction.
+    Re-sends every item; prefer ingest_news() with only the new items.
+    Returns {'inserted': n, 'updated': n, 'ignored': n}.
+    """
+    _init_db()
+    with _connection() as conn:
+        inserted, updated, ignored = _save_history(conn, news_data)
+        conn.commit()
     print("News history saved to SQLite.")
+    return {'inserted': inserted, 'updated': updated, 'ignored': ignored}
 
 
-def search_news(query, company_key=None, limit=50):
+def search_news(query, company_key=None, limit=50, year=None, month=None, newest_first=False):
     """
-    Full-text search using FTS5.
-    Returns list of news dicts matching the query.
+    Full-text search over the Korean bigram index (see search_query()).
+    Returns LazyArticles whose title, body or summary contain every word
+    of query, optionally restricted to one company key (or a list of keys)
+    and a publish year/month.
+    Ordered by bm25() with SEARCH_WEIGHTS, or by publish date with
+    newest_first=True. For result lists use search_archive().
     """
+    match = search_query(query)
+    if not match:
+        return []
     _init_db()
-    conn = _get_connection()
+    with _connection() as conn:
+        sql = f"""
+            SELECT {_LIST_COLUMNS} FROM news
+            JOIN news_search ON news.id = news_search.rowid
+            {_CONTENT_JOIN}
+            WHERE news_search MATCH ?
+        """
+        params = [match]
+        if company_key:
+            clause, clause_params = _company_filter(company_key)
+            sql += clause
+            params.extend(clause_params)
+        clause, clause_params = _date_filter(year, month)
+        sql += clause
+        params.extend(clause_params)
+        if newest_first:
+            sql += " ORDER BY news.published_ts DESC LIMIT ?"
+        else:
+            sql += " ORDER BY bm25(news_search, ?, ?, ?) LIMIT ?"
+            params.extend(SEARCH_WEIGHTS)
+        params.append(limit)
+
+        rows = conn.execute(sql, params).fetchall()
+    return [_row_to_lazy(row) for row in rows]
 
+
+def search_archive(query, company_key=None, year=None, month=None, limit=20, offset=0, newest_first=False):
+    """
+    One page of search results with everything the result list shows,
+    computed in a single query:
+    - items: LazyArticles with 'title_highlight' and a highlighted
+      'snippet' of the body; full_content itself is not selected
+    - total: number of matches
+    - facets: {company_key: number of matches}
+    Ranked by bm25() with SEARCH_WEIGHTS (title over summary over body),
+    or newest first. company_key/year/month filter like search_news().
+    """
+    empty = {'items': [], 'total': 0, 'facets': {}}
+    match = search_query(query)
+    if not match:
+        return empty
+
+    filters, params = "", [*SEARCH_WEIGHTS, match]
     if company_key:
-        rows = conn.execute("""
-            SELECT news.* FROM news
-            JOIN news_fts ON news.id = news_fts.rowid
-            WHERE news_fts MATCH ? AND news.company_key = ?
-            ORDER BY rank
-            LIMIT ?
-        """, (query, company_key, limit)).fetchall()
+        clause, clause_params = _company_filter(company_key)
+        filters += clause
+        params.extend(clause_params)
+    clause, clause_params = _date_filter(year, month)
+    filters += clause
+    params.extend(clause_params)
+    if newest_first:
+        page_order, result_order = "published_ts DESC, id DESC", "page.published_ts DESC, page.id DESC"
     else:
-        rows = conn.execute("""
-            SELECT news.* FROM news
-            JOIN news_fts ON news.id = news_fts.rowid
-            WHERE news_fts MATCH ?
-            ORDER BY rank
-            LIMIT ?
-        """, (query, limit)).fetchall()
-
-    conn.close()
-    return [_row_to_dict(row) for row in rows]
+        page_order, result_order = "score, id DESC", "page.score, page.id DESC"
 
+    sql = f"""
+        WITH hits AS (
+            SELECT rowid AS id, bm25(news_search, ?, ?, ?) AS score
+            FROM news_search WHERE news_search MATCH ?
+        ),
+        matched AS (
+            SELECT news.id, news.company_key, news.published_ts, hits.score
+            FROM hits JOIN news ON news.id = hits.id
+            WHERE 1 = 1 {filters}
+        ),
+        page AS (
+            SELECT id, score, published_ts, COUNT(*) OVER () AS total
+            FROM matched ORDER BY {page_order} LIMIT ? OFFSET ?
+        )
+        SELECT {_LIST_COLUMNS}, page.total,
+               ko_highlight(news.title, ?) AS title_highlight,
+               ko_snippet(coalesce(nullif(unzip_text(news_content.full_content), ''),
+                                   news_content.summary), ?, ?) AS snippet,
+               (SELECT json_group_object(company_key, n)
+                FROM (SELECT company_key, COUNT(*) AS n FROM matched GROUP BY company_key)) AS facets
+        FROM page JOIN news ON news.id = page.id
+        {_CONTENT_JOIN}
+        ORDER BY {result_order}
+    """
+    params.extend([limit, offset, query, query, SNIPPET_CHARS])
 
-def get_news_by_company(company_key, year=None, month=None, limit=100, offset=0):
-    """Efficient paginated query for news by company."""
     _init_db()
-    conn = _get_connection()
+    with _connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    if not rows:
+        return empty
 
-    query = "SELECT * FROM news WHERE company_key = ?"
-    params = [company_key]
+    items = []
+    for row in rows:
+        item = _row_to_lazy(row)
+        item['title_highlight'] = row['title_highlight']
+        item['snippet'] = row['snippet']
+        items.append(item)
+    return {'items': items, 'total': rows[0]['total'], 'facets': json.loads(rows[0]['facets'] or '{}')}
 
-    if year:
-        query += " AND CAST(strftime('%Y', published) AS INTEGER) = ?"
-        params.append(year)
-    if month:
-        query += " AND CAST(strftime('%m', published) AS INTEGER) = ?"
-        params.append(month)
 
-    query += " ORDER BY published DESC LIMIT ? OFFSET ?"
-    params.extend([limit, offset])
+def search_hits(query, company_key=None, year=None, month=None):
+    """
+    Every match of query as (id, company_key, published_ts, score) tuples,
+    best bm25() score first. Only ids and ranking columns are read, so the
+    list is cheap to keep around; get_search_page() loads the rows to show.
+    """
+    match = search_query(query)
+    if not match:
+        return []
+
+    sql = f"""
+        SELECT news.id, news.company_key, news.published_ts, bm25(news_search, ?, ?, ?) AS score
+        FROM news_search JOIN news ON news.id = news_search.rowid
+        WHERE news_search MATCH ?
+    """
+    params = [*SEARCH_WEIGHTS, match]
+    if company_key:
+        clause, clause_params = _company_filter(company_key)
+        sql += clause
+        params.extend(clause_params)
+    clause, clause_params = _date_filter(year, month)
+    sql += clause
+    params.extend(clause_params)
+    sql += " ORDER BY score, news.id DESC"
+
+    _init_db()
+    with _connection() as conn:
+        return [tuple(row) for row in conn.execute(sql, params)]
+
+
+def get_search_page(ids, query):
+    """
+    LazyArticles for ids (in that order) with 'title_highlight' and a
+    'snippet' for query, as search_archive() returns them.
+    """
+    if not ids:
+        return []
+    sql = f"""
+        SELECT {_LIST_COLUMNS},
+               ko_highlight(news.title, ?) AS title_highlight,
+               ko_snippet(coalesce(nullif(unzip_text(news_content.full_content), ''),
+                                   news_content.summary), ?, ?) AS snippet
+        FROM news {_CONTENT_JOIN}
+        WHERE news.id IN (SELECT value FROM json_each(?))
+    """
+    _init_db()
+    with _connection() as conn:
+        rows = conn.execute(sql, (query, query, SNIPPET_CHARS, json.dumps(list(ids)))).fetchall()
 
-    rows = conn.execute(query, params).fetchall()
-    conn.close()
+    by_id = {}
+    for row in rows:
+        item = _row_to_lazy(row)
+        item['title_highlight'] = row['title_highlight']
+        item['snippet'] = row['snippet']
+        by_id[row['id']] = item
+    return [by_id[news_id] for news_id in ids if news_id in by_id]
+
+
+def get_news_by_company(company_key, year=None, month=None, limit=100, offset=0):
+    """
+    Efficient paginated query for news by company (or a list of company
+    keys), newest first. year/month filter on the UTC publish date.
+    """
+    _init_db()
+    with _connection() as conn:
+        query = f"SELECT {_FULL_COLUMNS} FROM news {_CONTENT_JOIN} WHERE 1 = 1"
+        clause, params = _company_filter(company_key)
+        query += clause
+
+        clause, clause_params = _date_filter(year, month)
+        query += clause
+        params.extend(clause_params)
+
+        query += " ORDER BY news.published_ts DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        rows = conn.execute(query, params).fetchall()
     return [_row_to_dict(row) for row in rows]
 
 
 def get_news_count(company_key=None):
     """Count news items, optionally filtered by company."""
     _init_db()
-    conn = _get_connection()
+    with _connection() as conn:
+        if company_key:
+            count = conn.execute(
+                "SELECT COUNT(*) FROM news WHERE company_key = ?", (company_key,)
+            ).fetchone()[0]
+        else:
+            count = conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+
+    return count
+
+
+# Archive tab category filters. Matching is done on title + summary with
+# spaces removed, like the dashboard always did; archive_mentions() does
+# it when a row is written and the filters test the stored flags.
+ARCHIVE_FILTERS = {
+    'all': None,
+    'capital_only': f"(news.mentions & {MENTIONS_CAPITAL}) != 0",
+    'group_only': f"(news.mentions & {MENTIONS_SUBSIDIARY}) = 0",
+    'parent_only': f"(news.mentions & {MENTIONS_CAPITAL}) = 0",
+}
+
+# Titles that mark business reports / disclosures rather than news
+REPORT_KEYWORDS = ["[공시", "[보고서", "사업보고서", "경영공시", "감사보고서", "실적발표"]
+_IS_REPORT = "(" + " OR ".join("instr(news.title, ?) > 0" for _ in REPORT_KEYWORDS) + ")"
+
+
+def _archive_where(company_key, year=None, month=None, filter_mode="all", reports=None, stories=True):
+    if filter_mode not in ARCHIVE_FILTERS:
+        raise ValueError(f"Unknown archive filter mode: {filter_mode}")
+
+    where = "WHERE news.story_id IS NULL" if stories else "WHERE 1 = 1"
+    clause, params = _company_filter(company_key)
+    where += clause
+
+    clause, clause_params = _date_filter(year, month)
+    where += clause
+    params.extend(clause_params)
+
+    if ARCHIVE_FILTERS[filter_mode]:
+        where += f" AND {ARCHIVE_FILTERS[filter_mode]}"
+    if reports is not None:
+        where += f" AND {_IS_REPORT}" if reports else f" AND NOT {_IS_REPORT}"
+        params.extend(REPORT_KEYWORDS)
+    return where, params
+
+
+def query_archive(company_key, year=None, month=None, filter_mode="all", reports=None, limit=50, offset=0,
+                  stories=True):
+    """
+    One page of the archive tab, newest first, as LazyArticles (full_content
+    is loaded on first access, or for many at once with load_contents()).
+    company_key: a key or a list of keys. filter_mode: a key of
+    ARCHIVE_FILTERS. reports: True for business reports only, False for
+    news only, None for both. limit=-1 returns every matching row.
+    stories=True returns one row per story (its representative, with
+    'alternate_count'; see get_story_alternates()), False every article.
+    """
+    _init_db()
+    with _connection() as conn:
+        where, params = _archive_where(company_key, year, month, filter_mode, reports, stories)
+        # Page over the narrow news rows first; summaries are read (and
+        # decompressed) only for the rows of the page
+        rows = conn.execute(
+            f"WITH page AS (SELECT news.id FROM news {where} "
+            "ORDER BY news.published_ts DESC, news.id DESC LIMIT ? OFFSET ?) "
+            f"SELECT {_LIST_COLUMNS}, "
+            "(SELECT COUNT(*) FROM news AS alternate WHERE alternate.story_id = news.id) AS alternate_count "
+            f"FROM page JOIN news ON news.id = page.id {_CONTENT_JOIN} "
+            "ORDER BY news.published_ts DESC, news.id DESC",
+            params + [limit, offset]
+        ).fetchall()
+
+    return [_row_to_lazy(row) for row in rows]
 
-    if company_key:
-        count = conn.execute(
-            "SELECT COUNT(*) FROM news WHERE company_key = ?", (company_key,)
-        ).fetchone()[0]
-    else:
-        count = conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
 
-    conn.close()
+def count_archive(company_key, year=None, month=None, filter_mode="all", reports=None, stories=True):
+    """Number of rows query_archive() pages over with the same filters."""
+    _init_db()
+    with _connection() as conn:
+        where, params = _archive_where(company_key, year, month, filter_mode, reports, stories)
+        count = conn.execute(f"SELECT COUNT(*) FROM news {where}", params).fetchone()[0]
+
     return count
 
 
+def get_story_alternates(news_id):
+    """
+    The other articles of the story whose representative is news_id, as
+    LazyArticles, newest first.
+    """
+    _init_db()
+    with _connection() as conn:
+        rows = conn.execute(
+            f"SELECT {_LIST_COLUMNS} FROM news {_CONTENT_JOIN} WHERE news.story_id = ? "
+            "ORDER BY news.published_ts DESC, news.id DESC", (news_id,)
+        ).fetchall()
+    return [_row_to_lazy(row) for row in rows]
+
+
 def get_metadata(key):
     """Get a metadata value."""
     _init_db()
-    conn = _get_connection()
-    row = conn.execute(
-        "SELECT value FROM metadata WHERE key = ?", (key,)
-    ).fetchone()
-    conn.close()
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT value FROM metadata WHERE key = ?", (key,)
+        ).fetchone()
     return row['value'] if row else None
 
 
 def set_metadata(key, value):
     """Set a metadata value."""
     _init_db()
-    conn = _get_connection()
-    conn.execute(
-        "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
-        (key, value)
-    )
-    conn.commit()
-    conn.close()
+    with _connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+            (key, value)
+        )
+        if key.startswith('_'):
+            # '_' keys are part of load_news_history()'s dict
+            _bump_store_version(conn)
+        conn.commit()
 
 
 def update_sentiment(news_id, sentiment):
     """Update sentiment for a specific news item."""
     _init_db()
-    conn = _get_connection()
-    conn.execute(
-        "UPDATE news SET sentiment = ? WHERE id = ?",
-        (sentiment, news_id)
-    )
-    conn.commit()
-    conn.close()
+    with _connection() as conn:
+        conn.execute(
+            "UPDATE news SET sentiment = ? WHERE id = ?",
+            (sentiment, news_id)
+        )
+        _bump_store_version(conn)
+        conn.commit()
+
+
+def _url_hash(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+def get_cached_article(url):
+    """
+    Looks up a scraped article by its decoded URL.
+    Returns a dict (content, summary, etag, last_modified, extractor_version,
+    fetched_at, is_fresh) or None. is_fresh is False once ARTICLE_CACHE_TTL
+    has passed; callers should then revalidate with etag/last_modified.
+    """
+    _init_db()
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM article_cache WHERE url_hash = ?", (_url_hash(url),)
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE article_cache SET last_access = ? WHERE url_hash = ?",
+                (time.time(), row['url_hash'])
+            )
+            conn.commit()
+
+    if not row:
+        return None
+    return {
+        'content': row['content'],
+        'summary': row['summary'],
+        'etag': row['etag'],
+        'last_modified': row['last_modified'],
+        'extractor_version': row['extractor_version'],
+        'fetched_at': row['fetched_at'],
+        'is_fresh': time.time() - (row['fetched_at'] or 0) < ARTICLE_CACHE_TTL,
+    }
+
+
+def get_archived_article(url):
+    """
+    (full_content, summary) of an archived article with this link whose
+    text is a full extraction (QUALITY_FULL, and its own body, see
+    content_mismatch), or None. Covers the articles stored before the
+    article cache existed, so they are not scraped again.
+    """
+    _init_db()
+    with _connection() as conn:
+        row = conn.execute(
+            "SELECT unzip_text(news_content.full_content) AS full_content, news_content.summary "
+            f"FROM news {_CONTENT_JOIN} WHERE news.link = ? AND news.content_quality = ? "
+            "AND coalesce(news.content_mismatch, 0) = 0 ORDER BY news.content_length DESC LIMIT 1",
+            (url, QUALITY_FULL)
+        ).fetchone()
+    if not row or not row['full_content']:
+        return None
+    return row['full_content'], row['summary'] or ''
+
+
+def put_cached_article(url, content, summary, etag=None, last_modified=None, extractor_version=None):
+    """Stores (or replaces) the extracted text for a decoded URL."""
+    global _article_cache_writes
+    _init_db()
+    now = time.time()
+    size = len((content or '').encode('utf-8')) + len((summary or '').encode('utf-8'))
+    with _connection() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO article_cache
+            (url_hash, url, content, summary, etag, last_modified, extractor_version, fetched_at, last_access, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (_url_hash(url), url, content, summary, etag, last_modified, extractor_version, now, now, size))
+        conn.commit()
+
+    _article_cache_writes += 1
+    if _article_cache_writes % ARTICLE_CACHE_EVICT_EVERY == 0:
+        evict_article_cache()
+
+
+def touch_cached_article(url):
+    """Marks a cached article as freshly validated (e.g. after a 304)."""
+    _init_db()
+    now = time.time()
+    with _connection() as conn:
+        conn.execute(
+            "UPDATE article_cache SET fetched_at = ?, last_access = ? WHERE url_hash = ?",
+            (now, now, _url_hash(url))
+        )
+        conn.commit()
+
+
+def evict_article_cache(max_age=None, max_bytes=None):
+    """
+    Drops cache entries not validated for max_age * 2 seconds, then the
+    least recently used entries until the cache fits in max_bytes.
+    Expired-but-validatable entries (age between max_age and 2 * max_age)
+    are kept so they can still be revalidated with a conditional request.
+    Returns the number of removed entries.
+    """
+    _init_db()
+    max_age = ARTICLE_CACHE_TTL if max_age is None else max_age
+    max_bytes = ARTICLE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _connection() as conn:
+        removed = conn.execute(
+            "DELETE FROM article_cache WHERE fetched_at < ?", (time.time() - 2 * max_age,)
+        ).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM article_cache").fetchone()[0]
+        if total > max_bytes:
+            rows = conn.execute(
+                "SELECT url_hash, size FROM article_cache ORDER BY last_access ASC"
+            ).fetchall()
+            victims = []
+            for row in rows:
+                if total <= max_bytes:
+                    break
+                victims.append((row['url_hash'],))
+                total -= row['size'] or 0
+            conn.executemany("DELETE FROM article_cache WHERE url_hash = ?", victims)
+            removed += len(victims)
+
+        conn.commit()
+    return removed
+
+
+def get_decoded_urls(article_ids):
+    """
+    Batch lookup in the Google News decode cache.
+    Returns {article_id: decoded_url} for the ids that are known.
+    """
+    _init_db()
+    article_ids = list(article_ids)
+    if not article_ids:
+        return {}
+    with _connection() as conn:
+        result = {}
+        # Stay below SQLite's bound-parameter limit
+        for start in range(0, len(article_ids), 500):
+            chunk = article_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT article_id, decoded_url FROM decode_cache WHERE article_id IN ({placeholders})",
+                chunk
+            ).fetchall()
+            for row in rows:
+                result[row['article_id']] = row['decoded_url']
+    return result
+
+
+def save_decoded_urls(mapping):
+    """Stores {article_id: decoded_url} pairs in one transaction."""
+    if not mapping:
+        return
+    _init_db()
+    with _connection() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO decode_cache (article_id, decoded_url) VALUES (?, ?)",
+            list(mapping.items())
+        )
+        conn.commit()
+
+
+def title_key(title):
+    """Compact, whitespace-insensitive key for a news title."""
+    normalized = " ".join((title or "").split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def get_titles(company_key, stories_only=False):
+    """
+    Every archived title of company_key, without the article rows, for
+    deduplicator.deduplicate_new_news(). stories_only=True returns only
+    the titles of story representatives, for deduplicator.cluster_new_news().
+    """
+    _init_db()
+    query = "SELECT title FROM news WHERE company_key = ?"
+    if stories_only:
+        query += " AND story_id IS NULL"
+    with _connection() as conn:
+        rows = conn.execute(query, (company_key,)).fetchall()
+    return [row['title'] for row in rows]
+
+
+def get_content_fingerprints(company_key, stories_only=False):
+    """
+    (title, content_simhash) of the archived rows of company_key whose body
+    is fingerprinted and matches the title, for the body checks of
+    deduplicator.deduplicate_new_news() / cluster_new_news().
+    stories_only=True returns only story representatives.
+    """
+    _init_db()
+    query = ("SELECT title, content_simhash FROM news WHERE company_key = ? "
+             "AND content_simhash IS NOT NULL AND coalesce(content_mismatch, 0) = 0")
+    if stories_only:
+        query += " AND story_id IS NULL"
+    with _connection() as conn:
+        rows = conn.execute(query, (company_key,)).fetchall()
+    return [(row['title'], row['content_simhash'] % (1 << 64)) for row in rows]
+
+
+def get_known_index(company_key):
+    """
+    Index of what is already archived for company_key, used by
+    news_fetcher.fetch_news to skip known entries before scraping.
+    Returns {'titles': set of title_key(), 'links': set of links}.
+    """
+    _init_db()
+    with _connection() as conn:
+        rows = conn.execute(
+            "SELECT title, link, source FROM news WHERE company_key = ?", (company_key,)
+        ).fetchall()
+
+    titles = set()
+    links = set()
+    for row in rows:
+        titles.add(title_key(row['title']))
+        if row['link']:
+            links.add(row['link'])
+        if row['source']:
+            links.add(row['source'])
+    return {'titles': titles, 'links': links}
+
+
+def _feed_state_key(url):
+    return "feed_state:" + hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+
+
+def get_feed_state(url):
+    """
+    Conditional-GET state of an RSS query URL:
+    {'url', 'etag', 'last_modified', 'checks', 'unchanged', 'last_status', 'last_checked'}.
+    """
+    value = get_metadata(_feed_state_key(url))
+    if value:
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return {'url': url, 'etag': None, 'last_modified': None, 'checks': 0, 'unchanged': 0,
+            'last_status': None, 'last_checked': None}
+
+
+def record_feed_check(url, status, etag=None, last_modified=None):
+    """Updates the validators and unchanged-rate counters after fetching a feed."""
+    state = get_feed_state(url)
+    state['checks'] += 1
+    state['last_status'] = status
+    state['last_checked'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if status == 304:
+        state['unchanged'] += 1
+    elif status == 200:
+        state['etag'] = etag
+        state['last_modified'] = last_modified
+    set_metadata(_feed_state_key(url), json.dumps(state, ensure_ascii=False))
+    return state
+
+
+def get_feed_stats():
+    """Per-feed conditional-GET statistics, most checked first."""
+    _init_db()
+    with _connection() as conn:
+        rows = conn.execute(
+            "SELECT value FROM metadata WHERE key LIKE 'feed_state:%'"
+        ).fetchall()
+
+    stats = []
+    for row in rows:
+        try:
+            state = json.loads(row['value'])
+        except ValueError:
+            continue
+        state['unchanged_rate'] = state['unchanged'] / state['checks'] if state['checks'] else 0.0
+        stats.append(state)
+    stats.sort(key=lambda x: x['checks'], reverse=True)
+    return stats
+
+
+def acquire_lock(name, owner, ttl):
+    """
+    Cross-process lease stored in the metadata table. Succeeds when the lock
+    is free, expired, or already held by owner. Returns True on success.
+    """
+    _init_db()
+    key = f"lock:{name}"
+    now = time.time()
+    with _connection() as conn:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+            if row:
+                try:
+                    current = json.loads(row['value'])
+                except ValueError:
+                    current = {}
+                if current.get('owner') != owner and current.get('expires', 0) > now:
+                    conn.rollback()
+                    return False
+            conn.execute(
+                "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+                (key, json.dumps({'owner': owner, 'expires': now + ttl, 'acquired': now}))
+            )
+            conn.commit()
+            return True
+        except sqlite3.OperationalError:
+            # Another process holds the write lock right now
+            conn.rollback()
+            return False
+
+
+def renew_lock(name, owner, ttl):
+    """
+    Extends owner's lease on name to ttl from now, so a run longer than
+    one ttl keeps it. Returns False only when another owner has taken the
+    lease over; a busy database leaves the lease as it is (True).
+    """
+    if acquire_lock(name, owner, ttl):
+        return True
+    value = get_metadata(f"lock:{name}")
+    try:
+        current = json.loads(value) if value else {}
+    except ValueError:
+        current = {}
+    return current.get('owner', owner) == owner or current.get('expires', 0) <= time.time()
+
+
+def release_lock(name, owner):
+    """
+    Releases a lease taken with acquire_lock (no-op if owner does not hold
+    it). Retries while another process holds the write lock; returns False
+    instead of raising when it still cannot write, the lease then expires
+    on its own.
+    """
+    _init_db()
+    key = f"lock:{name}"
+    with _connection() as conn:
+        for _ in range(LOCK_RELEASE_ATTEMPTS):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+                if row:
+                    try:
+                        current = json.loads(row['value'])
+                    except ValueError:
+                        current = {}
+                    if current.get('owner') == owner:
+                        conn.execute("DELETE FROM metadata WHERE key = ?", (key,))
+                conn.commit()
+                return True
+            except sqlite3.OperationalError:
+                # Another process holds the write lock right now
+                conn.rollback()
+    return False
+
+
+def is_locked(name):
+    """True if some owner currently holds an unexpired lease on name."""
+    value = get_metadata(f"lock:{name}")
+    if not value:
+        return False
+    try:
+        return json.loads(value).get('expires', 0) > time.time()
+    except ValueError:
+        return False
@@ -0,0 +1,20 @@
+"""
+Rebuilds the Korean bigram search index (news_search) from the news table.
+Safe while the dashboard is running: readers keep the old index until the
+rebuild commits. Run after changing news_storage.korean_bigrams().
+
+Run: python rebuild_search_index.py
+"""
+import time
+
+import news_storage
+
+
+def main():
+    start = time.perf_counter()
+    count = news_storage.rebuild_search_index()
+    print(f"Indexed {count} news rows in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,14 @@
 Google News RSS + 사람인/잡코리아 검색으로 IBK캐피탈, 산은캐피탈 채용정보를 수집합니다.
 """
 
-import feedparser
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from urllib.parse import quote
 import re
 import json
 import os
+import fetch_engine
+import http_client
 
 # 크롤링 대상 회사 설정
 COMPANIES = {
@@ -28,9 +28,7 @@ COMPANIES = {
     }
 }
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-}
+HEADERS = http_client.HEADERS
 
 RECRUITMENT_KEYWORDS = ['채용', '공채', '신입', '인턴', '모집', '선발', '수시채용', '채용형']
 EXCLUDED_KEYWORDS = ['투자', '유치', '선정', '솔루션', '플랫폼', '스타트업', 'MOU', '협약', '이노베이션', '펀드', '지원']
@@ -75,7 +73,7 @@ def fetch_recruitment_from_news(company_key):
         try:
             encoded_query = quote(f'{query} when:30d') # 기간도 30일로 단축
             rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=ko&gl=KR&ceid=KR:ko"
-            feed = feedparser.parse(rss_url)
+            feed = fetch_engine.parse_feed(rss_url)
 
             for entry in feed.entries:
                 if len(items) >= 5:
@@ -120,9 +118,9 @@ def fetch_recruitment_from_saramin(company_key):
     items = []
     try:
         search_url = f"https://www.saramin.co.kr/zf_user/search?searchType=search&searchword={quote(config['saramin_keyword'])}&recruitSort=relation"
-        response = requests.get(search_url, headers=HEADERS, timeout=10)
+        response = fetch_engine.get(search_url, headers=HEADERS, timeout=10)
 
-        if response.status_code != 200:
+        if response is None or response.status_code != 200:
             return []
 
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -185,9 +183,9 @@ def fetch_recruitment_from_jobkorea(company_key):
     items = []
     try:
         search_url = f"https://www.jobkorea.co.kr/Search/?stext={quote(config['name'])}&tabType=recruit"
-        response = requests.get(search_url, headers=HEADERS, timeout=10)
+        response = fetch_engine.get(search_url, headers=HEADERS, timeout=10)
 
-        if response.status_code != 200:
+        if response is None or response.status_code != 200:
             return []
 
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -0,0 +1,224 @@
+"""
+Scheduled news ingestion, decoupled from Streamlit page loads.
+
+Refreshes the SQLite archive (news_history.db) on a cadence. Page loads in
+app.py only read from the store; a cross-process lease in the metadata table
+makes sure only one process (CLI worker or app scheduler thread) refreshes
+at a time.
+
+Run once:          python refresh_worker.py --once
+Run as a service:  python refresh_worker.py --interval 3600
+Force a refresh:   python refresh_worker.py --once --force
+
+app.py starts the same loop in a background thread via start_scheduler()
+unless NEWS_REFRESH_IN_APP=0 (use that when a separate worker process runs).
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import deduplicator
+import http_client
+import news_fetcher
+import news_storage
+
+DAYS_LOOKBACK = 3
+DEFAULT_INTERVAL = 3600          # seconds between staleness checks
+LOCK_NAME = "news_refresh"
+LOCK_TTL = 30 * 60               # a crashed worker frees the lock after this (renewed per company)
+
+REFRESH_IN_APP = os.environ.get("NEWS_REFRESH_IN_APP", "1") != "0"
+
+# Store duplicates of a story as its alternates (news.story_id) instead of
+# dropping them; NEWS_CLUSTER_STORIES=0 keeps only one article per story
+CLUSTER_STORIES = os.environ.get("NEWS_CLUSTER_STORIES", "1") != "0"
+
+# (archive key, fetch_news company name, max_items, business-report company name)
+COMPANIES = [
+    ('IBK', "IBK Capital", 20, "IBK캐피탈"),
+    ('IBK_Parent', "IBK Parent", 20, "IBK기업은행"),
+    ('KDB', "KDB Capital", 20, "산은캐피탈"),
+    ('KDB_Parent', "KDB Parent", 20, "KDB산업은행"),
+    ('Capital Industry', "Capital Industry", 10, None),
+    ('Macro Economy', "Macro Economy", 10, None),
+]
+
+_owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+_scheduler_thread = None
+_scheduler_lock = threading.Lock()
+
+
+def _fetch_company(key, name, max_items, report_name, fetch_stats):
+    """(key, fetched items, feed validators to record once they are saved)"""
+    feed_checks = []
+    # Skip entries already in the archive before decoding/scraping them
+    raw = news_fetcher.fetch_news(name, days=DAYS_LOOKBACK, max_items=max_items,
+                                  known=news_storage.get_known_index(key),
+                                  stats=fetch_stats.setdefault(key, {}),
+                                  conditional=True, feed_checks=feed_checks)
+    if report_name:
+        rep = news_fetcher.fetch_business_reports(report_name, conditional=True, feed_checks=feed_checks)
+        if CLUSTER_STORIES:
+            return key, raw + rep, feed_checks
+        return key, deduplicator.deduplicate_news(raw + rep), feed_checks
+    return key, raw, feed_checks
+
+
+def is_stale():
+    """True when the archive was last refreshed before today."""
+    last_updated_str = news_storage.get_metadata('_last_updated') or '2000-01-01 00:00:00'
+    try:
+        last_updated = datetime.strptime(last_updated_str, "%Y-%m-%d %H:%M:%S")
+    except (ValueError, TypeError):
+        return True
+    return last_updated.date() < datetime.now().date()
+
+
+def run_refresh(renew_lease=None):
+    """
+    Fetches all companies in parallel, merges them with the archive and
+    saves. Returns {key: number of fetched items}. Does not take the lock;
+    use refresh_if_stale() for that. renew_lease (from refresh_if_stale())
+    is called as each company is fetched and before it is saved; when it
+    returns False another process has taken over and nothing more is saved.
+    """
+    http_client.reset_stats()
+    news_fetcher.reset_refresh_cache()
+    news_fetcher.reset_decode_stats()
+
+    new_data = {}
+    fetch_stats = {}
+    feed_checks = {}
+
+    with ThreadPoolExecutor(max_workers=len(COMPANIES)) as executor:
+        futures = {
+            executor.submit(_fetch_company, key, name, max_items, report_name, fetch_stats): key
+            for key, name, max_items, report_name in COMPANIES
+        }
+        for future in as_completed(futures):
+            try:
+                key, items, checks = future.result()
+                new_data[key] = items
+                feed_checks[key] = checks
+                if renew_lease:
+                    renew_lease()
+            except Exception as e:
+                print(f"⚠️ {futures[future]} 수집 실패: {e}")
+
+    # Rows archived before body fingerprints existed get theirs first
+    news_storage.backfill_content_fingerprints()
+
+    # Deduplicate against the archive's titles and write only the new items
+    # (or, clustering, write them all as new stories or alternates)
+    write_stats = {}
+    for key, items in new_data.items():
+        if renew_lease and not renew_lease():
+            print("⚠️ 다른 프로세스가 갱신 잠금을 가져가 저장을 중단합니다.")
+            break
+        if items:
+            if CLUSTER_STORIES:
+                delta = deduplicator.cluster_new_news(items, news_storage.get_titles(key, stories_only=True),
+                                                      news_storage.get_content_fingerprints(key, stories_only=True))
+            else:
+                delta = deduplicator.deduplicate_new_news(items, news_storage.get_titles(key),
+                                                          news_storage.get_content_fingerprints(key))
+            write_stats[key] = news_storage.ingest_news(key, delta)
+        # The feeds may answer 304 from now on: only once their items are stored
+        news_fetcher.record_feed_checks(feed_checks[key])
+
+    news_storage.set_metadata('_last_updated', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    print(http_client.format_stats())
+    print(f"Google News decode cache: {news_fetcher.get_decode_stats()}")
+    for key, stat in fetch_stats.items():
+        if stat.get('not_modified'):
+            print(f"[{key}] RSS feed unchanged (304), pipeline skipped")
+        else:
+            print(f"[{key}] RSS entries {stat.get('entries', 0)}: new {stat.get('new', 0)}, skipped (archived) {stat.get('skipped', 0)}")
+    for key, stat in write_stats.items():
+        print(f"[{key}] stored {stat['inserted']} new, {stat['updated']} improved ({stat['ignored']} already archived)")
+
+    return {key: len(items) for key, items in new_data.items()}
+
+
+def refresh_if_stale(force=False):
+    """
+    Runs a refresh if the archive is stale (or force) and no other process
+    is refreshing. Returns the run_refresh() result, or None if skipped.
+    """
+    if not force and not is_stale():
+        return None
+    if not news_storage.acquire_lock(LOCK_NAME, _owner, LOCK_TTL):
+        print("Refresh already running in another process; skipping.")
+        return None
+    try:
+        # Another process may have finished a refresh while we waited
+        if not force and not is_stale():
+            return None
+        print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] Refreshing news archive...")
+        return run_refresh(renew_lease=lambda: news_storage.renew_lock(LOCK_NAME, _owner, LOCK_TTL))
+    finally:
+        # A lease that cannot be released must not replace the refresh result
+        # (or its exception); it expires after LOCK_TTL
+        try:
+            released = news_storage.release_lock(LOCK_NAME, _owner)
+        except Exception as e:
+            print(f"⚠️ 갱신 잠금 해제 실패: {e}")
+        else:
+            if not released:
+                print("⚠️ 갱신 잠금 해제 실패: 데이터베이스 사용 중 (잠금은 만료 후 풀립니다)")
+
+
+def is_refreshing():
+    """True while any process holds the refresh lock."""
+    return news_storage.is_locked(LOCK_NAME)
+
+
+def run_forever(interval=DEFAULT_INTERVAL):
+    while True:
+        try:
+            refresh_if_stale()
+        except Exception as e:
+            print(f"Refresh failed: {e}")
+        time.sleep(interval)
+
+
+def start_scheduler(interval=DEFAULT_INTERVAL):
+    """
+    Starts run_forever() in a daemon thread (once per process).
+    Returns the thread.
+    """
+    global _scheduler_thread
+    with _scheduler_lock:
+        if _scheduler_thread is None or not _scheduler_thread.is_alive():
+            _scheduler_thread = threading.Thread(
+                target=run_forever, args=(interval,), name="news-refresh", daemon=True
+            )
+            _scheduler_thread.start()
+    return _scheduler_thread
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Refresh the news archive on a schedule.")
+    ap.add_argument("--once", action="store_true", help="refresh once and exit")
+    ap.add_argument("--force", action="store_true", help="refresh even if the archive is up to date")
+    ap.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, help="seconds between checks")
+    args = ap.parse_args()
+
+    if args.once:
+        result = refresh_if_stale(force=args.force)
+        print("Archive is up to date." if result is None else f"Refreshed: {result}")
+        return
+
+    if args.force:
+        refresh_if_stale(force=True)
+    run_forever(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Re-scrapes archived articles whose stored text is only a placeholder or a
+"[요약본]" stub, and upserts the result. Rows only change when the new
+extraction is better, so the script can be re-run safely.
+
+Run: python rescrape_low_quality.py [--company IBK] [--limit 100] [--max-quality 1] [--workers 8]
+"""
+import argparse
+import re
+from collections import defaultdict
+
+import http_client
+import news_fetcher
+import news_storage
+
+
+def _rescrape(item):
+    search_title = re.sub(r'^\[최근\]\s*', '', item['title'])
+    content, summary = news_fetcher.scrape_with_naver_fallback(search_title, item['link'], http_client.HEADERS)
+    if not content:
+        return None
+    if not summary or len(summary) < 50:
+        summary = content[:400] + "..." if len(content) > 500 else content
+    return {
+        'title': item['title'],
+        'link': item['link'],
+        'published': item['published'],
+        'summary': summary,
+        'full_content': content,
+        'extractor_version': news_fetcher.EXTRACTOR_VERSION,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-scrape low-quality archived articles.")
+    ap.add_argument("--company", help="archive key, e.g. IBK (default: all)")
+    ap.add_argument("--limit", type=int, default=-1, help="maximum rows to re-scrape")
+    ap.add_argument("--max-quality", type=int, default=news_storage.QUALITY_STUB,
+                    help="re-scrape rows at or below this content_quality tier")
+    ap.add_argument("--workers", type=int, default=news_fetcher.MAX_WORKERS)
+    args = ap.parse_args()
+
+    rows = [row for row in news_storage.get_low_quality_news(args.max_quality, args.company, args.limit)
+            if row['link']]
+    print(f"{len(rows)} low-quality rows to re-scrape")
+
+    news_fetcher.reset_refresh_cache()
+    results = news_fetcher._run_pipeline(_rescrape, rows, args.workers)
+
+    by_company = defaultdict(list)
+    for row, item in zip(rows, results):
+        if item:
+            by_company[row['company_key']].append(item)
+
+    for key, items in by_company.items():
+        stats = news_storage.ingest_news(key, items)
+        print(f"[{key}] improved {stats['updated']}, unchanged {stats['ignored']}")
+    print(http_client.format_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Archive search for the dashboard's search box, with a result cache.
+
+Every rerun of the archive tab (each keystroke, page change or filter
+change) asks for one page of results. SearchService keeps the full ranked
+hit list of recent queries - ids and ranking columns only - in an LRU
+cache keyed by (normalized query, company, year, month), so paging and
+re-running a query only loads the rows of the page being shown.
+
+Entries belong to one store version (news_storage.get_store_version());
+any write to the archive empties the cache. A query that extends a cached
+one ("캐피" -> "캐피탈", "IBK" -> "IBK 실적") can only match rows the
+shorter query matched: if that query found nothing, neither does the
+longer one and no SQL runs. (Re-ranking only the shorter query's hits is
+not cheaper: FTS5 does not use a rowid IN (...) list to narrow a MATCH,
+so a fresh ranked match is faster than re-checking the candidates.)
+
+    service = SearchService()
+    result = service.search("캐피탈", company_key='IBK', limit=20, offset=0)
+    result['items'], result['total'], result['facets']
+"""
+import threading
+from collections import OrderedDict
+
+import news_storage
+
+CACHE_SIZE = 256             # cached queries (each holds ids of all its hits)
+
+
+def _filter_key(company_key, year, month):
+    if isinstance(company_key, (list, tuple, set)):
+        company_key = tuple(sorted(company_key))
+    return company_key or None, year, month
+
+
+def _narrows(terms, cached_terms):
+    """True if every row matching terms also matches cached_terms."""
+    return all(any(cached in term for term in terms) for cached in cached_terms)
+
+
+class SearchService:
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'narrowed': 0, 'misses': 0}
+
+    def _current_version(self):
+        version = news_storage.get_store_version()
+        with self._lock:
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+        return version
+
+    def _lookup(self, key):
+        """Cached hits for key, [] if a cached broader query found nothing, else None."""
+        terms, filters = key
+        with self._lock:
+            hits = self._cache.get(key)
+            if hits is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return hits
+            for (cached_terms, cached_filters), cached_hits in self._cache.items():
+                if not cached_hits and cached_filters == filters and _narrows(terms, cached_terms):
+                    self.stats['narrowed'] += 1
+                    return []
+            self.stats['misses'] += 1
+            return None
+
+    def _store(self, key, hits, version):
+        with self._lock:
+            # A write landed while the query ran: the result may be stale
+            if version != self._version:
+                return
+            self._cache[key] = hits
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def hits(self, query, company_key=None, year=None, month=None):
+        """
+        All matches of query as news_storage.search_hits() tuples, best
+        first, from the cache when possible.
+        """
+        terms = news_storage.search_terms(query)
+        if not terms:
+            return []
+        key = (terms, _filter_key(company_key, year, month))
+        version = self._current_version()
+
+        hits = self._lookup(key)
+        if hits is None:
+            hits = news_storage.search_hits(query, company_key, year, month)
+        self._store(key, hits, version)
+        return hits
+
+    def search(self, query, company_key=None, year=None, month=None, limit=20, offset=0, newest_first=False):
+        """
+        One page of results in the shape of news_storage.search_archive():
+        {'items': LazyArticles with title_highlight/snippet, 'total', 'facets'}.
+        limit=-1 returns every match.
+        """
+        hits = self.hits(query, company_key, year, month)
+        if newest_first:
+            hits = sorted(hits, key=lambda hit: (hit[2] or 0, hit[0]), reverse=True)
+        page = hits[offset:] if limit < 0 else hits[offset:offset + limit]
+
+        facets = {}
+        for hit in hits:
+            facets[hit[1]] = facets.get(hit[1], 0) + 1
+        return {
+            'items': news_storage.get_search_page([hit[0] for hit in page], query),
+            'total': len(hits),
+            'facets': facets,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
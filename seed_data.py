@@ -80,9 +80,9 @@ def seed_5_years():
                     # Add new items
                     existing_data[key].extend(new_items)
                 
-                # Save Immediately (Incremental)
-                existing_data['_last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                news_storage.save_news_history(existing_data)
+                # Save Immediately (Incremental, only this batch)
+                news_storage.ingest_news(key, new_items)
+                news_storage.set_metadata('_last_updated', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                 print(f"    -> Saved {len(new_items)} items for {year}. (Total {key}: {len(existing_data[key])})")
                 
             except Exception as e:
@@ -45,8 +45,8 @@ def seed_macro():
                  print(f"    -> Added {len(new_items)} items.")
                  
                  # Save incrementally
-                 data['_last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                 news_storage.save_news_history(data)
+                 news_storage.ingest_news(key, new_items)
+                 news_storage.set_metadata('_last_updated', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                  
              except Exception as e:
                  print(f"    [ERROR] {e}")
@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+import batch_dedup
+import bench_dedup
+import deduplicator
+
+
+def _items():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.json")
+    with open(path, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    real_titles = [item['title'] for key, items in history.items() if not key.startswith('_') for item in items]
+    extra = [
+        {'title': '[인사] 산은캐피탈', 'full_content': ''},
+        {'title': '[인사] IBK캐피탈 임원 승진', 'full_content': ''},
+        {'title': '', 'full_content': ''},
+        {'title': '', 'full_content': ''},
+        'not a dict',
+    ]
+    return bench_dedup.synthetic_titles(300, 3, real_titles) + history['KDB'] + extra
+
+
+def test_deduplicate_batch_keeps_what_deduplicate_news_keeps():
+    pytest.importorskip("scipy")
+    items = _items()
+
+    # Small blocks so that titles are compared across blocks and within them
+    kept = batch_dedup.deduplicate_batch(items, block_size=64)
+
+    assert [id(x) for x in kept] == [id(x) for x in deduplicator.deduplicate_news(items)]
+    assert batch_dedup.deduplicate_batch([]) == []
+
+
+def test_deduplicate_batch_falls_back_without_numpy(monkeypatch):
+    monkeypatch.setattr(batch_dedup, "sparse", None)
+    items = _items()
+
+    kept = batch_dedup.deduplicate_batch(items)
+
+    assert [id(x) for x in kept] == [id(x) for x in deduplicator.deduplicate_news(items)]
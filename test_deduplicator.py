@@ -0,0 +1,120 @@
+import json
+import os
+
+import bench_dedup
+import deduplicator
+
+
+def test_deduplicate_news_keeps_longest_and_merges_personnel():
+    items = [
+        {'title': 'IBK캐피탈, 벤처투자 확대 - 연합뉴스', 'full_content': '짧음'},
+        {'title': 'IBK캐피탈 벤처투자 확대 - 뉴스1', 'full_content': '본문' * 100},
+        {'title': '[인사] 산은캐피탈', 'full_content': ''},
+        {'title': '[인사] IBK캐피탈 임원 승진', 'full_content': ''},
+        {'title': '한국은행 기준금리 동결', 'full_content': ''},
+        {'title': '', 'full_content': ''},
+        {'title': '', 'full_content': ''},
+        'not a dict',
+    ]
+
+    kept = deduplicator.deduplicate_news(items)
+
+    assert [x['title'] for x in kept] == ['IBK캐피탈 벤처투자 확대 - 뉴스1', '[인사] 산은캐피탈', '한국은행 기준금리 동결', '']
+
+
+def test_deduplicate_news_matches_all_pairs_comparison():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "news_history.json")
+    with open(path, "r", encoding="utf-8") as f:
+        history = json.load(f)
+    real_titles = [item['title'] for key, items in history.items() if not key.startswith('_') for item in items]
+    items = bench_dedup.synthetic_titles(100, 7, real_titles) + history['KDB']
+
+    kept = deduplicator.deduplicate_news(items)
+
+    assert [id(x) for x in kept] == [id(x) for x in bench_dedup.deduplicate_pairwise(items)]
+
+
+def test_deduplicate_new_news_drops_items_already_in_the_archive():
+    archived = ['IBK캐피탈 벤처투자 확대 - 뉴스1', '[인사] 산은캐피탈 임원 승진', '']
+    items = [
+        {'title': 'IBK캐피탈, 벤처투자 확대 - 연합뉴스', 'full_content': '본문' * 100},
+        {'title': '[인사] 산은캐피탈', 'full_content': ''},
+        {'title': '한국은행 기준금리 동결', 'full_content': ''},
+        {'title': '한국은행, 기준금리 동결', 'full_content': ''},
+        {'title': '', 'full_content': ''},
+    ]
+
+    new = deduplicator.deduplicate_new_news(items, archived)
+
+    assert [x['title'] for x in new] == ['한국은행 기준금리 동결']
+
+
+def test_cluster_new_news_links_alternates_to_their_story():
+    stories = ['IBK캐피탈 벤처투자 확대 - 뉴스1']
+    items = [
+        {'title': 'IBK캐피탈, 벤처투자 확대 - 연합뉴스', 'full_content': '본문' * 100},
+        {'title': '한국은행 기준금리 동결', 'full_content': '본문'},
+        {'title': '한국은행, 기준금리 동결', 'full_content': ''},
+    ]
+
+    clustered = deduplicator.cluster_new_news(items, stories)
+
+    assert [(x['title'], x.get('story_title')) for x in clustered] == [
+        ('IBK캐피탈, 벤처투자 확대 - 연합뉴스', 'IBK캐피탈 벤처투자 확대 - 뉴스1'),
+        ('한국은행 기준금리 동결', None),
+        ('한국은행, 기준금리 동결', '한국은행 기준금리 동결'),
+    ]
+    assert 'story_title' not in items[0]
+    representatives = [story for story, _ in deduplicator.cluster_news(items)]
+    assert representatives == deduplicator.deduplicate_news(items)
+
+
+BODY = ("IBK캐피탈이 올해 벤처투자 규모를 지난해보다 30% 늘린 5천억원으로 확대한다고 밝혔다. "
+        "회사는 신기술사업금융 부문을 중심으로 초기 기업 투자를 강화하고, 모회사인 IBK기업은행과 "
+        "연계한 중소기업 지원 프로그램도 운영할 계획이다. 업계에서는 금리 인하 기대감에 투자 수요가 "
+        "회복될 것으로 보고 있다. 회사 관계자는 \"우량 벤처기업 발굴을 위해 심사 인력을 두 배로 늘렸다\"며 "
+        "\"하반기에는 해외 펀드 출자도 검토하고 있다\"고 말했다.")
+
+
+def test_content_simhash_matches_copies_and_flags_foreign_bodies():
+    copy = "[서울=뉴스1] 김철수 기자 = " + BODY + " 무단전재 및 재배포 금지"
+    other = BODY.replace("벤처투자", "부동산 PF").replace("5천억원", "2조원").replace("초기 기업", "건설사")
+
+    assert deduplicator.simhash_distance(deduplicator.content_simhash(BODY),
+                                         deduplicator.content_simhash(copy)) <= deduplicator.SIMHASH_MAX_DISTANCE
+    assert deduplicator.simhash_distance(deduplicator.content_simhash(BODY),
+                                         deduplicator.content_simhash(other)) > deduplicator.SIMHASH_MAX_DISTANCE
+    assert deduplicator.content_simhash("짧은 본문") is None
+
+    assert deduplicator.title_matches_content("IBK캐피탈, 벤처투자 확대 - 연합뉴스", BODY)
+    assert not deduplicator.title_matches_content("푸르메재단 기부금 전달 - 연합뉴스", BODY)
+
+
+def test_title_matches_content_sees_words_through_particles_and_tags():
+    # No title word occurs whole in the body ("성장률①]", "회복" vs "회복세로")
+    body = ("정부와 한국은행은 올해 경제성장률 전망치를 잇따라 높였다. 수출이 반도체를 중심으로 "
+            "늘면서 경기가 회복세로 돌아섰다는 판단이다. 다만 중동 정세가 불안해 유가와 환율, "
+            "금리가 함께 오르는 3고 현상이 이어지면 내수 부진이 길어질 수 있다는 우려도 나온다. "
+            "전문가들은 하반기 소비와 투자 흐름을 지켜봐야 한다고 말했다.")
+    column = ("후회스런 성급한 말보다 침묵이 낫다는 옛말이 있다. 말을 아끼는 사람은 실수가 적고, "
+              "남의 이야기를 끝까지 듣는 사람은 신뢰를 얻는다. 오늘도 한 번 더 생각하고 말하는 "
+              "하루가 되기를 바란다. 작은 배려가 관계를 바꾸고, 관계가 결국 일의 결과를 바꾼다. "
+              "서두르지 않고 천천히 걷는 사람이 멀리 간다는 말도 같은 뜻이다. "
+              "바쁜 하루 속에서도 잠시 멈춰 주변을 돌아보는 여유를 잃지 않기를 바란다.")
+
+    assert deduplicator.title_matches_content("중동사태에 3高 악재에도 韓경제 회복 시동[장밋빛 성장률①] - 뉴시스", body)
+    assert not deduplicator.title_matches_content("우리금융캐피탈, 금융보안원 ISMS-P 인증 취득 - 한국금융신문", column)
+
+
+def test_deduplicate_new_news_drops_body_copies_under_other_headlines():
+    archived = [('IBK캐피탈, 올해 벤처투자 5천억 - 뉴스1', deduplicator.content_simhash(BODY))]
+    items = [
+        {'title': 'IBK캐피탈 "신기술금융 키운다" - 연합뉴스', 'full_content': BODY},
+        {'title': '푸르메재단 기부금 전달 - 연합뉴스', 'full_content': BODY},
+    ]
+
+    new = deduplicator.deduplicate_new_news(items, [title for title, _ in archived], archived)
+    clustered = deduplicator.cluster_new_news(items, [title for title, _ in archived], archived)
+
+    assert [x['title'] for x in new] == ['푸르메재단 기부금 전달 - 연합뉴스']
+    assert [x.get('story_title') for x in clustered] == ['IBK캐피탈, 올해 벤처투자 5천억 - 뉴스1', None]
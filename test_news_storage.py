@@ -0,0 +1,573 @@
+import json
+import sqlite3
+import threading
+
+import deduplicator
+import news_storage
+import search_service
+
+
+def _use_temp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(news_storage, "DB_PATH", str(tmp_path / "news_history.db"))
+    # No news_history.json to import into the empty database
+    monkeypatch.setattr(news_storage, "JSON_PATH", str(tmp_path / "news_history.json"))
+    monkeypatch.setattr(news_storage, "_initialized", False)
+
+
+def test_article_cache_roundtrip(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+
+    assert news_storage.get_cached_article("https://example.com/a") is None
+
+    news_storage.put_cached_article("https://example.com/a", "본문" * 100, "요약", etag='"v1"', extractor_version=1)
+    cached = news_storage.get_cached_article("https://example.com/a")
+
+    assert cached['content'] == "본문" * 100
+    assert cached['etag'] == '"v1"'
+    assert cached['extractor_version'] == 1
+    assert cached['is_fresh']
+
+
+def test_article_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+
+    for i in range(5):
+        news_storage.put_cached_article(f"https://example.com/{i}", "x" * 1000, "")
+    news_storage.get_cached_article("https://example.com/0")  # refresh last_access
+
+    removed = news_storage.evict_article_cache(max_bytes=2500)
+
+    assert removed == 3
+    assert news_storage.get_cached_article("https://example.com/0") is not None
+    assert news_storage.get_cached_article("https://example.com/4") is not None
+    assert news_storage.get_cached_article("https://example.com/1") is None
+
+
+def test_archived_full_text_is_found_by_link(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    body = "IBK캐피탈이 벤처투자 펀드를 추가로 조성한다. " * 20
+    news_storage.ingest_news('IBK', [
+        {'title': 'IBK캐피탈 벤처투자 확대', 'link': 'https://news.example.com/1', 'summary': '요약', 'full_content': body},
+        {'title': 'IBK캐피탈 실적 발표', 'link': 'https://news.example.com/2',
+         'full_content': "[요약본] 메타 설명 (상세 내용은 원문 링크를 참조하세요)"},
+    ])
+
+    assert news_storage.get_archived_article('https://news.example.com/1') == (body, '요약')
+    assert news_storage.get_archived_article('https://news.example.com/2') is None
+    assert news_storage.get_archived_article('https://news.example.com/3') is None
+
+
+def test_decode_cache_batch_lookup(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+
+    news_storage.save_decoded_urls({"CBMiA": "https://news.example.com/1", "CBMiB": "https://news.example.com/2"})
+
+    assert news_storage.get_decoded_urls(["CBMiA", "CBMiB", "CBMiC"]) == {
+        "CBMiA": "https://news.example.com/1",
+        "CBMiB": "https://news.example.com/2",
+    }
+    assert news_storage.get_decoded_urls([]) == {}
+
+
+def test_known_index_matches_archived_titles_and_links(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.save_news_history({
+        'IBK': [{'title': 'IBK캐피탈, 벤처투자 확대', 'link': 'https://news.example.com/1', 'published': ''}],
+    })
+
+    known = news_storage.get_known_index('IBK')
+
+    assert news_storage.title_key('IBK캐피탈,  벤처투자 확대') in known['titles']
+    assert 'https://news.example.com/1' in known['links']
+    assert news_storage.get_known_index('KDB') == {'titles': set(), 'links': set()}
+
+
+def test_feed_state_counts_unchanged_checks(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    url = "https://news.google.com/rss/search?q=IBK"
+
+    news_storage.record_feed_check(url, 200, etag='"abc"', last_modified="Mon, 01 Aug 2022 07:00:00 GMT")
+    news_storage.record_feed_check(url, 304)
+
+    state = news_storage.get_feed_state(url)
+    assert state['etag'] == '"abc"'
+    assert state['checks'] == 2 and state['unchanged'] == 1
+    assert news_storage.get_feed_stats()[0]['unchanged_rate'] == 0.5
+    # Internal bookkeeping does not leak into the news dict
+    assert all(not key.startswith('feed_state:') for key in news_storage.load_news_history())
+
+
+def test_empty_database_imports_the_json_archive_on_first_open(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    with open(news_storage.JSON_PATH, "w", encoding="utf-8") as f:
+        json.dump({'KDB': [{'title': '산은캐피탈 기사', 'published': '2025-01-01', 'summary': '요약'}],
+                   '_last_updated': '2025-01-01 09:00:00'}, f, ensure_ascii=False)
+
+    archive = news_storage.LazyArchive()
+
+    assert [x['title'] for x in archive['KDB']] == ['산은캐피탈 기사']
+    assert archive['_last_updated'] == '2025-01-01 09:00:00'
+    assert news_storage.NewsCache().get()['KDB'][0]['summary'] == '요약'
+
+
+def test_news_cache_reloads_only_after_writes(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.save_news_history({'IBK': [{'title': '첫 기사', 'published': ''}]})
+
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return news_storage.load_news_history()
+
+    cache = news_storage.NewsCache(loader)
+    first = cache.get()
+    assert cache.get() is first
+    assert len(loads) == 1
+
+    news_storage.save_news_history({'IBK': [{'title': '두번째 기사', 'published': ''}]})
+
+    assert len(cache.get()['IBK']) == 2
+    assert len(loads) == 2
+
+    # Re-saving what is already stored changes nothing and keeps the cache
+    version = news_storage.get_store_version()
+    news_storage.save_news_history({'IBK': [{'title': '두번째 기사', 'published': ''}]})
+    assert news_storage.get_store_version() == version
+    cache.get()
+    assert len(loads) == 2
+
+
+def test_release_lock_reports_a_busy_database_instead_of_raising(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(news_storage, "SQLITE_BUSY_TIMEOUT", 0.05)
+    assert news_storage.acquire_lock('refresh', 'worker', 60)
+
+    writer = sqlite3.connect(news_storage.DB_PATH)
+    writer.execute("BEGIN IMMEDIATE")
+    assert news_storage.release_lock('refresh', 'worker') is False
+    writer.rollback()
+    writer.close()
+
+    assert news_storage.is_locked('refresh')
+    assert news_storage.release_lock('refresh', 'worker') is True
+    assert not news_storage.is_locked('refresh')
+
+
+def test_renew_lock_extends_the_lease_until_another_owner_takes_it(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    assert news_storage.acquire_lock('refresh', 'worker', 60)
+    assert news_storage.renew_lock('refresh', 'worker', 3600)
+    assert not news_storage.acquire_lock('refresh', 'app', 60)
+
+    # Expired without renewal: the other owner takes it, the first one lost it
+    assert news_storage.acquire_lock('refresh', 'worker', -1)
+    assert news_storage.acquire_lock('refresh', 'app', 60)
+    assert news_storage.renew_lock('refresh', 'worker', 60) is False
+
+
+def test_first_ingest_into_an_empty_database_keeps_the_json_archive(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    with open(news_storage.JSON_PATH, "w", encoding="utf-8") as f:
+        json.dump({'KDB': [{'title': '산은캐피탈 기사', 'published': '2025-01-01'}]}, f, ensure_ascii=False)
+
+    # The refresh scheduler's first write on a fresh deployment
+    assert news_storage.ingest_news('KDB', [{'title': '새 기사', 'published': '2025-01-02'}])['inserted'] == 1
+
+    assert sorted(x['title'] for x in news_storage.query_archive('KDB')) == ['산은캐피탈 기사', '새 기사']
+
+
+def test_published_ts_orders_and_filters_in_sql(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.save_news_history({'IBK': [
+        {'title': '월요일 기사', 'published': 'Mon, 01 Aug 2022 07:00:00 GMT'},
+        {'title': '토요일 기사', 'published': 'Sat, 15 Mar 2025 07:00:00 GMT'},
+        {'title': '공시', 'published': '2025-01-02'},
+        {'title': '날짜 없음', 'published': ''},
+    ]})
+
+    titles = [x['title'] for x in news_storage.get_news_by_company('IBK', limit=-1)]
+    assert titles == ['토요일 기사', '공시', '월요일 기사', '날짜 없음']
+    assert [x['title'] for x in news_storage.get_news_by_company('IBK', year=2025)] == ['토요일 기사', '공시']
+    assert [x['title'] for x in news_storage.get_news_by_company('IBK', year=2025, month=1)] == ['공시']
+    assert [x['title'] for x in news_storage.get_news_by_company('IBK', month=8)] == ['월요일 기사']
+
+
+def test_published_ts_backfill_migrates_old_database(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    conn = sqlite3.connect(news_storage.DB_PATH)
+    conn.execute("CREATE TABLE news (id INTEGER PRIMARY KEY AUTOINCREMENT, company_key TEXT NOT NULL, "
+                 "title TEXT NOT NULL, link TEXT, published TEXT, summary TEXT, full_content TEXT, "
+                 "source TEXT, image_url TEXT, sentiment TEXT, created_at TEXT, UNIQUE(company_key, title))")
+    conn.execute("INSERT INTO news (company_key, title, published) VALUES ('KDB', '기존 기사', 'Thu, 05 Feb 2026 01:30:00 GMT')")
+    conn.commit()
+    conn.close()
+
+    items = news_storage.get_news_by_company('KDB', year=2026, month=2)
+
+    assert [x['title'] for x in items] == ['기존 기사']
+
+
+def test_article_text_moves_to_compressed_content_table(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    conn = sqlite3.connect(news_storage.DB_PATH)
+    conn.execute("CREATE TABLE news (id INTEGER PRIMARY KEY AUTOINCREMENT, company_key TEXT NOT NULL, "
+                 "title TEXT NOT NULL, link TEXT, published TEXT, summary TEXT, full_content TEXT, "
+                 "source TEXT, image_url TEXT, sentiment TEXT, created_at TEXT, UNIQUE(company_key, title))")
+    conn.execute("INSERT INTO news (company_key, title, published, summary, full_content) "
+                 "VALUES ('IBK', '기존 기사', '2025-01-01', 'IBK캐피탈 요약', '벤처투자 본문')")
+    conn.commit()
+    conn.close()
+
+    assert news_storage.count_archive('IBK', filter_mode='capital_only') == 1
+    conn = news_storage._get_connection()
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(news)")}
+    assert 'full_content' not in columns and 'summary' not in columns
+    stored = conn.execute("SELECT summary, full_content FROM news_content").fetchone()
+    assert stored['summary'] == 'IBK캐피탈 요약' and isinstance(stored['full_content'], bytes)
+
+    [item] = news_storage.search_news('벤처투자')
+    assert item['summary'] == 'IBK캐피탈 요약' and item['full_content'] == '벤처투자 본문'
+
+    # A better extraction replaces the text and its index entries
+    news_storage.ingest_news('IBK', [{'title': '기존 기사', 'published': '2025-01-01',
+                                      'summary': '새 요약', 'full_content': '인수합병 기사 ' * 40}])
+    assert news_storage.search_news('벤처투자') == []
+    assert news_storage.get_article_content(news_storage.search_news('인수합병')[0]['id']).startswith('인수합병')
+    assert news_storage.count_archive('IBK', filter_mode='capital_only') == 0
+
+
+def test_old_database_is_migrated_once_when_opened_from_two_threads(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    conn = sqlite3.connect(news_storage.DB_PATH)
+    conn.execute("CREATE TABLE news (id INTEGER PRIMARY KEY AUTOINCREMENT, company_key TEXT NOT NULL, "
+                 "title TEXT NOT NULL, link TEXT, published TEXT, summary TEXT, full_content TEXT, "
+                 "source TEXT, image_url TEXT, sentiment TEXT, created_at TEXT, UNIQUE(company_key, title))")
+    conn.executemany("INSERT INTO news (company_key, title, published, summary, full_content) VALUES (?, ?, ?, ?, ?)",
+                     [('IBK', f'기존 기사 {i}', '2025-01-01', '요약', '본문 ' * 100) for i in range(200)])
+    conn.commit()
+    conn.close()
+
+    start = threading.Barrier(2)
+    results, errors = [], []
+
+    def read(func):
+        start.wait()
+        try:
+            results.append(func())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read, args=(lambda: news_storage.get_news_count('IBK'),)),
+               threading.Thread(target=read, args=(lambda: news_storage.get_metadata('last_refresh'),))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(results, key=str) == [200, None]
+    conn = news_storage._get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM news_content").fetchone()[0] == 200
+    assert len(news_storage.search_news('본문', limit=500)) == 200
+
+
+def test_query_archive_filters_and_pages_in_sql(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.save_news_history({
+        'IBK_Parent': [
+            {'title': f'기업은행 기사 {i}', 'summary': '', 'published': f'2025-03-{i + 1:02d}'} for i in range(5)
+        ] + [
+            {'title': 'IBK 캐피탈 실적 개선', 'summary': '', 'published': '2025-03-20'},
+            {'title': '[공시] 사업보고서 제출', 'summary': '', 'published': '2025-03-21'},
+        ],
+        'KDB_Parent': [{'title': '산업은행 정책금융', 'summary': 'IBK캐피탈 언급', 'published': '2025-04-01'}],
+    })
+
+    parent_news = news_storage.query_archive('IBK_Parent', filter_mode='parent_only', reports=False, limit=2, offset=2)
+    assert [x['title'] for x in parent_news] == ['기업은행 기사 2', '기업은행 기사 1']
+    assert news_storage.count_archive('IBK_Parent', filter_mode='parent_only', reports=False) == 5
+    assert [x['title'] for x in news_storage.query_archive('IBK_Parent', filter_mode='capital_only')] == ['IBK 캐피탈 실적 개선']
+    assert news_storage.count_archive('IBK_Parent', year=2025, month=3, reports=True) == 1
+    assert news_storage.count_archive(['IBK_Parent', 'KDB_Parent'], filter_mode='group_only') == 6
+
+
+def test_archive_lists_one_row_per_story_with_lazy_alternates(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.ingest_news('IBK', [
+        {'title': 'IBK캐피탈 벤처투자 확대 - 뉴스1', 'published': '2025-01-02'},
+        {'title': 'IBK캐피탈 실적 발표', 'published': '2025-01-01'},
+    ])
+    news_storage.ingest_news('IBK', [
+        {'title': 'IBK캐피탈, 벤처투자 확대 - 연합뉴스', 'published': '2025-01-03',
+         'story_title': 'IBK캐피탈 벤처투자 확대 - 뉴스1'},
+        {'title': 'IBK캐피탈 벤처투자 확대', 'published': '2025-01-02',
+         'story_title': 'IBK캐피탈, 벤처투자 확대 - 연합뉴스'},  # an alternate's title
+    ])
+
+    page = news_storage.query_archive('IBK')
+    assert [(x['title'], x['alternate_count']) for x in page] == [
+        ('IBK캐피탈 벤처투자 확대 - 뉴스1', 2), ('IBK캐피탈 실적 발표', 0),
+    ]
+    assert news_storage.count_archive('IBK') == 2
+    assert news_storage.count_archive('IBK', stories=False) == 4
+    assert [x['title'] for x in news_storage.get_story_alternates(page[0]['id'])] == [
+        'IBK캐피탈, 벤처투자 확대 - 연합뉴스', 'IBK캐피탈 벤처투자 확대',
+    ]
+    assert sorted(news_storage.get_titles('IBK', stories_only=True)) == ['IBK캐피탈 벤처투자 확대 - 뉴스1', 'IBK캐피탈 실적 발표']
+
+    with news_storage._connection() as conn:
+        conn.execute("DELETE FROM news WHERE id = ?", (page[0]['id'],))
+        conn.commit()
+    assert news_storage.count_archive('IBK') == 3
+
+
+def test_lazy_news_list_counts_the_stories_it_pages(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.ingest_news('IBK', [
+        {'title': 'IBK캐피탈 벤처투자 확대 - 뉴스1', 'published': '2025-01-02'},
+        {'title': 'IBK캐피탈 실적 발표', 'published': '2025-01-01'},
+        {'title': 'IBK캐피탈, 벤처투자 확대 - 연합뉴스', 'published': '2025-01-03',
+         'story_title': 'IBK캐피탈 벤처투자 확대 - 뉴스1'},
+    ])
+
+    lst = news_storage.LazyNewsList('IBK', page_size=1)
+
+    assert len(lst) == 2
+    assert [x['title'] for x in lst] == ['IBK캐피탈 벤처투자 확대 - 뉴스1', 'IBK캐피탈 실적 발표']
+    assert lst[-1]['title'] == 'IBK캐피탈 실적 발표'
+    assert [x['title'] for x in reversed(lst)] == ['IBK캐피탈 실적 발표', 'IBK캐피탈 벤처투자 확대 - 뉴스1']
+
+
+def test_body_fingerprints_and_mismatched_bodies_are_stored(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    body = "IBK캐피탈이 벤처투자를 늘린다. " * 20
+    boilerplate = "후회스런 성급한 말보다 차라리 늦게 말하라! " * 10
+    news_storage.ingest_news('IBK', [
+        {'title': 'IBK캐피탈 벤처투자 확대 - 뉴스1', 'full_content': body},
+        {'title': '애큐온캐피탈 본사 이전 - 한국금융신문', 'full_content': boilerplate},
+    ])
+
+    assert news_storage.get_content_fingerprints('IBK') == [
+        ('IBK캐피탈 벤처투자 확대 - 뉴스1', deduplicator.content_simhash(body)),
+    ]
+    [row] = news_storage.get_low_quality_news(news_storage.QUALITY_EMPTY, 'IBK')
+    assert row['title'] == '애큐온캐피탈 본사 이전 - 한국금융신문'
+
+    # The article's own text replaces the foreign one, even when shorter;
+    # a foreign text never replaces a matching one
+    news_storage.ingest_news('IBK', [
+        {'title': '애큐온캐피탈 본사 이전 - 한국금융신문', 'full_content': "애큐온캐피탈이 본사를 옮긴다. " * 15},
+        {'title': 'IBK캐피탈 벤처투자 확대 - 뉴스1', 'full_content': boilerplate * 3},
+    ])
+    assert news_storage.get_low_quality_news(news_storage.QUALITY_EMPTY, 'IBK') == []
+    assert len(news_storage.get_content_fingerprints('IBK')) == 2
+    assert news_storage.get_article_content(row['id']).startswith("애큐온캐피탈")
+
+
+def test_archived_rows_are_fingerprinted_in_batches_after_the_migration(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    body = "IBK캐피탈이 벤처투자를 늘린다. " * 20
+    news_storage.ingest_news('IBK', [
+        {'title': 'IBK캐피탈 벤처투자 확대 - 뉴스1', 'full_content': body},
+        {'title': '애큐온캐피탈 본사 이전 - 한국금융신문', 'full_content': "후회스런 성급한 말보다 차라리 늦게 말하라! " * 10},
+        {'title': '산은캐피탈 실적 발표', 'full_content': ''},
+    ])
+    # As left by the migration on a database archived before fingerprints
+    with news_storage._connection() as conn:
+        conn.execute("UPDATE news SET content_simhash = NULL, content_mismatch = NULL")
+        conn.commit()
+    assert news_storage.get_content_fingerprints('IBK') == []
+
+    assert news_storage.backfill_content_fingerprints(batch_size=2) == 3
+    assert news_storage.backfill_content_fingerprints(batch_size=2) == 0
+    assert news_storage.get_content_fingerprints('IBK') == [
+        ('IBK캐피탈 벤처투자 확대 - 뉴스1', deduplicator.content_simhash(body)),
+    ]
+    low_quality = news_storage.get_low_quality_news(news_storage.QUALITY_EMPTY, 'IBK')
+    assert sorted(x['title'] for x in low_quality) == ['산은캐피탈 실적 발표', '애큐온캐피탈 본사 이전 - 한국금융신문']
+
+
+def test_flags_from_an_older_content_check_are_computed_again(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    body = "올해 경제성장률 전망치가 높아졌다. " * 20
+    news_storage.ingest_news('Macro', [{'title': '韓경제 회복 시동[장밋빛 성장률①] - 뉴시스', 'full_content': body}])
+    # As flagged by the whole-word check of the previous version
+    with news_storage._connection() as conn:
+        conn.execute("UPDATE news SET content_mismatch = 1")
+        conn.execute("UPDATE metadata SET value = '1' WHERE key = 'content_check_version'")
+        conn.commit()
+    news_storage._initialized = False
+
+    assert news_storage.backfill_content_fingerprints() == 1
+    assert news_storage.get_low_quality_news(news_storage.QUALITY_EMPTY, 'Macro') == []
+
+
+def test_connection_is_reused_per_thread_and_rolled_back_on_error(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.set_metadata('_a', '1')
+    conn = news_storage._get_connection()
+
+    assert news_storage._get_connection() is conn
+    other = []
+    thread = threading.Thread(target=lambda: other.append(news_storage._get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+    try:
+        with news_storage._connection() as c:
+            c.execute("INSERT INTO metadata (key, value) VALUES ('_b', '2')")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert not conn.in_transaction
+    assert news_storage.get_metadata('_b') is None
+    assert news_storage.get_metadata('_a') == '1'
+
+
+def test_ingest_news_reports_inserted_and_ignored(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.save_news_history({'KDB': [{'title': '기존 기사', 'published': ''}]})
+    version = news_storage.get_store_version()
+
+    stats = news_storage.ingest_news('KDB', [
+        {'title': '기존 기사', 'published': ''},
+        {'title': '새 기사 1', 'published': 'Mon, 01 Aug 2022 07:00:00 GMT'},
+        {'title': '새 기사 2', 'published': ''},
+    ])
+
+    assert stats == {'inserted': 2, 'updated': 0, 'ignored': 1}
+    assert news_storage.get_news_count('KDB') == 3
+    assert news_storage.get_store_version() == version + 1
+    assert news_storage.ingest_news('KDB', []) == {'inserted': 0, 'updated': 0, 'ignored': 0}
+    assert news_storage.get_store_version() == version + 1
+
+
+def test_upsert_replaces_content_only_when_better(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    stub = "[요약본] 메타 설명 (상세 내용은 원문 링크를 참조하세요)"
+    full = "IBK캐피탈이 벤처투자 펀드를 추가로 조성한다. " * 20
+    news_storage.ingest_news('IBK', [{'title': '벤처투자 확대', 'published': '', 'full_content': stub}])
+    assert [x['title'] for x in news_storage.get_low_quality_news()] == ['벤처투자 확대']
+
+    stats = news_storage.ingest_news('IBK', [{'title': '벤처투자 확대', 'published': '', 'full_content': full, 'extractor_version': 1}])
+    assert stats == {'inserted': 0, 'updated': 1, 'ignored': 0}
+    assert news_storage.get_low_quality_news() == []
+    assert news_storage.search_news('벤처투자')[0]['full_content'] == full
+
+    # A later placeholder never overwrites the full text
+    stats = news_storage.ingest_news('IBK', [{'title': '벤처투자 확대', 'published': '', 'full_content': "내용을 가져올 수 없습니다."}])
+    assert stats == {'inserted': 0, 'updated': 0, 'ignored': 1}
+    assert news_storage.get_news_by_company('IBK')[0]['full_content'] == full
+
+
+def test_ingest_news_counts_a_title_repeated_in_the_batch_once_as_inserted(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    stub = "[요약본] 메타 설명 (상세 내용은 원문 링크를 참조하세요)"
+    full = "IBK캐피탈이 벤처투자 펀드를 추가로 조성한다. " * 20
+
+    stats = news_storage.ingest_news('IBK', [
+        {'title': '벤처투자 확대', 'published': '', 'full_content': stub},
+        {'title': '벤처투자 확대', 'published': '', 'full_content': full},
+        {'title': '실적 발표', 'published': ''},
+        {'title': '실적 발표', 'published': ''},
+    ])
+
+    assert stats == {'inserted': 2, 'updated': 1, 'ignored': 1}
+    assert news_storage.get_news_count('IBK') == 2
+
+
+def test_lazy_archive_pages_rows_and_defers_full_content(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.save_news_history({
+        'IBK': [{'title': f'기사 {i}', 'published': f'2025-01-{i + 1:02d}', 'full_content': f'본문 {i}'} for i in range(5)],
+        '_last_updated': '2025-01-06 09:00:00',
+    })
+
+    archive = news_storage.LazyArchive()
+    news = archive.get('IBK', [])
+    news.page_size = 2
+
+    assert set(archive) == {'IBK', '_last_updated'}
+    assert archive['_last_updated'] == '2025-01-06 09:00:00'
+    assert archive.get('KDB', []) == []
+    assert len(news) == 5
+    assert [x['title'] for x in news] == ['기사 4', '기사 3', '기사 2', '기사 1', '기사 0']
+    assert [x['title'] for x in news[1:3]] == ['기사 3', '기사 2']
+    assert news[-1]['title'] == '기사 0'
+
+    item = news[0]
+    assert 'full_content' not in item
+    assert item.get('full_content') == '본문 4'
+    assert news_storage.load_contents(list(news))[2]['full_content'] == '본문 2'
+
+
+def test_search_finds_korean_substrings(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.save_news_history({'IBK': [
+        {'title': 'IBK캐피탈의 벤처투자 확대', 'published': '', 'full_content': '기업금융 중심으로 포트폴리오를 재편했다.'},
+        {'title': '산은캐피탈, 신용등급 유지', 'published': '', 'full_content': ''},
+        {'title': '금리 인하 전망', 'published': '', 'full_content': ''},
+    ]})
+
+    assert {x['title'] for x in news_storage.search_news('캐피탈')} == {'IBK캐피탈의 벤처투자 확대', '산은캐피탈, 신용등급 유지'}
+    assert [x['title'] for x in news_storage.search_news('포트폴리오 IBK')] == ['IBK캐피탈의 벤처투자 확대']
+    assert [x['title'] for x in news_storage.search_news('망')] == ['금리 인하 전망']
+    assert news_storage.search_news('  ,, ') == []
+
+    assert news_storage.rebuild_search_index() == 3
+    assert len(news_storage.search_news('캐피탈')) == 2
+
+
+def test_search_archive_ranks_titles_first_with_snippets_and_facets(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    body = "올해 시장 전망을 설명했다. " * 10 + "IBK캐피탈은 벤처투자를 늘린다. " + "기타 내용. " * 10
+    news_storage.save_news_history({
+        'IBK': [
+            {'title': '캐피탈 업계 동향', 'published': '2025-01-01', 'full_content': '업계 소식'},
+            {'title': '시장 전망', 'published': '2025-01-02', 'full_content': body},
+        ],
+        'KDB': [{'title': '산은캐피탈 신용등급', 'published': '2025-01-03', 'full_content': ''}],
+    })
+
+    result = news_storage.search_archive('캐피탈', limit=2)
+
+    assert result['total'] == 3
+    assert result['facets'] == {'IBK': 2, 'KDB': 1}
+    assert len(result['items']) == 2
+    assert result['items'][0]['title_highlight'] in ('**캐피탈** 업계 동향', '산은**캐피탈** 신용등급')
+    assert 'full_content' not in result['items'][0]
+
+    snippet = news_storage.search_archive('벤처투자', company_key='IBK')['items'][0]['snippet']
+    assert '**벤처투자**' in snippet and snippet.startswith('…') and snippet.endswith('…')
+    assert len(snippet) < len(body)
+
+
+def test_search_service_caches_until_the_store_changes(tmp_path, monkeypatch):
+    _use_temp_db(tmp_path, monkeypatch)
+    news_storage.ingest_news('IBK', [
+        {'title': f'IBK캐피탈 실적 {i}', 'published': f'2025-01-{i + 1:02d}', 'full_content': '벤처투자 확대'}
+        for i in range(5)
+    ])
+    service = search_service.SearchService()
+
+    first = service.search('IBK캐피탈', limit=2, offset=2)
+    expected = news_storage.search_archive('IBK캐피탈', limit=2, offset=2)
+    assert [item['id'] for item in first['items']] == [item['id'] for item in expected['items']]
+    assert (first['total'], first['facets']) == (5, {'IBK': 5})
+    assert first['items'][0]['title_highlight'].startswith('**IBK캐피탈**')
+
+    # Same terms after normalization: served from the cache
+    service.search('  ibk캐피탈, ', limit=2)
+    assert service.stats == {'hits': 1, 'narrowed': 0, 'misses': 1}
+
+    # A longer query than one without hits needs no SQL
+    assert service.search('합병')['total'] == 0
+    assert service.search('인수합병')['total'] == 0
+    assert service.stats['narrowed'] == 1
+
+    # A write bumps the store version and empties the cache
+    news_storage.ingest_news('KDB', [{'title': 'KDB 인수합병 추진', 'published': '2025-02-01'}])
+    assert service.search('인수합병')['total'] == 1
+    assert service.search('IBK캐피탈')['total'] == 5